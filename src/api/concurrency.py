@@ -0,0 +1,80 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict
+
+__all__ = ["ConcurrencyLimiter", "SingleFlight", "QueueFullError", "request_key"]
+
+class QueueFullError(RuntimeError):
+    pass
+
+def request_key(question: str, filters: dict | None = None) -> str:
+    normalized_question = " ".join(question.lower().split())
+    return json.dumps([normalized_question, filters or {}], sort_keys=True, ensure_ascii=False, default=str)
+
+class ConcurrencyLimiter:
+    def __init__(self, max_concurrency: int, max_queue: int, name: str = "Chat"):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.name = name
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.active = 0
+        self.queued = 0
+        self.rejected = 0
+        self.completed = 0
+
+    @property
+    def full(self) -> bool:
+        return self.active >= self.max_concurrency and self.queued >= self.max_queue
+
+    @asynccontextmanager
+    async def slot(self):
+        if self.full:
+            self.rejected += 1
+            raise QueueFullError(f"{self.name} queue is full ({self.queued} waiting)")
+        self.queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "completed": self.completed,
+        }
+
+class SingleFlight:
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._in_flight.get(key)
+        if future is None:
+            self.leaders += 1
+            future = asyncio.ensure_future(fn())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._in_flight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
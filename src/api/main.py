@@ -1,41 +1,432 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from typing import Dict, List
 from pydantic import BaseModel
-from src.ingest.build_index import build_index
-from src.core.application.agent import build_chain
+from starlette.concurrency import run_in_threadpool
+from src.core.application.chain_manager import ChainManager
+from src.core.application.answer_cache import AnswerCache, normalize_question
+from src.core.application.attribute_index import InvalidFilterError, FiltersUnavailableError
+from src.core.application.query_router import QueryRouter, ROUTE_RAG, ROUTE_STRUCTURED
+from src.core.application.ranking import CandidateRanker, CandidatePool, ScoreCache, UnknownRankTaskError, DEFAULT_TASK, DEFAULT_TOP_N
+from src.api.streaming import stream_chat_events, format_sse, EVENT_ERROR
+from src.api.concurrency import ConcurrencyLimiter, SingleFlight, QueueFullError, request_key
+from src.core.infrastructure.embedding_cache import embed_queries
+from src.ingest.jobs import IndexJobManager, IndexJobNotFoundError, JOB_SUCCEEDED
+from src.core.infrastructure.metrics import (
+    REGISTRY, CHAT_REQUESTS, CONTENT_TYPE as METRICS_CONTENT_TYPE, STAGE_ANSWER_CACHE, STAGE_EMBED_QUERY, STAGE_REQUEST, STAGE_ROUTE,
+    collect_timings, record_stage, server_timing_header, timed_stage,
+)
 
 APP_TITLE = "Candidate RAG (LangChain)"
 ROUTE_HEALTH = "/health"
+ROUTE_READY = "/ready"
 ROUTE_INDEX = "/index"
+ROUTE_INDEX_JOBS = "/index/jobs"
+ROUTE_INDEX_JOB = "/index/jobs/{job_id}"
+ROUTE_INDEX_JOB_CANCEL = "/index/jobs/{job_id}/cancel"
 ROUTE_CHAT = "/chat"
+ROUTE_CHAT_STREAM = "/chat/stream"
+ROUTE_CHAT_BATCH = "/chat/batch"
+ROUTE_CHAT_STATS = "/chat/stats"
+ROUTE_RANK = "/rank"
+ROUTE_METRICS = "/metrics"
+FIELD_CACHE = "cache"
+FIELD_ROUTE = "route"
+MEDIA_TYPE_SSE = "text/event-stream"
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
 STATUS_OK = "ok"
 PAYLOAD_INPUT = "input"
+PAYLOAD_FILTERS = "filters"
+PAYLOAD_QUERY_EMBEDDING = "query_embedding"
 FIELD_ANSWER = "answer"
 FIELD_CONTEXT = "context"
 ERROR_PREFIX = "LLM/Index error: "
+ENV_CHAT_MAX_CONCURRENCY = "CHAT_MAX_CONCURRENCY"
+ENV_CHAT_MAX_QUEUE = "CHAT_MAX_QUEUE"
+DEFAULT_CHAT_MAX_CONCURRENCY = "4"
+DEFAULT_CHAT_MAX_QUEUE = "32"
+ENV_CHAT_BATCH_MAX_ITEMS = "CHAT_BATCH_MAX_ITEMS"
+ENV_CHAT_BATCH_CONCURRENCY = "CHAT_BATCH_CONCURRENCY"
+DEFAULT_CHAT_BATCH_MAX_ITEMS = "64"
+DEFAULT_CHAT_BATCH_CONCURRENCY = "4"
+ENV_QUERY_ROUTER = "QUERY_ROUTER"
+DEFAULT_QUERY_ROUTER = "true"
+ENV_RANK_CONCURRENCY = "RANK_CONCURRENCY"
+ENV_RANK_MAX_CONCURRENCY = "RANK_MAX_CONCURRENCY"
+ENV_RANK_MAX_QUEUE = "RANK_MAX_QUEUE"
+DEFAULT_RANK_CONCURRENCY = "4"
+DEFAULT_RANK_MAX_CONCURRENCY = "1"
+DEFAULT_RANK_MAX_QUEUE = "4"
+RANK_SCORES_SUBDIR = Path("cache") / "rank_scores"
+ENV_ANSWER_CACHE = "ANSWER_CACHE"
+ENV_ANSWER_CACHE_THRESHOLD = "ANSWER_CACHE_THRESHOLD"
+ENV_ANSWER_CACHE_TTL_S = "ANSWER_CACHE_TTL_S"
+ENV_ANSWER_CACHE_MAX_ENTRIES = "ANSWER_CACHE_MAX_ENTRIES"
+DEFAULT_ANSWER_CACHE = "true"
+DEFAULT_ANSWER_CACHE_THRESHOLD = "0.97"
+DEFAULT_ANSWER_CACHE_TTL_S = "3600"
+DEFAULT_ANSWER_CACHE_MAX_ENTRIES = "1000"
+RETRY_AFTER_S = "1"
+ENV_METRICS = "METRICS"
+ENV_SERVER_TIMING = "SERVER_TIMING"
+DEFAULT_METRICS = "true"
+DEFAULT_SERVER_TIMING = "false"
+HEADER_SERVER_TIMING = "Server-Timing"
+OUTCOME_OK = "ok"
+ENV_DATA_DIR = "DATA_DIR"
+DEFAULT_DATA_DIR = "./data"
+INDEX_JOBS_SUBDIR = "index_jobs"
+OUTCOME_CACHE_HIT = "cache_hit"
+OUTCOME_STRUCTURED = "structured"
 
-app = FastAPI(title=APP_TITLE)
+chain_manager = ChainManager()
+chat_limiter = ConcurrencyLimiter(
+    max_concurrency=int(os.getenv(ENV_CHAT_MAX_CONCURRENCY, DEFAULT_CHAT_MAX_CONCURRENCY)),
+    max_queue=int(os.getenv(ENV_CHAT_MAX_QUEUE, DEFAULT_CHAT_MAX_QUEUE)),
+)
+chat_flights = SingleFlight()
+chat_batch_max_items = int(os.getenv(ENV_CHAT_BATCH_MAX_ITEMS, DEFAULT_CHAT_BATCH_MAX_ITEMS))
+chat_batch_concurrency = int(os.getenv(ENV_CHAT_BATCH_CONCURRENCY, DEFAULT_CHAT_BATCH_CONCURRENCY))
+query_router = QueryRouter(version_reader=lambda: _read_index_version(), index_loader=lambda version: _load_attribute_index(version))
+query_router_enabled = os.getenv(ENV_QUERY_ROUTER, DEFAULT_QUERY_ROUTER).lower() == "true"
+candidate_ranker = CandidateRanker(
+    llm_factory=lambda: _load_llm(),
+    cache=ScoreCache(Path(os.getenv(ENV_DATA_DIR, DEFAULT_DATA_DIR)) / RANK_SCORES_SUBDIR),
+    concurrency=int(os.getenv(ENV_RANK_CONCURRENCY, DEFAULT_RANK_CONCURRENCY)),
+)
+rank_limiter = ConcurrencyLimiter(
+    max_concurrency=int(os.getenv(ENV_RANK_MAX_CONCURRENCY, DEFAULT_RANK_MAX_CONCURRENCY)),
+    max_queue=int(os.getenv(ENV_RANK_MAX_QUEUE, DEFAULT_RANK_MAX_QUEUE)),
+    name="Rank",
+)
+candidate_pool = CandidatePool(version_reader=lambda: _read_index_version(), loader=lambda version: _load_candidate_records())
+index_jobs = IndexJobManager(
+    Path(os.getenv(ENV_DATA_DIR, DEFAULT_DATA_DIR)) / INDEX_JOBS_SUBDIR,
+    on_success=lambda job: chain_manager.warm_in_background(force=False),
+)
+
+def _load_llm():
+    from src.core.application.agent import load_llm
+
+    return load_llm()
+
+def _read_index_version() -> str:
+    from src.core.application.retriever import read_index_version
+
+    return read_index_version()
+
+def _load_attribute_index(version: str):
+    from src.core.application.retriever import load_attribute_index
+
+    return load_attribute_index(version)
+
+def _load_candidate_records() -> list:
+    from src.ingest.build_index import load_candidate_records
+
+    return load_candidate_records()
+
+def _embed_question(question: str):
+    return chain_manager.embeddings.embed_query(question)
+
+def _embed_questions(questions: List[str]) -> Dict[str, List[float]]:
+    if chain_manager.embeddings is None:
+        return {}
+    texts = list(dict.fromkeys(questions + [normalize_question(q) for q in questions]))
+    try:
+        with timed_stage(STAGE_EMBED_QUERY):
+            return dict(zip(texts, embed_queries(chain_manager.embeddings, texts)))
+    except Exception as e:
+        print(f"[CHAT] Batch embedding failed, items will embed on their own: {e}")
+        return {}
+
+answer_cache = AnswerCache(
+    embed_query=_embed_question,
+    threshold=float(os.getenv(ENV_ANSWER_CACHE_THRESHOLD, DEFAULT_ANSWER_CACHE_THRESHOLD)),
+    ttl_s=float(os.getenv(ENV_ANSWER_CACHE_TTL_S, DEFAULT_ANSWER_CACHE_TTL_S)),
+    max_entries=int(os.getenv(ENV_ANSWER_CACHE_MAX_ENTRIES, DEFAULT_ANSWER_CACHE_MAX_ENTRIES)),
+)
+answer_cache_enabled = os.getenv(ENV_ANSWER_CACHE, DEFAULT_ANSWER_CACHE).lower() == "true"
+REGISTRY.enabled = os.getenv(ENV_METRICS, DEFAULT_METRICS).lower() == "true"
+server_timing_enabled = os.getenv(ENV_SERVER_TIMING, DEFAULT_SERVER_TIMING).lower() == "true"
+
+def _serving_metrics():
+    limiter = chat_limiter.stats()
+    flights = chat_flights.stats()
+    cache = answer_cache.stats()
+    cache_hits = [(("answer", "exact"), cache["exact_hits"]), (("answer", "semantic"), cache["semantic_hits"])]
+    cache_misses = [(("answer",), cache["misses"])]
+    embedding_stats = getattr(chain_manager.embeddings, "stats", None)
+    if embedding_stats is not None:
+        embedding = embedding_stats()
+        cache_hits += [(("embedding", "memory"), embedding["memory_hits"]), (("embedding", "disk"), embedding["disk_hits"])]
+        cache_misses.append((("embedding",), embedding["misses"]))
+    backends = _llm_backends()
+    return [
+        ("rag_chat_active", "gauge", "Chat requests holding an LLM slot", (), [((), limiter["active"])]),
+        ("rag_chat_queued", "gauge", "Chat requests waiting for an LLM slot", (), [((), limiter["queued"])]),
+        ("rag_chat_rejected_total", "counter", "Chat requests rejected with 503", (), [((), limiter["rejected"])]),
+        ("rag_chat_coalesced_total", "counter", "Chat requests coalesced onto an identical in-flight request", (), [((), flights["coalesced"])]),
+        ("rag_cache_hits_total", "counter", "Cache hits", ("cache", "kind"), cache_hits),
+        ("rag_cache_misses_total", "counter", "Cache misses", ("cache",), cache_misses),
+        ("rag_llm_backend_outstanding", "gauge", "Requests in flight per LLM backend", ("backend",), [((b["url"],), b["outstanding"]) for b in backends]),
+        ("rag_llm_backend_ejected", "gauge", "1 while an LLM backend is ejected for failing", ("backend",), [((b["url"],), int(b["ejected"])) for b in backends]),
+        ("rag_llm_backend_failures_total", "counter", "Failed requests per LLM backend", ("backend",), [((b["url"],), b["failures"]) for b in backends]),
+    ]
+
+def _llm_backends() -> List[dict]:
+    from src.core.infrastructure.llm_pool import backend_stats
+
+    return backend_stats()
+
+REGISTRY.register_collector(_serving_metrics)
+
+def preload() -> dict:
+    from src.core.application.retriever import preload_indexes
+    info = preload_indexes()
+    chain_manager.preload()
+    return info
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    chain_manager.warm_in_background()
+    print("[STARTUP] Serving; warming the chain in the background")
+    yield
+
+app = FastAPI(title=APP_TITLE, lifespan=lifespan)
 
 class ChatRequest(BaseModel):
     question: str
     filters: dict | None = None
 
+class BatchChatRequest(BaseModel):
+    items: List[ChatRequest]
+
+class RankRequest(BaseModel):
+    task: str = DEFAULT_TASK
+    criteria: str | None = None
+    top_n: int = DEFAULT_TOP_N
+    min_score: float = 0.0
+    candidate_ids: List[str] | None = None
+
 @app.get(ROUTE_HEALTH)
 def health():
     return {"status": STATUS_OK}
 
+@app.get(ROUTE_READY)
+def ready():
+    status = chain_manager.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
 @app.post(ROUTE_INDEX)
-def index():
-    info = build_index()
-    return {"indexed": info}
+def index(wait: bool = False):
+    job = index_jobs.submit()
+    if not wait:
+        return JSONResponse(status_code=202, content={"job": job})
+    job = index_jobs.wait(job["id"])
+    if job["state"] != JOB_SUCCEEDED:
+        raise HTTPException(status_code=502, detail=f"{ERROR_PREFIX}{job['error'] or job['state']}")
+    return {"indexed": job["result"], "job": job}
+
+@app.get(ROUTE_INDEX_JOBS)
+def index_job_list():
+    return {"jobs": index_jobs.list()}
+
+@app.get(ROUTE_INDEX_JOB)
+def index_job(job_id: str):
+    try:
+        return index_jobs.get(job_id)
+    except IndexJobNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@app.post(ROUTE_INDEX_JOB_CANCEL)
+def cancel_index_job(job_id: str):
+    try:
+        return JSONResponse(status_code=202, content=index_jobs.cancel(job_id))
+    except IndexJobNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
 @app.post(ROUTE_CHAT)
-def chat(req: ChatRequest):
-    try:
-        chain = build_chain()
-        result = chain.invoke({PAYLOAD_INPUT: req.question})
-        return {
-            FIELD_ANSWER: result.get(FIELD_ANSWER, ""),
-            "sources": [getattr(d, "metadata", {}) for d in result.get(FIELD_CONTEXT, [])]
-        }
+async def chat(req: ChatRequest, response: Response):
+    started = time.perf_counter()
+    with collect_timings() as timings:
+        try:
+            result = await _chat(req)
+        except HTTPException as e:
+            CHAT_REQUESTS.inc(1.0, ROUTE_CHAT, str(e.status_code))
+            raise
+        finally:
+            record_stage(STAGE_REQUEST, time.perf_counter() - started)
+    CHAT_REQUESTS.inc(1.0, ROUTE_CHAT, _outcome(result))
+    if server_timing_enabled:
+        response.headers[HEADER_SERVER_TIMING] = server_timing_header(timings)
+    return result
+
+async def _chat(req: ChatRequest) -> dict:
+    routed = await _route(req)
+    if routed is not None:
+        return routed
+    try:
+        chain = await run_in_threadpool(chain_manager.get)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"{ERROR_PREFIX}{e}")
+    vectors = await run_in_threadpool(_embed_questions, [req.question])
+    return await _respond(req, chain, chain_manager.generation, vectors)
+
+async def _route(req: ChatRequest) -> dict | None:
+    if not query_router_enabled:
+        return None
+    try:
+        with timed_stage(STAGE_ROUTE):
+            routed = await run_in_threadpool(query_router.route, req.question, req.filters)
+    except InvalidFilterError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"[CHAT] Structured routing failed, answering with RAG: {e}")
+        return None
+    return None if routed is None else {**routed, FIELD_CACHE: {"hit": False}}
+
+def _outcome(result: dict) -> str:
+    if result[FIELD_ROUTE]["path"] == ROUTE_STRUCTURED:
+        return OUTCOME_STRUCTURED
+    return OUTCOME_CACHE_HIT if result[FIELD_CACHE]["hit"] else OUTCOME_OK
+
+async def _respond(req: ChatRequest, chain, generation: str, vectors: Dict[str, List[float]] | None = None) -> dict:
+    vectors = vectors or {}
+    try:
+        if answer_cache_enabled:
+            with timed_stage(STAGE_ANSWER_CACHE):
+                cached = await run_in_threadpool(
+                    answer_cache.get, req.question, req.filters, generation, vectors.get(normalize_question(req.question))
+                )
+            if cached is not None:
+                response, match = cached
+                return {**response, FIELD_CACHE: {"hit": True, **match}, FIELD_ROUTE: {"path": ROUTE_RAG}}
+        return await chat_flights.do(request_key(req.question, req.filters), lambda: _answer(req, chain, generation, vectors))
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": RETRY_AFTER_S})
+    except InvalidFilterError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FiltersUnavailableError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"{ERROR_PREFIX}{e}")
+
+async def _answer(req: ChatRequest, chain, generation: str, vectors: Dict[str, List[float]]) -> dict:
+    payload = {PAYLOAD_INPUT: req.question, PAYLOAD_FILTERS: req.filters}
+    if req.question in vectors:
+        payload[PAYLOAD_QUERY_EMBEDDING] = vectors[req.question]
+    async with chat_limiter.slot():
+        result = await chain.ainvoke(payload)
+    response = {
+        FIELD_ANSWER: result.get(FIELD_ANSWER, ""),
+        "sources": [getattr(d, "metadata", {}) for d in result.get(FIELD_CONTEXT, [])]
+    }
+    if answer_cache_enabled:
+        await run_in_threadpool(
+            answer_cache.put, req.question, req.filters, generation, response, vectors.get(normalize_question(req.question))
+        )
+    return {**response, FIELD_CACHE: {"hit": False}, FIELD_ROUTE: {"path": ROUTE_RAG}}
+
+@app.post(ROUTE_CHAT_BATCH)
+async def chat_batch(req: BatchChatRequest):
+    if len(req.items) > chat_batch_max_items:
+        raise HTTPException(status_code=400, detail=f"A batch holds at most {chat_batch_max_items} items")
+    started = time.perf_counter()
+    routed = await asyncio.gather(*[_batch_route(item) for item in req.items])
+    pending = [item for item, result in zip(req.items, routed) if result is None]
+    chain, generation, vectors = None, "", {}
+    if pending:
+        try:
+            chain = await run_in_threadpool(chain_manager.get)
+        except Exception as e:
+            CHAT_REQUESTS.inc(float(len(pending)), ROUTE_CHAT_BATCH, "502")
+            raise HTTPException(status_code=502, detail=f"{ERROR_PREFIX}{e}")
+        generation = chain_manager.generation
+        vectors = await run_in_threadpool(_embed_questions, [item.question for item in pending])
+    pool = asyncio.Semaphore(max(1, chat_batch_concurrency))
+    answered = iter(await asyncio.gather(*[_batch_item(item, chain, generation, vectors, pool) for item in pending]))
+    results = [result if result is not None else next(answered) for result in routed]
+    record_stage(STAGE_REQUEST, time.perf_counter() - started)
+    failed = sum(1 for result in results if "error" in result)
+    return {"results": results, "succeeded": len(results) - failed, "failed": failed}
+
+async def _batch_route(req: ChatRequest) -> dict | None:
+    try:
+        result = await _route(req)
+    except HTTPException as e:
+        CHAT_REQUESTS.inc(1.0, ROUTE_CHAT_BATCH, str(e.status_code))
+        return {"error": {"status": e.status_code, "detail": e.detail}}
+    if result is not None:
+        CHAT_REQUESTS.inc(1.0, ROUTE_CHAT_BATCH, OUTCOME_STRUCTURED)
+    return result
+
+async def _batch_item(req: ChatRequest, chain, generation: str, vectors: Dict[str, List[float]], pool: asyncio.Semaphore) -> dict:
+    async with pool:
+        try:
+            result = await _respond(req, chain, generation, vectors)
+        except HTTPException as e:
+            CHAT_REQUESTS.inc(1.0, ROUTE_CHAT_BATCH, str(e.status_code))
+            return {"error": {"status": e.status_code, "detail": e.detail}}
+    CHAT_REQUESTS.inc(1.0, ROUTE_CHAT_BATCH, _outcome(result))
+    return result
+
+@app.post(ROUTE_RANK)
+async def rank(req: RankRequest):
+    try:
+        async with rank_limiter.slot():
+            records = await run_in_threadpool(candidate_pool.records)
+            if req.candidate_ids is not None:
+                wanted = set(req.candidate_ids)
+                records = [record for record in records if record.candidate_id in wanted]
+            return await candidate_ranker.rank(records, task=req.task, top_n=req.top_n, criteria=req.criteria, min_score=req.min_score)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": RETRY_AFTER_S})
+    except UnknownRankTaskError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"{ERROR_PREFIX}{e}")
+
+@app.post(ROUTE_CHAT_STREAM)
+async def chat_stream(req: ChatRequest, request: Request):
+    if chat_limiter.full:
+        CHAT_REQUESTS.inc(1.0, ROUTE_CHAT_STREAM, "503")
+        raise HTTPException(status_code=503, detail="Chat queue is full", headers={"Retry-After": RETRY_AFTER_S})
+    try:
+        chain = await run_in_threadpool(chain_manager.get)
+    except Exception as e:
+        CHAT_REQUESTS.inc(1.0, ROUTE_CHAT_STREAM, "502")
+        raise HTTPException(status_code=502, detail=f"{ERROR_PREFIX}{e}")
+    CHAT_REQUESTS.inc(1.0, ROUTE_CHAT_STREAM, OUTCOME_OK)
+    return StreamingResponse(
+        _limited(stream_chat_events(chain, req.question, request, req.filters)),
+        media_type=MEDIA_TYPE_SSE,
+        headers=SSE_HEADERS,
+    )
+
+async def _limited(events):
+    try:
+        async with chat_limiter.slot():
+            async for event in events:
+                yield event
+    except QueueFullError as e:
+        yield format_sse(EVENT_ERROR, {"detail": str(e)})
+
+@app.get(ROUTE_CHAT_STATS)
+def chat_stats():
+    return {
+        "limiter": chat_limiter.stats(),
+        "rank_limiter": rank_limiter.stats(),
+        "singleflight": chat_flights.stats(),
+        "answer_cache": answer_cache.stats(),
+        "router": query_router.stats(),
+        "llm_backends": _llm_backends(),
+    }
+
+@app.get(ROUTE_METRICS)
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
@@ -0,0 +1,209 @@
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Any, Callable, Dict, Set
+
+__all__ = ["PreforkServer", "prefork_supported"]
+
+DEFAULT_POLL_S = 2.0
+DEFAULT_GRACEFUL_TIMEOUT_S = 30
+DEFAULT_BACKLOG = 2048
+SUPERVISE_INTERVAL_S = 0.1
+MIN_WORKER_UPTIME_S = 1.0
+RESPAWN_DELAY_S = 1.0
+SHUTDOWN_EXTRA_S = 5.0
+WORKER_EXIT_ERROR = 1
+
+def prefork_supported() -> bool:
+    return hasattr(os, "fork")
+
+def _describe_exit(status: int) -> str:
+    if os.WIFSIGNALED(status):
+        return f"signal {os.WTERMSIG(status)}"
+    return f"exit code {os.WEXITSTATUS(status)}"
+
+class PreforkServer:
+    def __init__(
+        self,
+        app: Any,
+        host: str,
+        port: int,
+        workers: int,
+        preload: Callable[[], Any] | None = None,
+        version: Callable[[], str] | None = None,
+        poll_s: float = DEFAULT_POLL_S,
+        graceful_timeout_s: int = DEFAULT_GRACEFUL_TIMEOUT_S,
+    ):
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.preload = preload
+        self.version = version
+        self.poll_s = poll_s
+        self.graceful_timeout_s = graceful_timeout_s
+        self.reloads = 0
+        self.restarts = 0
+        self._socket: socket.socket | None = None
+        self._workers: Dict[int, float] = {}
+        self._retiring: Set[int] = set()
+        self._loaded_version: str | None = None
+        self._stopping = False
+        self._reload_requested = False
+
+    def run(self) -> int:
+        self._socket = self._bind()
+        self._preload()
+        self._install_signals()
+        print(f"[PREFORK] Listening on {self.host}:{self.port} with {self.workers} workers (supervisor {os.getpid()})", flush=True)
+        for _ in range(self.workers):
+            self._spawn()
+        next_poll = time.monotonic() + self.poll_s
+        try:
+            while not self._stopping:
+                time.sleep(SUPERVISE_INTERVAL_S)
+                self._reap()
+                if self._reload_requested:
+                    self._reload_requested = False
+                    self._reload("SIGHUP")
+                elif time.monotonic() >= next_poll:
+                    next_poll = time.monotonic() + self.poll_s
+                    if self._version_changed():
+                        self._reload("index version changed")
+        finally:
+            self._shutdown()
+            self._socket.close()
+        return 0
+
+    def _bind(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(DEFAULT_BACKLOG)
+        sock.set_inheritable(True)
+        return sock
+
+    def _install_signals(self) -> None:
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+
+    def _on_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def _on_reload(self, signum, frame) -> None:
+        self._reload_requested = True
+
+    def _read_version(self) -> str | None:
+        if self.version is None:
+            return None
+        try:
+            return self.version()
+        except Exception:
+            return self._loaded_version
+
+    def _version_changed(self) -> bool:
+        return self._read_version() != self._loaded_version
+
+    def _preload(self) -> None:
+        self._loaded_version = self._read_version()
+        if self.preload is not None:
+            started = time.perf_counter()
+            try:
+                info = self.preload()
+                print(f"[PREFORK] Preloaded in {time.perf_counter() - started:.2f}s: {info}", flush=True)
+            except Exception as e:
+                print(f"[PREFORK] Preload failed, workers will load on demand: {e}", flush=True)
+        gc.collect()
+        gc.freeze()
+
+    def _spawn(self) -> int:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._run_worker()
+            except BaseException:
+                code = WORKER_EXIT_ERROR
+            finally:
+                os._exit(code)
+        self._workers[pid] = time.monotonic()
+        print(f"[PREFORK] Worker {pid} started", flush=True)
+        return pid
+
+    def _run_worker(self) -> None:
+        import uvicorn
+
+        for signum in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+            signal.signal(signum, signal.SIG_DFL)
+        config = uvicorn.Config(self.app, lifespan="on", timeout_graceful_shutdown=self.graceful_timeout_s)
+        uvicorn.Server(config).run(sockets=[self._socket])
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if pid in self._retiring:
+                self._retiring.discard(pid)
+                continue
+            started_at = self._workers.pop(pid, None)
+            if started_at is None or self._stopping:
+                continue
+            print(f"[PREFORK] Worker {pid} exited ({_describe_exit(status)}); restarting", flush=True)
+            if time.monotonic() - started_at < MIN_WORKER_UPTIME_S:
+                time.sleep(RESPAWN_DELAY_S)
+            self.restarts += 1
+            self._spawn()
+
+    def _reload(self, reason: str) -> None:
+        old = list(self._workers)
+        self._preload()
+        for _ in range(self.workers):
+            self._spawn()
+        for pid in old:
+            self._workers.pop(pid, None)
+            self._retiring.add(pid)
+            self._signal(pid, signal.SIGTERM)
+        self.reloads += 1
+        print(f"[PREFORK] Replaced {len(old)} workers ({reason})", flush=True)
+
+    def _signal(self, pid: int, signum: int) -> None:
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def _shutdown(self) -> None:
+        pending = set(self._workers) | self._retiring
+        for pid in pending:
+            self._signal(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout_s + SHUTDOWN_EXTRA_S
+        while pending and time.monotonic() < deadline:
+            for pid in list(pending):
+                try:
+                    done, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    done = pid
+                if done:
+                    pending.discard(pid)
+            time.sleep(SUPERVISE_INTERVAL_S)
+        for pid in pending:
+            self._signal(pid, signal.SIGKILL)
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        self._workers.clear()
+        self._retiring.clear()
+        print("[PREFORK] Stopped", flush=True)
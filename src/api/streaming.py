@@ -0,0 +1,56 @@
+import json
+import time
+from typing import Any, AsyncIterator
+
+from starlette.requests import Request
+
+from src.core.infrastructure.metrics import CHAT_STREAM_TTFT_SECONDS
+
+__all__ = ["stream_chat_events", "format_sse"]
+
+PAYLOAD_INPUT = "input"
+PAYLOAD_FILTERS = "filters"
+FIELD_ANSWER = "answer"
+FIELD_CONTEXT = "context"
+EVENT_SOURCES = "sources"
+EVENT_TOKEN = "token"
+EVENT_DONE = "done"
+EVENT_ERROR = "error"
+ERROR_PREFIX = "LLM/Index error: "
+MS_PER_S = 1000
+
+def format_sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+async def stream_chat_events(chain, question: str, request: Request, filters: dict | None = None) -> AsyncIterator[str]:
+    started = time.perf_counter()
+    first_token_at = None
+    tokens = 0
+    stream = chain.astream({PAYLOAD_INPUT: question, PAYLOAD_FILTERS: filters})
+    try:
+        async for chunk in stream:
+            if await request.is_disconnected():
+                return
+            if FIELD_CONTEXT in chunk:
+                sources = [getattr(d, "metadata", {}) for d in chunk[FIELD_CONTEXT]]
+                yield format_sse(EVENT_SOURCES, {"sources": sources, "retrieval_ms": _elapsed_ms(started)})
+            token = chunk.get(FIELD_ANSWER)
+            if token:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                    CHAT_STREAM_TTFT_SECONDS.observe(first_token_at - started)
+                tokens += 1
+                yield format_sse(EVENT_TOKEN, {"token": token})
+    except Exception as e:
+        yield format_sse(EVENT_ERROR, {"detail": f"{ERROR_PREFIX}{e}"})
+        return
+    finally:
+        await stream.aclose()
+    yield format_sse(EVENT_DONE, {
+        "tokens": tokens,
+        "ttft_ms": round((first_token_at - started) * MS_PER_S, 1) if first_token_at else None,
+        "total_ms": _elapsed_ms(started),
+    })
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * MS_PER_S, 1)
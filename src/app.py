@@ -1,31 +1,98 @@
 import os
 import sys
+import time
 
+ENV_FILE = ".env"
 ENV_PORT = "PORT"
 ENV_RELOAD = "RELOAD"
 ENV_APP_MODE = "APP_MODE"
+ENV_BOOT_INDEX = "BOOT_INDEX"
+BOOT_INDEX_AUTO = "auto"
+BOOT_INDEX_ALWAYS = "always"
+BOOT_INDEX_NEVER = "never"
+DEFAULT_BOOT_INDEX = BOOT_INDEX_AUTO
 MODE_SERVE = "serve"
+MODE_INDEX = "index"
+FLAG_STREAM = "--stream"
+FLAG_WORKERS = "--workers"
+ENV_SERVE_WORKERS = "SERVE_WORKERS"
+ENV_WORKER_RELOAD_POLL_S = "WORKER_RELOAD_POLL_S"
+ENV_WORKER_GRACEFUL_TIMEOUT_S = "WORKER_GRACEFUL_TIMEOUT_S"
+HOST = "0.0.0.0"
 DEFAULT_PORT = 8080
 DEFAULT_RELOAD = "true"
+DEFAULT_SERVE_WORKERS = "1"
+DEFAULT_WORKER_RELOAD_POLL_S = "2"
+DEFAULT_WORKER_GRACEFUL_TIMEOUT_S = "30"
 
-def _build_index() -> None:
+def _build_index(streaming: bool | None = None, workers: int | None = None) -> None:
     from src.ingest.build_index import build_index
-    info = build_index()
+    info = build_index(streaming=streaming, workers=workers)
     print(f"[INDEX] {info}")
 
+def _boot_index(streaming: bool | None = None, workers: int | None = None) -> None:
+    policy = os.getenv(ENV_BOOT_INDEX, DEFAULT_BOOT_INDEX).lower()
+    if policy == BOOT_INDEX_NEVER:
+        print(f"[INDEX] Skipped ({ENV_BOOT_INDEX}={policy})")
+        return
+    if policy == BOOT_INDEX_AUTO:
+        from src.ingest.build_index import index_is_current
+        started = time.perf_counter()
+        if index_is_current():
+            print(f"[INDEX] Up to date, skipping rebuild (checked in {time.perf_counter() - started:.3f}s)")
+            return
+    _build_index(streaming, workers)
+
+def _index_options(argv: list[str]) -> tuple[bool | None, int | None]:
+    streaming = True if FLAG_STREAM in argv else None
+    workers = None
+    if FLAG_WORKERS in argv:
+        workers = int(argv[argv.index(FLAG_WORKERS) + 1])
+        streaming = True
+    return streaming, workers
+
 def _serve() -> None:
     import uvicorn
     port = int(os.getenv(ENV_PORT, str(DEFAULT_PORT)))
+    workers = int(os.getenv(ENV_SERVE_WORKERS, DEFAULT_SERVE_WORKERS))
+    if workers > 1:
+        from src.api.prefork import prefork_supported
+        if prefork_supported():
+            _serve_prefork(port, workers)
+            return
+        print(f"[PREFORK] os.fork is not available on this platform; ignoring {ENV_SERVE_WORKERS}={workers}")
     reload_enabled = os.getenv(ENV_RELOAD, DEFAULT_RELOAD).lower() == "true"
-    uvicorn.run("src.api.main:app", host="0.0.0.0", port=port, reload=reload_enabled)
+    uvicorn.run("src.api.main:app", host=HOST, port=port, reload=reload_enabled)
+
+def _serve_prefork(port: int, workers: int) -> None:
+    import src.api.main as api_main
+    from src.api.prefork import PreforkServer
+    from src.core.application.retriever import read_index_version
+
+    PreforkServer(
+        api_main.app,
+        HOST,
+        port,
+        workers,
+        preload=api_main.preload,
+        version=read_index_version,
+        poll_s=float(os.getenv(ENV_WORKER_RELOAD_POLL_S, DEFAULT_WORKER_RELOAD_POLL_S)),
+        graceful_timeout_s=int(os.getenv(ENV_WORKER_GRACEFUL_TIMEOUT_S, DEFAULT_WORKER_GRACEFUL_TIMEOUT_S)),
+    ).run()
 
 def main(argv: list[str] | None = None) -> int:
+    from dotenv import load_dotenv
+    load_dotenv(dotenv_path=ENV_FILE, override=True)
     argv = list(argv or sys.argv[1:])
-    mode = (argv[0].lower() if argv else os.getenv(ENV_APP_MODE, "").lower())
+    mode = (argv[0].lower() if argv and not argv[0].startswith("--") else os.getenv(ENV_APP_MODE, "").lower())
+    streaming, workers = _index_options(argv)
     if mode == MODE_SERVE:
         _serve()
         return 0
-    _build_index()
+    if mode == MODE_INDEX:
+        _build_index(streaming, workers)
+        return 0
+    _boot_index(streaming, workers)
     _serve()
     return 0
 
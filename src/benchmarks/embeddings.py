@@ -0,0 +1,120 @@
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from src.core.application.embedding_client import load_model, ENV_EMB_MODEL, DEFAULT_EMB_MODEL
+from src.core.infrastructure.onnx_embeddings import cosine_parity
+
+DEFAULT_BACKENDS = "torch,onnx,onnx-int8"
+REFERENCE_BACKEND = "torch"
+DEFAULT_REPEATS = 3
+DEFAULT_MIN_COSINE = 0.98
+DEFAULT_TOP_K = 5
+DEFAULT_OUTPUT_DIR = Path("data") / "benchmarks"
+OUTPUT_NAME_TEMPLATE = "embeddings-{stamp}.json"
+MS_PER_S = 1000
+PERCENTILES = (50, 95)
+QUERIES = (
+    "Who has C1 English?",
+    "Senior .NET developer with Azure experience",
+    "Which candidates know React and TypeScript?",
+    "Tech Lead with mentoring experience",
+    "Python and machine learning",
+    "QA automation engineer",
+)
+
+def corpus_texts() -> List[str]:
+    from src.ingest.build_index import load_candidate_records, to_documents
+
+    return [doc.page_content for doc in to_documents(load_candidate_records())]
+
+def measure(embeddings, texts: List[str], repeats: int) -> Dict[str, Any]:
+    embeddings.embed_documents(texts[:1])
+    started = time.perf_counter()
+    for _ in range(repeats):
+        vectors = embeddings.embed_documents(texts)
+    elapsed = time.perf_counter() - started
+    latencies = []
+    for query in QUERIES * repeats:
+        query_started = time.perf_counter()
+        embeddings.embed_query(query)
+        latencies.append((time.perf_counter() - query_started) * MS_PER_S)
+    values = np.percentile(latencies, PERCENTILES)
+    return {
+        "texts_per_s": round(len(texts) * repeats / elapsed, 1),
+        "query_latency": {f"p{p}_ms": round(float(v), 3) for p, v in zip(PERCENTILES, values)},
+        "vectors": vectors,
+        "queries": [embeddings.embed_query(query) for query in QUERIES],
+    }
+
+def top_k_agreement(reference: Dict[str, Any], candidate: Dict[str, Any], k: int) -> float:
+    def top(result: Dict[str, Any]) -> np.ndarray:
+        scores = np.asarray(result["queries"], dtype=np.float32) @ np.asarray(result["vectors"], dtype=np.float32).T
+        return np.argsort(-scores, axis=1, kind="stable")[:, :k]
+
+    expected, actual = top(reference), top(candidate)
+    overlaps = [len(set(a) & set(b)) / len(a) for a, b in zip(expected, actual)]
+    return round(float(np.mean(overlaps)), 4)
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Embedding backend parity and throughput on the CVs in data/input")
+    parser.add_argument("--backends", default=DEFAULT_BACKENDS)
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--min-cosine", type=float, default=DEFAULT_MIN_COSINE, help="Fail when a backend drifts below this cosine")
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K)
+    parser.add_argument("--output", help="Write the JSON report here (default: data/benchmarks/embeddings-<timestamp>.json)")
+    return parser
+
+def main(argv: List[str] | None = None) -> Dict[str, Any]:
+    args = _parser().parse_args(argv)
+    backends = [backend.strip() for backend in args.backends.split(",") if backend.strip()]
+    texts = corpus_texts()
+    report: Dict[str, Any] = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "model": os.getenv(ENV_EMB_MODEL, DEFAULT_EMB_MODEL),
+        "texts": len(texts),
+        "cpu_count": os.cpu_count(),
+        "backends": {},
+    }
+    results: Dict[str, Dict[str, Any]] = {}
+    for backend in backends:
+        started = time.perf_counter()
+        embeddings = load_model(backend)
+        load_s = time.perf_counter() - started
+        results[backend] = measure(embeddings, texts, args.repeats)
+        report["backends"][backend] = {
+            "load_s": round(load_s, 2),
+            "texts_per_s": results[backend]["texts_per_s"],
+            "query_latency": results[backend]["query_latency"],
+        }
+        print(f"[EMBED] {backend}: {results[backend]['texts_per_s']} texts/s, query {results[backend]['query_latency']}")
+
+    failed = []
+    reference = results.get(REFERENCE_BACKEND)
+    for backend, result in results.items():
+        if reference is None or backend == REFERENCE_BACKEND:
+            continue
+        parity = cosine_parity(reference["vectors"] + reference["queries"], result["vectors"] + result["queries"])
+        parity["top_k_agreement"] = top_k_agreement(reference, result, args.top_k)
+        parity["speedup"] = round(result["texts_per_s"] / reference["texts_per_s"], 2)
+        report["backends"][backend]["parity"] = parity
+        print(f"[EMBED] {backend} vs {REFERENCE_BACKEND}: {parity}")
+        if parity["min_cosine"] < args.min_cosine:
+            failed.append(backend)
+    report["parity_failed"] = failed
+
+    output = Path(args.output) if args.output else DEFAULT_OUTPUT_DIR / OUTPUT_NAME_TEMPLATE.format(stamp=datetime.now().strftime("%Y%m%d-%H%M%S"))
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"[EMBED] wrote {output}")
+    return report
+
+if __name__ == "__main__":
+    sys.exit(1 if main()["parity_failed"] else 0)
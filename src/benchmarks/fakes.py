@@ -0,0 +1,66 @@
+import asyncio
+import re
+import time
+import zlib
+from typing import Any, List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.core.infrastructure.lexical_index import tokenize
+
+DEFAULT_EMBEDDING_SIZE = 384
+MS_PER_S = 1000
+SIGN_BIT = 0x80000000
+REGEX_CANDIDATE = r"\[Candidate\] (\S+)"
+MAX_CITED_CANDIDATES = 3
+NO_MATCH_ANSWER = "No candidate in the context matches the question."
+
+class HashingEmbeddings(Embeddings):
+    def __init__(self, size: int = DEFAULT_EMBEDDING_SIZE, latency_ms_per_text: float = 0.0):
+        self.size = size
+        self.latency_ms_per_text = latency_ms_per_text
+
+    def _vector(self, text: str) -> List[float]:
+        vector = np.zeros(self.size, dtype=np.float32)
+        for token in tokenize(text):
+            bucket = zlib.crc32(token.encode("utf-8"))
+            vector[bucket % self.size] += -1.0 if bucket & SIGN_BIT else 1.0
+        norm = float(np.linalg.norm(vector))
+        if norm:
+            vector /= norm
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.latency_ms_per_text:
+            time.sleep(self.latency_ms_per_text * len(texts) / MS_PER_S)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+class FakeChatModel(BaseChatModel):
+    latency_ms: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "benchmark-fake"
+
+    def _answer(self, messages: List[BaseMessage]) -> ChatResult:
+        text = "\n".join(str(message.content) for message in messages)
+        cited = list(dict.fromkeys(re.findall(REGEX_CANDIDATE, text)))[:MAX_CITED_CANDIDATES]
+        answer = f"Candidates matching the question: {', '.join(cited)}." if cited else NO_MATCH_ANSWER
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=answer))])
+
+    def _generate(self, messages: List[BaseMessage], stop: List[str] | None = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / MS_PER_S)
+        return self._answer(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: List[str] | None = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / MS_PER_S)
+        return self._answer(messages)
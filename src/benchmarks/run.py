@@ -0,0 +1,284 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from src.benchmarks.synthetic import write_corpus, ROLES, SENIORITIES, LOCATIONS, DEFAULT_SEED
+
+DEFAULT_SIZES = "100,1000"
+DEFAULT_QUERIES = 200
+DEFAULT_REQUESTS = 200
+DEFAULT_CONCURRENCY = 16
+DEFAULT_LLM_LATENCY_MS = 50.0
+DEFAULT_EMB_LATENCY_MS = 0.0
+DEFAULT_OUTPUT_DIR = Path("data") / "benchmarks"
+OUTPUT_NAME_TEMPLATE = "bench-{stamp}.json"
+RESULT_MARKER = "[BENCH-RESULT] "
+INPUT_SUBDIR = "input"
+ENV_FILE_NAME = ".env.bench"
+MISSING_FILE_NAME = "missing.jsonl"
+PERCENTILES = (50, 95, 99)
+MS_PER_S = 1000
+BYTES_PER_MB = 1024 * 1024
+RSS_UNIT_BYTES = 1 if sys.platform == "darwin" else 1024
+HTTP_OK = 200
+FILTERED_ENGLISH_MIN = "B2"
+COMPARED_METRICS = (
+    ("ingest", "cvs_per_s", True),
+    ("index", "total_bytes", False),
+    ("retrieval", "p95_ms", False),
+    ("retrieval_filtered", "p95_ms", False),
+    ("chat", "p95_ms", False),
+    ("chat", "requests_per_s", True),
+    ("memory", "peak_rss_mb", False),
+)
+
+def benchmark_env(data_dir: Path, args: argparse.Namespace) -> Dict[str, str]:
+    return {
+        "DATA_DIR": str(data_dir),
+        "VECTOR_STORE": args.vector_store,
+        "RETRIEVAL_MODE": args.retrieval_mode,
+        "ANSWER_CACHE": "false",
+        "EMB_CACHE": "false",
+        "EMBEDING_INSTRUCTION_FILE": str(data_dir / MISSING_FILE_NAME),
+        "LLM_INSTRUCTION_FILE": str(data_dir / MISSING_FILE_NAME),
+    }
+
+def latency_summary(latencies_ms: List[float]) -> Dict[str, float]:
+    if not latencies_ms:
+        return {f"p{p}_ms": 0.0 for p in PERCENTILES}
+    values = np.percentile(latencies_ms, PERCENTILES)
+    summary = {f"p{p}_ms": round(float(v), 3) for p, v in zip(PERCENTILES, values)}
+    summary["mean_ms"] = round(float(np.mean(latencies_ms)), 3)
+    return summary
+
+def peak_rss_mb() -> float:
+    import resource
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * RSS_UNIT_BYTES / BYTES_PER_MB, 1)
+
+def directory_sizes(directory: Path) -> Dict[str, int]:
+    sizes: Dict[str, int] = {}
+    for path in directory.rglob("*"):
+        if path.is_file():
+            part = path.relative_to(directory).parts[0]
+            sizes[part] = sizes.get(part, 0) + path.stat().st_size
+    return {**dict(sorted(sizes.items())), "total_bytes": sum(sizes.values())}
+
+def benchmark_queries(count: int, seed: int) -> List[Dict[str, Any]]:
+    rng = np.random.default_rng(seed)
+    queries = []
+    for _ in range(count):
+        title, stack = ROLES[rng.integers(len(ROLES))]
+        seniority = SENIORITIES[rng.integers(len(SENIORITIES))][0]
+        skill = stack[rng.integers(len(stack))]
+        location = LOCATIONS[rng.integers(len(LOCATIONS))]
+        queries.append({
+            "question": f"{seniority} {title} with {skill} experience in {location}?",
+            "filters": {"skills": [skill.lower()], "english_level_min": FILTERED_ENGLISH_MIN},
+        })
+    return queries
+
+def _bench_ingest(args: argparse.Namespace, data_dir: Path, embeddings) -> Dict[str, Any]:
+    from src.ingest.build_index import build_index
+
+    started = time.perf_counter()
+    corpus_bytes = write_corpus(data_dir / INPUT_SUBDIR, args.size, args.seed)
+    generate_s = time.perf_counter() - started
+    started = time.perf_counter()
+    info = build_index(embeddings=embeddings, streaming=args.workers > 0, workers=args.workers)
+    build_s = time.perf_counter() - started
+    started = time.perf_counter()
+    noop = build_index(embeddings=embeddings, streaming=args.workers > 0, workers=args.workers)
+    noop_s = time.perf_counter() - started
+    return {
+        "cvs": info["candidates"],
+        "chunks": info["chunks"],
+        "corpus_bytes": corpus_bytes,
+        "generate_s": round(generate_s, 3),
+        "build_s": round(build_s, 3),
+        "cvs_per_s": round(info["candidates"] / build_s, 2) if build_s else 0.0,
+        "chunks_per_s": round(info["chunks"] / build_s, 2) if build_s else 0.0,
+        "noop_rebuild_s": round(noop_s, 3),
+        "noop_added": noop["added"],
+    }
+
+def _bench_retrieval(queries: List[Dict[str, Any]], embeddings, filtered: bool) -> Dict[str, Any]:
+    from src.core.application.agent import _build_packer, _build_retriever, _retrieval_k
+    from src.core.application.retriever import vector_store_persistent
+
+    retriever = _build_retriever(vector_store_persistent(embeddings), _retrieval_k(_build_packer()))
+    latencies, returned = [], 0
+    for query in queries:
+        started = time.perf_counter()
+        docs = retriever.invoke(query["question"], filters=query["filters"] if filtered else None)
+        latencies.append((time.perf_counter() - started) * MS_PER_S)
+        returned += len(docs)
+    return {"queries": len(queries), "docs_per_query": round(returned / max(1, len(queries)), 2), **latency_summary(latencies)}
+
+async def _bench_chat(args: argparse.Namespace, data_dir: Path, embeddings, queries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    import httpx
+    import src.api.main as api_main
+    from src.core.application.agent import build_chain
+    from src.core.application.chain_manager import ChainManager
+    from src.benchmarks.fakes import FakeChatModel
+
+    llm = FakeChatModel(latency_ms=args.llm_latency_ms)
+    api_main.chain_manager = ChainManager(
+        chain_factory=lambda emb: build_chain(emb, llm=llm),
+        embeddings_factory=lambda: embeddings,
+        env_file=data_dir / ENV_FILE_NAME,
+    )
+    api_main.chain_manager.refresh(force=True)
+
+    gate = asyncio.Semaphore(args.concurrency)
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+
+    async def send(client, query: Dict[str, Any]) -> None:
+        async with gate:
+            started = time.perf_counter()
+            response = await client.post(api_main.ROUTE_CHAT, json=query)
+            elapsed = (time.perf_counter() - started) * MS_PER_S
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+        if response.status_code == HTTP_OK:
+            latencies.append(elapsed)
+
+    payloads = [queries[i % len(queries)] for i in range(args.requests)]
+    transport = httpx.ASGITransport(app=api_main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*[send(client, payload) for payload in payloads])
+        wall_s = time.perf_counter() - started
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "llm_latency_ms": args.llm_latency_ms,
+        "statuses": statuses,
+        "wall_s": round(wall_s, 3),
+        "requests_per_s": round(args.requests / wall_s, 2) if wall_s else 0.0,
+        **latency_summary(latencies),
+    }
+
+def run_size(args: argparse.Namespace, data_dir: Path) -> Dict[str, Any]:
+    import src.core.application.agent
+    os.environ.update(benchmark_env(data_dir, args))
+    from src.benchmarks.fakes import HashingEmbeddings
+    from src.core.application.retriever import index_dir
+
+    embeddings = HashingEmbeddings(latency_ms_per_text=args.emb_latency_ms)
+    queries = benchmark_queries(args.queries, args.seed)
+    result: Dict[str, Any] = {"size": args.size, "ingest": _bench_ingest(args, data_dir, embeddings)}
+    result["index"] = directory_sizes(index_dir())
+    result["memory"] = {"after_ingest_rss_mb": peak_rss_mb()}
+    result["retrieval"] = _bench_retrieval(queries, embeddings, filtered=False)
+    result["retrieval_filtered"] = _bench_retrieval(queries, embeddings, filtered=True)
+    result["chat"] = asyncio.run(_bench_chat(args, data_dir, embeddings, queries))
+    result["memory"]["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+def _run_size_subprocess(args: argparse.Namespace, size: int, argv: List[str]) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="candidate-rag-bench-") as tmp:
+        command = [sys.executable, "-m", "src.benchmarks.run", *argv, "--size", str(size), "--data-dir", tmp]
+        env = {**os.environ, **benchmark_env(Path(tmp), args)}
+        completed = subprocess.run(command, env=env, stdout=subprocess.PIPE, text=True)
+    result = None
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            result = json.loads(line[len(RESULT_MARKER):])
+    if completed.returncode != 0 or result is None:
+        print(completed.stdout)
+        raise RuntimeError(f"Benchmark for size={size} failed with exit code {completed.returncode}")
+    return result
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    lines = []
+    previous_by_size = {row["size"]: row for row in previous.get("results", [])}
+    for row in current["results"]:
+        before = previous_by_size.get(row["size"])
+        if before is None:
+            continue
+        for section, metric, higher_is_better in COMPARED_METRICS:
+            old, new = before.get(section, {}).get(metric), row.get(section, {}).get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            worse = change < 0 if higher_is_better else change > 0
+            lines.append(f"[BENCH] size={row['size']} {section}.{metric} {old} -> {new} ({change:+.1f}%{' worse' if worse else ''})")
+    return lines
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Offline benchmarks with synthetic CVs, fake embeddings and a fake LLM")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma separated corpus sizes (number of CVs)")
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES)
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS, help="/chat requests per size")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Concurrent /chat clients")
+    parser.add_argument("--llm-latency-ms", type=float, default=DEFAULT_LLM_LATENCY_MS)
+    parser.add_argument("--emb-latency-ms", type=float, default=DEFAULT_EMB_LATENCY_MS, help="Simulated embedding cost per text")
+    parser.add_argument("--workers", type=int, default=0, help="Streaming ingest workers (0 = sequential ingest)")
+    parser.add_argument("--vector-store", default="chroma", choices=("chroma", "faiss"))
+    parser.add_argument("--retrieval-mode", default="hybrid", choices=("hybrid", "vector"))
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--output", help="Write the JSON report here (default: data/benchmarks/bench-<timestamp>.json)")
+    parser.add_argument("--baseline", help="Previous JSON report to compare against")
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--data-dir", help=argparse.SUPPRESS)
+    return parser
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main(argv: List[str] | None = None) -> Dict[str, Any]:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    args = _parser().parse_args(argv)
+    if args.size is not None:
+        result = run_size(args, Path(args.data_dir))
+        print(RESULT_MARKER + json.dumps(result), flush=True)
+        return result
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8")) if args.baseline else None
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("size", "data_dir", "output", "baseline")},
+        "results": [],
+    }
+    for size in sizes:
+        print(f"[BENCH] size={size}", flush=True)
+        row = _run_size_subprocess(args, size, argv)
+        report["results"].append(row)
+        print(
+            f"[BENCH] size={size} ingest={row['ingest']['cvs_per_s']} CVs/s index={row['index']['total_bytes']} B "
+            f"retrieval p50/p95/p99={row['retrieval']['p50_ms']}/{row['retrieval']['p95_ms']}/{row['retrieval']['p99_ms']} ms "
+            f"chat p50/p95/p99={row['chat']['p50_ms']}/{row['chat']['p95_ms']}/{row['chat']['p99_ms']} ms "
+            f"peak_rss={row['memory']['peak_rss_mb']} MB",
+            flush=True,
+        )
+
+    output = Path(args.output) if args.output else DEFAULT_OUTPUT_DIR / OUTPUT_NAME_TEMPLATE.format(stamp=datetime.now().strftime("%Y%m%d-%H%M%S"))
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"[BENCH] wrote {output}")
+    if baseline is not None:
+        for line in compare(baseline, report):
+            print(line)
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+DEFAULT_MODULES = "src.api.main,src.ingest.build_index,src.core.application.agent"
+DEFAULT_REPEATS = 5
+DEFAULT_CVS = 200
+DEFAULT_TIMEOUT_S = 120.0
+DEFAULT_TOP_IMPORTS = 10
+DEFAULT_OUTPUT_DIR = Path("data") / "benchmarks"
+OUTPUT_NAME_TEMPLATE = "startup-{stamp}.json"
+POLL_INTERVAL_S = 0.02
+HTTP_TIMEOUT_S = 1.0
+HTTP_OK = 200
+LOCALHOST = "127.0.0.1"
+ROUTE_HEALTH = "/health"
+ROUTE_READY = "/ready"
+INPUT_SUBDIR = "input"
+MISSING_FILE_NAME = "missing.jsonl"
+IMPORTTIME_PREFIX = "import time:"
+US_PER_MS = 1000
+BOOT_POLICIES = ("auto", "always")
+
+def import_seconds(module: str) -> float:
+    code = f"import time; started = time.perf_counter(); import {module}; print(time.perf_counter() - started)"
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(completed.stdout.strip().splitlines()[-1])
+
+def top_imports(module: str, count: int) -> List[Dict[str, Any]]:
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True)
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith(IMPORTTIME_PREFIX) or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len(IMPORTTIME_PREFIX):].split("|")
+        rows.append({"module": name.strip(), "cumulative_ms": round(int(cumulative) / US_PER_MS, 1), "depth": (len(name) - len(name.lstrip())) // 2})
+    shallow = [row for row in rows if row["depth"] <= 1]
+    return sorted(shallow, key=lambda row: row["cumulative_ms"], reverse=True)[:count]
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((LOCALHOST, 0))
+        return sock.getsockname()[1]
+
+def _get(url: str) -> tuple[int | None, dict | None]:
+    try:
+        with urllib.request.urlopen(url, timeout=HTTP_TIMEOUT_S) as response:
+            return response.status, json.loads(response.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"null")
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        return None, None
+
+def _bench_env(data_dir: Path) -> Dict[str, str]:
+    return {
+        **os.environ,
+        "DATA_DIR": str(data_dir),
+        "EMBEDING_INSTRUCTION_FILE": str(data_dir / MISSING_FILE_NAME),
+        "LLM_INSTRUCTION_FILE": str(data_dir / MISSING_FILE_NAME),
+        "EMB_CACHE": "false",
+        "RELOAD": "false",
+    }
+
+def prepare_index(data_dir: Path, cvs: int) -> Dict[str, Any]:
+    from src.benchmarks.synthetic import write_corpus
+    from src.benchmarks.fakes import HashingEmbeddings
+    from src.ingest.build_index import build_index
+
+    write_corpus(data_dir / INPUT_SUBDIR, cvs)
+    return build_index(embeddings=HashingEmbeddings())
+
+def boot(data_dir: Path, policy: str, timeout_s: float) -> Dict[str, Any]:
+    port = _free_port()
+    env = {**_bench_env(data_dir), "PORT": str(port), "BOOT_INDEX": policy}
+    base = f"http://{LOCALHOST}:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-m", "src.app"], env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    health_s = ready_s = None
+    ready = None
+    try:
+        while time.perf_counter() - started < timeout_s and process.poll() is None:
+            if health_s is None and _get(base + ROUTE_HEALTH)[0] == HTTP_OK:
+                health_s = time.perf_counter() - started
+            if health_s is not None:
+                status, ready = _get(base + ROUTE_READY)
+                if status == HTTP_OK or (ready and ready.get("warmup_s") is not None):
+                    ready_s = time.perf_counter() - started if status == HTTP_OK else None
+                    break
+            time.sleep(POLL_INTERVAL_S)
+    finally:
+        process.terminate()
+        output, _ = process.communicate(timeout=timeout_s)
+    index_lines = [line for line in output.splitlines() if line.startswith("[INDEX]")]
+    return {
+        "boot_index": policy,
+        "health_s": round(health_s, 3) if health_s is not None else None,
+        "ready_s": round(ready_s, 3) if ready_s is not None else None,
+        "chain_status": (ready or {}).get("status"),
+        "chain_error": (ready or {}).get("error"),
+        "warmup_s": (ready or {}).get("warmup_s"),
+        "index_log": index_lines,
+    }
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Import-time and cold-start measurements")
+    parser.add_argument("--modules", default=DEFAULT_MODULES)
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP_IMPORTS)
+    parser.add_argument("--cvs", type=int, default=DEFAULT_CVS, help="Synthetic CVs indexed before booting the app")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_S)
+    parser.add_argument("--skip-boot", action="store_true", help="Only measure import times")
+    parser.add_argument("--output", help="Write the JSON report here (default: data/benchmarks/startup-<timestamp>.json)")
+    parser.add_argument("--prepare-index", help=argparse.SUPPRESS)
+    return parser
+
+def main(argv: List[str] | None = None) -> Dict[str, Any]:
+    args = _parser().parse_args(argv)
+    if args.prepare_index:
+        info = prepare_index(Path(args.prepare_index), args.cvs)
+        print(json.dumps(info))
+        return info
+
+    modules = [module.strip() for module in args.modules.split(",") if module.strip()]
+    report: Dict[str, Any] = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "imports": {},
+        "top_imports": top_imports(modules[0], args.top) if modules else [],
+        "boot": [],
+    }
+    for module in modules:
+        samples = [import_seconds(module) for _ in range(args.repeats)]
+        report["imports"][module] = {"median_s": round(statistics.median(samples), 3), "min_s": round(min(samples), 3)}
+        print(f"[STARTUP] import {module}: median={report['imports'][module]['median_s']}s")
+
+    if not args.skip_boot:
+        with tempfile.TemporaryDirectory(prefix="candidate-rag-startup-") as tmp:
+            data_dir = Path(tmp)
+            subprocess.run(
+                [sys.executable, "-m", "src.benchmarks.startup", "--prepare-index", tmp, "--cvs", str(args.cvs)],
+                env=_bench_env(data_dir), capture_output=True, text=True, check=True,
+            )
+            for policy in BOOT_POLICIES:
+                row = boot(data_dir, policy, args.timeout)
+                report["boot"].append(row)
+                print(f"[STARTUP] BOOT_INDEX={policy}: /health after {row['health_s']}s, chain {row['chain_status']} (warm-up {row['warmup_s']}s)")
+
+    output = Path(args.output) if args.output else DEFAULT_OUTPUT_DIR / OUTPUT_NAME_TEMPLATE.format(stamp=datetime.now().strftime("%Y%m%d-%H%M%S"))
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"[STARTUP] wrote {output}")
+    return report
+
+if __name__ == "__main__":
+    main()
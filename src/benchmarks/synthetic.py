@@ -0,0 +1,142 @@
+import json
+import random
+from pathlib import Path
+from typing import Any, Dict, List
+
+DEFAULT_SEED = 42
+FILE_ENCODING = "utf-8"
+FILE_NAME_TEMPLATE = "synthetic_{index:06d}.json"
+FIRST_NAMES = (
+    "Lucia", "Martin", "Sofia", "Mateo", "Valentina", "Diego", "Camila", "Joaquin", "Elena", "Tomas",
+    "Ana", "Pablo", "Julia", "Andrei", "Maria", "Ioana", "Marco", "Giulia", "Jan", "Laura",
+)
+LAST_NAMES = (
+    "Garcia", "Fernandez", "Lopez", "Martinez", "Rossi", "Bianchi", "Popescu", "Ionescu", "Silva", "Costa",
+    "Romero", "Alvarez", "Moreno", "Ricci", "Novak", "Kowalski", "Schmidt", "Dubois", "Santos", "Herrera",
+)
+ROLES = (
+    ("Backend Developer", ("C#", ".NET", "ASP.NET Core", "Entity Framework", "SQL Server", "Azure", "REST APIs", "Microservices")),
+    ("Java Developer", ("Java", "Spring Boot", "Hibernate", "Kafka", "PostgreSQL", "Docker", "Maven", "JUnit")),
+    ("Frontend Developer", ("React", "TypeScript", "Next.js", "Redux", "CSS", "Jest", "Webpack", "Figma")),
+    ("Python Developer", ("Python", "Django", "FastAPI", "Celery", "PostgreSQL", "Redis", "Pandas", "AWS")),
+    ("QA Engineer", ("Selenium", "Cypress", "Postman", "Test Automation", "Jira", "API Testing", "Playwright", "SQL")),
+    ("DevOps Engineer", ("Kubernetes", "Terraform", "AWS", "CI/CD", "Docker", "Prometheus", "Linux", "Ansible")),
+    ("Data Engineer", ("Python", "Spark", "Airflow", "SQL", "dbt", "Snowflake", "Kafka", "GCP")),
+    ("Mobile Developer", ("Kotlin", "Swift", "Flutter", "Firebase", "REST APIs", "Android", "iOS", "GraphQL")),
+)
+SOFT_SKILLS = ("Mentoring", "Technical Leadership", "Communication", "Agile", "Scrum", "Problem Solving")
+SKILL_LEVELS = ("Low", "Medium", "High", "Very High")
+SENIORITIES = (("Junior", 0, 2), ("Mid", 2, 5), ("Senior", 5, 12), ("Lead", 8, 20))
+ENGLISH_LEVELS = (("Intermediate", "B1"), ("Upper Intermediate", "B2"), ("Advanced", "C1"), ("Proficient", "C2"))
+OTHER_LANGUAGES = ("Spanish", "Italian", "Romanian", "Portuguese", "German", "French")
+LOCATIONS = (
+    "Barcelona, Spain", "Madrid, Spain", "Buenos Aires, Argentina", "Rosario, Argentina", "Arad, Romania",
+    "Bucharest, Romania", "Milan, Italy", "Lisbon, Portugal", "Montevideo, Uruguay", "Berlin, Germany",
+)
+COMPANIES = ("Globant", "Nagarro", "Endava", "Accenture", "Mercado Libre", "Thoughtworks", "EPAM", "Capgemini", "Ualá", "Despegar")
+UNIVERSITIES = ("Universidad de Buenos Aires", "Universitat Politècnica de Catalunya", "Politehnica Bucharest", "Politecnico di Milano")
+ACHIEVEMENTS = (
+    "Reduced API latency by {n}% by introducing caching and query tuning.",
+    "Led a team of {n} engineers through a monolith to services migration.",
+    "Raised automated test coverage to {n}% and cut regressions in half.",
+    "Shipped {n} production releases per month with zero-downtime deployments.",
+    "Mentored {n} junior developers through code reviews and pairing.",
+)
+KEYWORDS_POOL = ("Cloud", "Agile", "CI/CD", "DevOps", "Microservices", "Testing", "API", "Architecture", "Scrum", "Backend", "Frontend")
+MAX_JOBS = 4
+
+def synthetic_cv(index: int, seed: int = DEFAULT_SEED) -> Dict[str, Any]:
+    rng = random.Random(seed * 1_000_003 + index)
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    title, stack = rng.choice(ROLES)
+    seniority, min_years, max_years = rng.choice(SENIORITIES)
+    years = rng.randint(min_years, max_years)
+    english_name, english_level = rng.choice(ENGLISH_LEVELS)
+    other_language = rng.choice(OTHER_LANGUAGES)
+    location = rng.choice(LOCATIONS) + (" (Remote)" if rng.random() < 0.3 else "")
+    skills = rng.sample(stack, rng.randint(4, len(stack))) + rng.sample(SOFT_SKILLS, 2)
+    detected = [skill for skill in skills if rng.random() < 0.6]
+    missing = rng.sample(KEYWORDS_POOL, 4)
+    general_score = rng.randint(40, 98)
+    candidate_id = f"{first}{last}{index:06d}"
+    full_title = f"{seniority} {title}"
+
+    skill_matrix = [
+        {"SkillName": skill, "SkillLevel": rng.choice(SKILL_LEVELS), "Evidence": f"Used {skill} in recent projects"}
+        for skill in skills
+    ]
+    languages = [
+        {"Language": "English", "Proficiency": english_name, "Evidence": f"English ({english_level})"},
+        {"Language": other_language, "Proficiency": "Native", "Evidence": f"{other_language} (Native)"},
+    ]
+    return {
+        "GeneralInfo": {
+            "CandidateId": candidate_id,
+            "Fullname": f"{first} {last}",
+            "TitleDetected": full_title,
+            "TitlePredicted": title,
+            "SeniorityLevel": seniority,
+            "YearsExperience": years,
+            "RelevantYears": max(0, years - rng.randint(0, 2)),
+            "IndustryMatch": f"Good alignment with {title} roles",
+            "TrajectoryPattern": rng.choice(("Stable", "Ascending", "Variable")),
+            "MainIndustry": "Software Development / IT",
+            "EnglishLevel": f"{english_name} ({english_level})",
+            "OtherLanguages": [languages[1]],
+            "Location": location,
+        },
+        "SkillMatrix": skill_matrix,
+        "KeywordCoverage": {
+            "KeywordsDetected": detected,
+            "KeywordsMissing": missing,
+            "Density": rng.randint(10, 80),
+            "Context": f"Stack keywords for {title} appear in the experience section.",
+        },
+        "Languages": languages,
+        "Scores": {
+            "GeneralScore": general_score,
+            "ATSCompatibility": rng.randint(40, 98),
+            "ClarityScore": rng.randint(40, 98),
+            "FormattingScore": rng.randint(40, 98),
+            "KeywordDensity": rng.randint(10, 80),
+            "EnglishProficiency": rng.randint(40, 98),
+            "SeniorityMatch": rng.randint(40, 98),
+            "SkillCoverage": rng.randint(40, 98),
+        },
+        "Relevance": {"TitleMatch": rng.randint(40, 98), "ResponsibilityMatch": rng.randint(40, 98), "OverallFit": general_score},
+        "ClarityAndFormatting": {"ClarityScore": rng.randint(40, 98), "FormattingScore": rng.randint(40, 98), "SpellingErrors": rng.randint(0, 5)},
+        "Summary": (
+            f"{full_title} with {years} years of experience in {', '.join(skills[:3])}. "
+            f"{english_name} English ({english_level}) and native {other_language}. Based in {location}."
+        ),
+        "Strengths": [f"Hands-on experience with {skill}" for skill in skills[:3]],
+        "AreasToImprove": [f"Add evidence of {keyword} work" for keyword in missing[:2]],
+        "Tips": ["Quantify achievements with metrics", f"Mention {missing[0]} experience explicitly"],
+        "CleanedResumeText": _resume_text(rng, first, last, full_title, location, skills, years, english_level, other_language),
+    }
+
+def _resume_text(
+    rng: random.Random, first: str, last: str, title: str, location: str, skills: List[str], years: int, english_level: str, other_language: str,
+) -> str:
+    lines = [f"{first} {last}", f"{title} | {location}", f"Email: {first.lower()}.{last.lower()}@example.com", ""]
+    lines += ["SKILLS", ", ".join(skills), "", "LANGUAGES", f"English ({english_level}), {other_language} (Native)", ""]
+    lines.append("EXPERIENCE")
+    end_year = 2025
+    for _ in range(min(MAX_JOBS, 1 + years // 3)):
+        start_year = end_year - rng.randint(1, 4)
+        lines.append(f"{title} – {rng.choice(COMPANIES)} ({start_year} – {end_year})")
+        for template in rng.sample(ACHIEVEMENTS, 2):
+            lines.append("• " + template.format(n=rng.randint(2, 60)))
+        lines.append("• Technologies: " + ", ".join(rng.sample(skills, min(4, len(skills)))))
+        end_year = start_year
+    lines += ["", "EDUCATION", f"Bachelor's Degree in Computer Science – {rng.choice(UNIVERSITIES)} ({end_year - 5} – {end_year - 1})"]
+    return "\n".join(lines)
+
+def write_corpus(directory: Path, count: int, seed: int = DEFAULT_SEED) -> int:
+    directory.mkdir(parents=True, exist_ok=True)
+    written = 0
+    for index in range(count):
+        path = directory / FILE_NAME_TEMPLATE.format(index=index)
+        path.write_text(json.dumps(synthetic_cv(index, seed), ensure_ascii=False), encoding=FILE_ENCODING)
+        written += path.stat().st_size
+    return written
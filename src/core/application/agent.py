@@ -1,14 +1,13 @@
 import os
-from dotenv import load_dotenv
-from langchain_ollama import ChatOllama
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableLambda, RunnablePassthrough
 from langchain.chains.combine_documents import create_stuff_documents_chain
-from langchain.chains import create_retrieval_chain
 
-load_dotenv(dotenv_path=".env", override=True)
+from src.core.infrastructure.metrics import (
+    MetricsCallbackHandler, STAGE_CHAIN, STAGE_RETRIEVE, STAGE_PACK_CONTEXT, STAGE_FORMAT_DOCS,
+)
 
-__all__ = ["build_chain", "build_index"]
+__all__ = ["build_chain", "build_index", "load_llm"]
 
 ENV_LLM_PROVIDER = "LLM_PROVIDER"
 ENV_LLM_MODEL = "LLM_MODEL"
@@ -20,51 +19,178 @@ LLM_PROVIDER_OLLAMA = "ollama"
 LLM_PROVIDER_OPENAI = "openai"
 DEFAULT_OLLAMA_BASE_URL = "http://localhost:11434"
 DEFAULT_OPENAI_MODEL = "gpt-5-mini"
+DEFAULT_OPENAI_BASE_URL = "https://api.openai.com/v1"
+ENV_LLM_POOL_MAX_CONNECTIONS = "LLM_POOL_MAX_CONNECTIONS"
+ENV_LLM_POOL_KEEPALIVE_S = "LLM_POOL_KEEPALIVE_S"
+ENV_LLM_EJECT_AFTER_FAILURES = "LLM_EJECT_AFTER_FAILURES"
+ENV_LLM_EJECT_S = "LLM_EJECT_S"
+ENV_LLM_HEDGE_AFTER_MS = "LLM_HEDGE_AFTER_MS"
+DEFAULT_LLM_POOL_MAX_CONNECTIONS = "32"
+DEFAULT_LLM_POOL_KEEPALIVE_S = "60"
+DEFAULT_LLM_EJECT_AFTER_FAILURES = "3"
+DEFAULT_LLM_EJECT_S = "30"
+DEFAULT_LLM_HEDGE_AFTER_MS = "0"
+MS_PER_S = 1000
 PROMPT_SYSTEM_FILE = "chat_system.txt"
 PROMPT_HUMAN_FILE = "chat_human.txt"
 RETRIEVER_TOP_K = 6
 TEMPERATURE_ZERO = 0
+PAYLOAD_INPUT = "input"
+PAYLOAD_FILTERS = "filters"
+PAYLOAD_QUERY_EMBEDDING = "query_embedding"
 ENV_RETRIEVAL_TYPES = "RETRIEVAL_TYPES"
 DEFAULT_RETRIEVAL_TYPES = "candidate"
+ENV_RETRIEVAL_MODE = "RETRIEVAL_MODE"
+ENV_HYBRID_FETCH_K = "HYBRID_FETCH_K"
+ENV_HYBRID_RRF_K = "HYBRID_RRF_K"
+RETRIEVAL_MODE_HYBRID = "hybrid"
+RETRIEVAL_MODE_VECTOR = "vector"
+DEFAULT_RETRIEVAL_MODE = RETRIEVAL_MODE_HYBRID
+DEFAULT_HYBRID_FETCH_K = "20"
+DEFAULT_HYBRID_RRF_K = "60"
+ENV_CONTEXT_PACKING = "CONTEXT_PACKING"
+ENV_CONTEXT_FETCH_K = "CONTEXT_FETCH_K"
+ENV_CONTEXT_TOKEN_BUDGET = "CONTEXT_TOKEN_BUDGET"
+ENV_CONTEXT_MAX_PER_CANDIDATE = "CONTEXT_MAX_PER_CANDIDATE"
+ENV_CONTEXT_MMR_LAMBDA = "CONTEXT_MMR_LAMBDA"
+ENV_CONTEXT_DEBUG = "CONTEXT_DEBUG"
+DEFAULT_CONTEXT_PACKING = "true"
+DEFAULT_CONTEXT_FETCH_K = "20"
+DEFAULT_CONTEXT_TOKEN_BUDGET = "800"
+DEFAULT_CONTEXT_MAX_PER_CANDIDATE = "3"
+DEFAULT_CONTEXT_MMR_LAMBDA = "0.7"
+DEFAULT_CONTEXT_DEBUG = "false"
+RUN_NAME_CHAIN = "retrieval_chain"
+RUN_NAME_RETRIEVE = "retrieve_documents"
+RUN_NAME_PACK = "pack_context"
+RUN_NAME_FORMAT_DOCS = "format_inputs"
+CHAIN_STAGES = {
+    RUN_NAME_CHAIN: STAGE_CHAIN,
+    RUN_NAME_RETRIEVE: STAGE_RETRIEVE,
+    RUN_NAME_PACK: STAGE_PACK_CONTEXT,
+    RUN_NAME_FORMAT_DOCS: STAGE_FORMAT_DOCS,
+}
 
-def _load_llm():
+metrics_callback = MetricsCallbackHandler(CHAIN_STAGES)
+
+def _llm_transport(base_url: str):
+    from src.core.infrastructure.llm_pool import shared_transport, parse_backend_urls
+
+    backends = parse_backend_urls(base_url)
+    transport = shared_transport(
+        backends,
+        max_connections=int(os.getenv(ENV_LLM_POOL_MAX_CONNECTIONS, DEFAULT_LLM_POOL_MAX_CONNECTIONS)),
+        keepalive_s=float(os.getenv(ENV_LLM_POOL_KEEPALIVE_S, DEFAULT_LLM_POOL_KEEPALIVE_S)),
+        eject_after_failures=int(os.getenv(ENV_LLM_EJECT_AFTER_FAILURES, DEFAULT_LLM_EJECT_AFTER_FAILURES)),
+        eject_s=float(os.getenv(ENV_LLM_EJECT_S, DEFAULT_LLM_EJECT_S)),
+        hedge_after_s=float(os.getenv(ENV_LLM_HEDGE_AFTER_MS, DEFAULT_LLM_HEDGE_AFTER_MS)) / MS_PER_S,
+    )
+    return backends[0], transport
+
+def load_llm():
     provider = os.getenv(ENV_LLM_PROVIDER)
     model_name = os.getenv(ENV_LLM_MODEL)
     if not provider:
         raise RuntimeError("Missing LLM_PROVIDER in .env")
     provider = provider.lower()
     if provider == LLM_PROVIDER_OLLAMA:
-        base_url = os.getenv(ENV_OLLAMA_BASE_URL, DEFAULT_OLLAMA_BASE_URL)
-        return ChatOllama(model=model_name, base_url=base_url, temperature=TEMPERATURE_ZERO)
+        from langchain_ollama import ChatOllama
+        base_url, transport = _llm_transport(os.getenv(ENV_OLLAMA_BASE_URL, DEFAULT_OLLAMA_BASE_URL))
+        return ChatOllama(model=model_name, base_url=base_url, temperature=TEMPERATURE_ZERO, client_kwargs={"transport": transport})
     if provider == LLM_PROVIDER_OPENAI:
-        base_url = os.getenv(ENV_OPENAI_BASE_URL)
+        import httpx
+        from langchain_openai import ChatOpenAI
         api_key = os.getenv(ENV_OPENAI_API_KEY)
         if not api_key:
             raise RuntimeError("Missing OPENAI_API_KEY in .env for provider=openai")
+        base_url, transport = _llm_transport(os.getenv(ENV_OPENAI_BASE_URL) or DEFAULT_OPENAI_BASE_URL)
         enable_preview = os.getenv(ENV_ENABLE_GPT5_MINI, "true").lower() == "true"
         effective_model = (DEFAULT_OPENAI_MODEL if enable_preview else model_name) or DEFAULT_OPENAI_MODEL
-        return ChatOpenAI(model=effective_model, base_url=base_url, api_key=api_key, temperature=TEMPERATURE_ZERO)
+        return ChatOpenAI(
+            model=effective_model,
+            base_url=base_url,
+            api_key=api_key,
+            temperature=TEMPERATURE_ZERO,
+            http_client=httpx.Client(transport=transport),
+            http_async_client=httpx.AsyncClient(transport=transport),
+        )
     raise ValueError(f"Unsupported LLM_PROVIDER: {provider}")
 
-def build_chain():
+def build_chain(embeddings=None, llm=None):
     from src.core.application.embedding_client import load_embeddings
-    from src.core.application.retriever import chroma_persistent
+    from src.core.application.retriever import vector_store_persistent, read_index_version, index_dir
     from src.core.application.prompting import load_prompt
 
-    embeddings = load_embeddings()
-    vector_store = chroma_persistent(embeddings)
-    types = os.getenv(ENV_RETRIEVAL_TYPES, DEFAULT_RETRIEVAL_TYPES)
-    metadata_filter = {"type": {"$in": [t.strip() for t in types.split(",") if t.strip()]}}
-    retriever = vector_store.as_retriever(search_kwargs={"k": RETRIEVER_TOP_K, "filter": metadata_filter})
+    embeddings = embeddings or load_embeddings()
+    version = read_index_version()
+    vector_store = vector_store_persistent(embeddings, directory=index_dir(version))
+    packer = _build_packer()
+    retriever = _build_retriever(vector_store, _retrieval_k(packer), version)
     system_prompt = load_prompt(PROMPT_SYSTEM_FILE)
     human_prompt = load_prompt(PROMPT_HUMAN_FILE)
     prompt = ChatPromptTemplate.from_messages([
         ("system", system_prompt),
         ("human", human_prompt),
     ])
-    llm = _load_llm()
+    llm = llm or load_llm()
     doc_chain = create_stuff_documents_chain(llm, prompt)
-    return create_retrieval_chain(retriever, doc_chain)
+    return _retrieval_chain(retriever, doc_chain, packer)
+
+def _build_packer():
+    from src.core.application.context_packer import ContextPacker
+
+    if os.getenv(ENV_CONTEXT_PACKING, DEFAULT_CONTEXT_PACKING).lower() != "true":
+        return None
+    return ContextPacker(
+        token_budget=int(os.getenv(ENV_CONTEXT_TOKEN_BUDGET, DEFAULT_CONTEXT_TOKEN_BUDGET)),
+        max_per_candidate=int(os.getenv(ENV_CONTEXT_MAX_PER_CANDIDATE, DEFAULT_CONTEXT_MAX_PER_CANDIDATE)),
+        mmr_lambda=float(os.getenv(ENV_CONTEXT_MMR_LAMBDA, DEFAULT_CONTEXT_MMR_LAMBDA)),
+        baseline_k=RETRIEVER_TOP_K,
+        report=print if os.getenv(ENV_CONTEXT_DEBUG, DEFAULT_CONTEXT_DEBUG).lower() == "true" else None,
+    )
+
+def _retrieval_k(packer) -> int:
+    if packer is None:
+        return RETRIEVER_TOP_K
+    return int(os.getenv(ENV_CONTEXT_FETCH_K, DEFAULT_CONTEXT_FETCH_K))
+
+def _retrieval_chain(retriever, doc_chain, packer=None):
+    def retrieve(payload: dict):
+        return retriever.invoke(
+            payload[PAYLOAD_INPUT], filters=payload.get(PAYLOAD_FILTERS), embedding=payload.get(PAYLOAD_QUERY_EMBEDDING)
+        )
+
+    async def aretrieve(payload: dict):
+        return await retriever.ainvoke(
+            payload[PAYLOAD_INPUT], filters=payload.get(PAYLOAD_FILTERS), embedding=payload.get(PAYLOAD_QUERY_EMBEDDING)
+        )
+
+    retrieve_documents = RunnableLambda(retrieve, afunc=aretrieve).with_config(run_name=RUN_NAME_RETRIEVE)
+    if packer is not None:
+        retrieve_documents = retrieve_documents | RunnableLambda(packer.pack).with_config(run_name=RUN_NAME_PACK)
+    return (
+        RunnablePassthrough.assign(context=retrieve_documents)
+        .assign(answer=doc_chain)
+        .with_config(run_name=RUN_NAME_CHAIN, callbacks=[metrics_callback])
+    )
+
+def _build_retriever(vector_store, k: int = RETRIEVER_TOP_K, version: str | None = None):
+    from src.core.application.retriever import load_lexical_index, load_attribute_index
+    from src.core.application.hybrid_retriever import HybridRetriever
+
+    types_env = os.getenv(ENV_RETRIEVAL_TYPES, DEFAULT_RETRIEVAL_TYPES)
+    types = [t.strip() for t in types_env.split(",") if t.strip()]
+    mode = os.getenv(ENV_RETRIEVAL_MODE, DEFAULT_RETRIEVAL_MODE).lower()
+    lexical_index = load_lexical_index(version) if mode == RETRIEVAL_MODE_HYBRID else None
+    return HybridRetriever(
+        vector_store=vector_store,
+        lexical_index=lexical_index,
+        attribute_index=load_attribute_index(version),
+        k=k,
+        fetch_k=max(k, int(os.getenv(ENV_HYBRID_FETCH_K, DEFAULT_HYBRID_FETCH_K))),
+        rrf_k=int(os.getenv(ENV_HYBRID_RRF_K, DEFAULT_HYBRID_RRF_K)),
+        types=types,
+    )
 
 def build_index():
     return build_chain()
@@ -0,0 +1,152 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Tuple
+import json
+import threading
+import time
+
+import numpy as np
+
+__all__ = ["AnswerCache", "MATCH_EXACT", "MATCH_SEMANTIC"]
+
+MATCH_EXACT = "exact"
+MATCH_SEMANTIC = "semantic"
+DEFAULT_THRESHOLD = 0.97
+DEFAULT_TTL_S = 3600.0
+DEFAULT_MAX_ENTRIES = 1000
+
+def normalize_question(question: str) -> str:
+    return " ".join(question.lower().split())
+
+def filters_key(filters: dict | None) -> str:
+    return json.dumps(filters or {}, sort_keys=True, ensure_ascii=False, default=str)
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+class _Entry:
+    __slots__ = ("response", "vector", "filters", "expires_at")
+
+    def __init__(self, response: dict, vector: np.ndarray | None, filters: str, expires_at: float):
+        self.response = response
+        self.vector = vector
+        self.filters = filters
+        self.expires_at = expires_at
+
+class AnswerCache:
+    def __init__(
+        self,
+        embed_query: Callable[[str], List[float]] | None = None,
+        threshold: float = DEFAULT_THRESHOLD,
+        ttl_s: float = DEFAULT_TTL_S,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._embed_query = embed_query
+        self.threshold = threshold
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Tuple[str, str], _Entry] = OrderedDict()
+        self._generation: str | None = None
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    def get(
+        self, question: str, filters: dict | None, generation: str, vector: List[float] | None = None
+    ) -> Tuple[dict, Dict[str, Any]] | None:
+        key = (normalize_question(question), filters_key(filters))
+        with self._lock:
+            self._check_generation(generation)
+            entry = self._live_entry(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return entry.response, {"match": MATCH_EXACT, "similarity": 1.0}
+            has_candidates = any(e.filters == key[1] and e.vector is not None for e in self._entries.values())
+        vector = self._vector(key[0], vector) if has_candidates else None
+        if vector is None:
+            self._count_miss()
+            return None
+        with self._lock:
+            if self._generation != generation:
+                self.misses += 1
+                return None
+            best_key, best_similarity = self._nearest(vector, key[1])
+            if best_key is None or best_similarity < self.threshold:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_key)
+            self.semantic_hits += 1
+            return self._entries[best_key].response, {"match": MATCH_SEMANTIC, "similarity": round(best_similarity, 4)}
+
+    def put(self, question: str, filters: dict | None, generation: str, response: dict, vector: List[float] | None = None) -> None:
+        key = (normalize_question(question), filters_key(filters))
+        vector = self._vector(key[0], vector)
+        with self._lock:
+            self._check_generation(generation)
+            self._entries[key] = _Entry(response, vector, key[1], self._clock() + self.ttl_s)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "generation": self._generation,
+        }
+
+    def _count_miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def _check_generation(self, generation: str) -> None:
+        if generation != self._generation:
+            self._entries.clear()
+            self._generation = generation
+
+    def _live_entry(self, key: Tuple[str, str]) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        return entry
+
+    def _vector(self, text: str, vector: List[float] | None) -> np.ndarray | None:
+        if vector is None:
+            return self._embed(text)
+        return _unit(np.asarray(vector, dtype=np.float32))
+
+    def _embed(self, text: str) -> np.ndarray | None:
+        if self._embed_query is None:
+            return None
+        try:
+            vector = np.asarray(self._embed_query(text), dtype=np.float32)
+        except Exception:
+            return None
+        return _unit(vector)
+
+    def _nearest(self, vector: np.ndarray, filters: str) -> Tuple[Tuple[str, str] | None, float]:
+        now = self._clock()
+        best_key, best_similarity = None, -1.0
+        for key in list(self._entries):
+            entry = self._entries[key]
+            if entry.expires_at <= now:
+                del self._entries[key]
+                continue
+            if entry.filters != filters or entry.vector is None:
+                continue
+            similarity = float(np.dot(entry.vector, vector))
+            if similarity > best_similarity:
+                best_key, best_similarity = key, similarity
+        return best_key, best_similarity
@@ -0,0 +1,206 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+import json
+import os
+
+import numpy as np
+
+from src.core.domain.candidate import CandidateRecord, ENGLISH_LEVEL_MAP, SENIORITY_ORDER
+from src.core.infrastructure.lexical_index import tokenize
+
+__all__ = ["AttributeIndex", "InvalidFilterError", "FiltersUnavailableError", "candidate_attributes", "FILTER_KEYS"]
+
+FILE_ENCODING = "utf-8"
+ATTRIBUTES_FILE = "attributes.json"
+ATTRIBUTES_VERSION = 2
+NO_SENIORITY = -1
+FILTER_CANDIDATE_IDS = "candidate_ids"
+FILTER_ENGLISH_LEVEL_MIN = "english_level_min"
+FILTER_PREPARED = "prepared"
+FILTER_SENIORITY = "seniority"
+FILTER_SENIORITY_MIN = "seniority_min"
+FILTER_YEARS_MIN = "years_experience_min"
+FILTER_YEARS_MAX = "years_experience_max"
+FILTER_LOCATION = "location"
+FILTER_SKILLS = "skills"
+FILTER_SKILLS_ANY = "skills_any"
+FILTER_KEYS = (
+    FILTER_CANDIDATE_IDS, FILTER_ENGLISH_LEVEL_MIN, FILTER_PREPARED, FILTER_SENIORITY, FILTER_SENIORITY_MIN,
+    FILTER_YEARS_MIN, FILTER_YEARS_MAX, FILTER_LOCATION, FILTER_SKILLS, FILTER_SKILLS_ANY,
+)
+
+class InvalidFilterError(ValueError):
+    pass
+
+class FiltersUnavailableError(RuntimeError):
+    pass
+
+def candidate_attributes(record: CandidateRecord) -> Dict[str, Any]:
+    skill_terms = set()
+    for name in record.skill_names + record.derived_keywords:
+        skill_terms.add(name.strip().lower())
+        skill_terms.update(tokenize(name))
+    return {
+        "candidate_id": record.candidate_id,
+        "english_level": record.english_level,
+        "english_level_num": record.english_level_num,
+        "english_evidence": record.english_evidence,
+        "prepared": record.prepared,
+        "prepared_evidence": record.prepared_evidence,
+        "seniority": record.seniority,
+        "years_experience": record.years_experience,
+        "location": record.location,
+        "skills": sorted(skill_terms),
+    }
+
+def _as_list(value: Any) -> List[Any]:
+    if isinstance(value, (list, tuple, set)):
+        return list(value)
+    return [value]
+
+class AttributeIndex:
+    def __init__(self, rows: Dict[str, Dict[str, Any]] | None = None):
+        self._rows: Dict[str, Dict[str, Any]] = rows or {}
+        self._columns: dict | None = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def upsert(self, source_key: str, attributes: Dict[str, Any]) -> None:
+        self._rows[source_key] = attributes
+        self._columns = None
+
+    def remove(self, source_keys: Iterable[str]) -> None:
+        for source_key in source_keys:
+            if self._rows.pop(source_key, None) is not None:
+                self._columns = None
+
+    def keys(self) -> List[str]:
+        return list(self._rows)
+
+    def rows(self) -> List[Dict[str, Any]]:
+        return list(self._rows.values())
+
+    def select(self, filters: Dict[str, Any] | None) -> List[Dict[str, Any]]:
+        candidate_ids = self.resolve(filters)
+        if candidate_ids is None:
+            return self.rows()
+        wanted = set(candidate_ids)
+        return [row for row in self._rows.values() if row["candidate_id"] in wanted]
+
+    def save(self, directory: Path) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / ATTRIBUTES_FILE
+        tmp_path = path.with_suffix(".tmp")
+        payload = {"version": ATTRIBUTES_VERSION, "rows": self._rows}
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding=FILE_ENCODING)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def exists(cls, directory: Path) -> bool:
+        return (directory / ATTRIBUTES_FILE).exists()
+
+    @classmethod
+    def load(cls, directory: Path) -> "AttributeIndex":
+        path = directory / ATTRIBUTES_FILE
+        if not path.exists():
+            return cls()
+        payload = json.loads(path.read_text(encoding=FILE_ENCODING))
+        if payload.get("version") != ATTRIBUTES_VERSION:
+            return cls()
+        return cls(payload.get("rows") or {})
+
+    def resolve(self, filters: Dict[str, Any] | None) -> List[str] | None:
+        if not filters:
+            return None
+        unknown = set(filters) - set(FILTER_KEYS)
+        if unknown:
+            raise InvalidFilterError(f"Unsupported filters: {', '.join(sorted(unknown))}")
+        columns = self._compile()
+        mask = np.ones(len(columns["candidate_ids"]), dtype=bool)
+        for key, value in filters.items():
+            if value is None:
+                continue
+            mask &= self._filter_mask(columns, key, value)
+        return columns["candidate_ids"][mask].tolist()
+
+    def _filter_mask(self, columns: dict, key: str, value: Any) -> np.ndarray:
+        if key == FILTER_CANDIDATE_IDS:
+            return np.isin(columns["candidate_ids"], [str(v) for v in _as_list(value)])
+        if key == FILTER_ENGLISH_LEVEL_MIN:
+            level = ENGLISH_LEVEL_MAP.get(str(value).upper())
+            if level is None:
+                raise InvalidFilterError(f"Unknown English level: {value}")
+            return columns["english_level_num"] >= level
+        if key == FILTER_PREPARED:
+            if not isinstance(value, bool):
+                raise InvalidFilterError("Filter 'prepared' must be a boolean")
+            return columns["prepared"] == value
+        if key == FILTER_SENIORITY:
+            wanted = [self._seniority_rank(v) for v in _as_list(value)]
+            return np.isin(columns["seniority"], wanted)
+        if key == FILTER_SENIORITY_MIN:
+            return columns["seniority"] >= self._seniority_rank(value)
+        if key in (FILTER_YEARS_MIN, FILTER_YEARS_MAX):
+            try:
+                bound = float(value)
+            except (TypeError, ValueError):
+                raise InvalidFilterError(f"Filter '{key}' must be a number")
+            years = columns["years_experience"]
+            with np.errstate(invalid="ignore"):
+                return years >= bound if key == FILTER_YEARS_MIN else years <= bound
+        if key == FILTER_LOCATION:
+            needles = [str(v).strip().lower() for v in _as_list(value)]
+            matching = [i for i, loc in enumerate(columns["locations"]) if any(n in loc for n in needles)]
+            table = np.zeros(len(columns["locations"]), dtype=bool)
+            table[matching] = True
+            return table[columns["location_codes"]]
+        if key in (FILTER_SKILLS, FILTER_SKILLS_ANY):
+            masks = [self._skill_mask(columns, skill) for skill in _as_list(value)]
+            if not masks:
+                return np.ones(len(columns["candidate_ids"]), dtype=bool)
+            return np.logical_and.reduce(masks) if key == FILTER_SKILLS else np.logical_or.reduce(masks)
+        raise InvalidFilterError(f"Unsupported filter: {key}")
+
+    def _skill_mask(self, columns: dict, skill: Any) -> np.ndarray:
+        mask = np.zeros(len(columns["candidate_ids"]), dtype=bool)
+        rows = columns["skills"].get(str(skill).strip().lower())
+        if rows is not None:
+            mask[rows] = True
+        return mask
+
+    def _seniority_rank(self, value: Any) -> int:
+        level = str(value).strip().lower()
+        if level not in SENIORITY_ORDER:
+            raise InvalidFilterError(f"Unknown seniority: {value}")
+        return SENIORITY_ORDER.index(level)
+
+    def _compile(self) -> dict:
+        if self._columns is not None:
+            return self._columns
+        rows = list(self._rows.values())
+        locations: Dict[str, int] = {}
+        skills: Dict[str, List[int]] = {}
+        for i, row in enumerate(rows):
+            for term in row["skills"]:
+                skills.setdefault(term, []).append(i)
+        self._columns = {
+            "candidate_ids": np.array([row["candidate_id"] for row in rows], dtype=object),
+            "english_level_num": np.array([row["english_level_num"] for row in rows], dtype=np.int8),
+            "prepared": np.array([row["prepared"] for row in rows], dtype=bool),
+            "seniority": np.array(
+                [SENIORITY_ORDER.index(row["seniority"]) if row["seniority"] in SENIORITY_ORDER else NO_SENIORITY for row in rows],
+                dtype=np.int8,
+            ),
+            "years_experience": np.array(
+                [row["years_experience"] if row["years_experience"] is not None else np.nan for row in rows],
+                dtype=np.float32,
+            ),
+            "location_codes": np.array(
+                [locations.setdefault(row["location"].lower(), len(locations)) for row in rows], dtype=np.int32
+            ),
+            "skills": {term: np.array(indices, dtype=np.int32) for term, indices in skills.items()},
+        }
+        self._columns["locations"] = list(locations)
+        return self._columns
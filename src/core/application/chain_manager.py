@@ -0,0 +1,221 @@
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Tuple
+
+from dotenv import load_dotenv
+
+__all__ = ["ChainManager", "ChainNotReadyError"]
+
+ENV_FILE = ".env"
+ENV_CHAIN_STALE_CHECK_S = "CHAIN_STALE_CHECK_S"
+DEFAULT_CHAIN_STALE_CHECK_S = "1.0"
+EMBEDDING_ENV_VARS = ("EMB_MODEL", "EMB_NORMALIZE", "EMB_BACKEND", "EMB_ONNX_QUANTIZE", "EMB_ONNX_THREADS")
+CHAIN_ENV_VARS = (
+    "LLM_PROVIDER",
+    "LLM_MODEL",
+    "OLLAMA_BASE_URL",
+    "OPENAI_BASE_URL",
+    "OPENAI_API_KEY",
+    "ENABLE_GPT5_MINI_PREVIEW",
+    "LLM_POOL_MAX_CONNECTIONS",
+    "LLM_POOL_KEEPALIVE_S",
+    "LLM_EJECT_AFTER_FAILURES",
+    "LLM_EJECT_S",
+    "LLM_HEDGE_AFTER_MS",
+    "RETRIEVAL_TYPES",
+    "RETRIEVAL_MODE",
+    "HYBRID_FETCH_K",
+    "HYBRID_RRF_K",
+    "DATA_DIR",
+    "VECTOR_STORE",
+    "FAISS_INDEX_TYPE",
+    "FAISS_QUANTIZATION",
+    "FAISS_NLIST",
+    "FAISS_NPROBE",
+    "FAISS_HNSW_M",
+    "FAISS_EF_SEARCH",
+    "FAISS_PQ_M",
+    "FAISS_MMAP",
+    "CONTEXT_PACKING",
+    "CONTEXT_FETCH_K",
+    "CONTEXT_TOKEN_BUDGET",
+    "CONTEXT_MAX_PER_CANDIDATE",
+    "CONTEXT_MMR_LAMBDA",
+    "CONTEXT_DEBUG",
+)
+STATE_STARTING = "starting"
+STATE_READY = "ready"
+STATE_ERROR = "error"
+WARMUP_THREAD_NAME = "chain-warmup"
+WARMUP_QUERY = "warm-up"
+
+class ChainNotReadyError(RuntimeError):
+    pass
+
+def _mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0.0
+
+def _env_snapshot(names: Tuple[str, ...]) -> Tuple[str | None, ...]:
+    return tuple(os.getenv(name) for name in names)
+
+def _default_embeddings_factory():
+    from src.core.application.embedding_client import load_embeddings
+    return load_embeddings()
+
+def _default_chain_factory(embeddings):
+    from src.core.application.agent import build_chain
+    return build_chain(embeddings=embeddings)
+
+def _default_sources_fingerprint() -> Tuple[Any, ...]:
+    from src.core.application.agent import PROMPT_SYSTEM_FILE, PROMPT_HUMAN_FILE
+    from src.core.application.prompting import PROMPTS_DIR
+    from src.core.application.retriever import read_index_version
+    return (
+        _mtime(PROMPTS_DIR / PROMPT_SYSTEM_FILE),
+        _mtime(PROMPTS_DIR / PROMPT_HUMAN_FILE),
+        read_index_version(),
+    )
+
+class ChainManager:
+    def __init__(
+        self,
+        chain_factory: Callable[[Any], Any] | None = None,
+        embeddings_factory: Callable[[], Any] | None = None,
+        sources_fingerprint: Callable[[], Tuple[Any, ...]] | None = None,
+        env_file: str | Path = ENV_FILE,
+        stale_check_s: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._chain_factory = chain_factory or _default_chain_factory
+        self._embeddings_factory = embeddings_factory or _default_embeddings_factory
+        self._sources_fingerprint = sources_fingerprint or _default_sources_fingerprint
+        self._env_file = Path(env_file)
+        self._env_file_mtime: float | None = None
+        if stale_check_s is None:
+            stale_check_s = float(os.getenv(ENV_CHAIN_STALE_CHECK_S, DEFAULT_CHAIN_STALE_CHECK_S))
+        self._stale_check_s = stale_check_s
+        self._clock = clock
+        self._checked_at: float | None = None
+        self._build_lock = threading.Lock()
+        self._chain = None
+        self._chain_fingerprint: Tuple[Any, ...] | None = None
+        self._embeddings = None
+        self._embeddings_key: Tuple[str | None, ...] | None = None
+        self._state = STATE_STARTING
+        self._error: str | None = None
+        self._built_at: float | None = None
+        self._builds = 0
+        self._generation = ""
+        self._warmup_s: float | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self._chain is not None
+
+    @property
+    def generation(self) -> str:
+        return self._generation
+
+    @property
+    def embeddings(self):
+        return self._embeddings
+
+    def preload(self) -> None:
+        with self._build_lock:
+            self._reload_env_file()
+            self._get_embeddings()
+
+    def warm(self, force: bool = True) -> None:
+        started = time.perf_counter()
+        try:
+            self.refresh(force=force)
+            if self._embeddings is not None:
+                self._embeddings.embed_query(WARMUP_QUERY)
+        except Exception:
+            pass
+        finally:
+            self._warmup_s = round(time.perf_counter() - started, 3)
+
+    def warm_in_background(self, force: bool = True) -> threading.Thread:
+        thread = threading.Thread(target=self.warm, args=(force,), name=WARMUP_THREAD_NAME, daemon=True)
+        thread.start()
+        return thread
+
+    def get(self):
+        if self._chain is not None and (self._build_lock.locked() or not self._check_due() or not self._is_stale()):
+            return self._chain
+        return self.refresh()
+
+    def refresh(self, force: bool = False):
+        with self._build_lock:
+            if not force and self._chain is not None and not self._is_stale():
+                return self._chain
+            self._reload_env_file()
+            fingerprint = self._fingerprint()
+            self._checked_at = self._clock()
+            try:
+                embeddings = self._get_embeddings()
+                chain = self._chain_factory(embeddings)
+            except Exception as e:
+                self._error = str(e)
+                if self._chain is None:
+                    self._state = STATE_ERROR
+                    raise ChainNotReadyError(str(e)) from e
+                return self._chain
+            self._chain = chain
+            self._chain_fingerprint = fingerprint
+            self._state = STATE_READY
+            self._error = None
+            self._built_at = time.time()
+            self._builds += 1
+            self._generation = uuid.uuid4().hex
+            return chain
+
+    def status(self) -> dict:
+        return {
+            "status": self._state,
+            "ready": self.ready,
+            "builds": self._builds,
+            "generation": self._generation,
+            "built_at": self._built_at,
+            "error": self._error,
+            "warmup_s": self._warmup_s,
+        }
+
+    def _get_embeddings(self):
+        key = _env_snapshot(EMBEDDING_ENV_VARS)
+        if self._embeddings is None or key != self._embeddings_key:
+            self._embeddings = self._embeddings_factory()
+            self._embeddings_key = key
+        return self._embeddings
+
+    def _reload_env_file(self) -> None:
+        mtime = _mtime(self._env_file)
+        if mtime != self._env_file_mtime:
+            load_dotenv(dotenv_path=self._env_file, override=True)
+            self._env_file_mtime = mtime
+
+    def _fingerprint(self) -> Tuple[Any, ...]:
+        return (
+            _env_snapshot(EMBEDDING_ENV_VARS),
+            _env_snapshot(CHAIN_ENV_VARS),
+            self._sources_fingerprint(),
+        )
+
+    def _check_due(self) -> bool:
+        now = self._clock()
+        if self._checked_at is not None and now - self._checked_at < self._stale_check_s:
+            return False
+        self._checked_at = now
+        return True
+
+    def _is_stale(self) -> bool:
+        if _mtime(self._env_file) != self._env_file_mtime:
+            return True
+        return self._fingerprint() != self._chain_fingerprint
@@ -0,0 +1,139 @@
+from typing import Dict, List, Set, Tuple
+
+from langchain_core.documents import Document
+
+from src.core.infrastructure.lexical_index import tokenize
+from src.core.infrastructure.metrics import CONTEXT_TOKENS, CONTEXT_DROPPED
+
+__all__ = ["ContextPacker", "estimate_tokens"]
+
+CHARS_PER_TOKEN = 4
+DEFAULT_TOKEN_BUDGET = 800
+DEFAULT_MAX_PER_CANDIDATE = 3
+DEFAULT_MMR_LAMBDA = 0.7
+DUPLICATE_SIMILARITY = 0.8
+MIN_OVERLAP_CHARS = 20
+MAX_OVERLAP_CHARS = 200
+META_CANDIDATE_ID = "candidate_id"
+META_FUSED_SCORE = "fused_score"
+META_CONTEXT_RANK = "context_rank"
+NO_CANDIDATE = ""
+KIND_RETRIEVED = "retrieved"
+KIND_TOP_K = "top_k"
+KIND_PACKED = "packed"
+KIND_CHUNKS = "chunks"
+KIND_DUPLICATES = "duplicates"
+KIND_CANDIDATES = "candidates"
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def _strip_overlap(text: str, previous: str) -> str:
+    longest = min(len(text), len(previous), MAX_OVERLAP_CHARS)
+    for size in range(longest, MIN_OVERLAP_CHARS - 1, -1):
+        if text.startswith(previous[-size:]):
+            return text[size:].lstrip()
+    return text
+
+class ContextPacker:
+    def __init__(
+        self,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        max_per_candidate: int = DEFAULT_MAX_PER_CANDIDATE,
+        mmr_lambda: float = DEFAULT_MMR_LAMBDA,
+        baseline_k: int | None = None,
+        report=None,
+    ):
+        self.token_budget = token_budget
+        self.max_per_candidate = max_per_candidate
+        self.mmr_lambda = mmr_lambda
+        self.baseline_k = baseline_k
+        self._report = report
+
+    def pack(self, docs: List[Document]) -> List[Document]:
+        if not docs:
+            return []
+        relevance = self._relevance(docs)
+        terms = [set(tokenize(doc.page_content)) for doc in docs]
+        remaining = list(range(len(docs)))
+        selected: List[Tuple[int, str]] = []
+        per_candidate: Dict[str, int] = {}
+        used_tokens = 0
+        dropped_duplicates = 0
+
+        while remaining:
+            best, best_score = None, None
+            for i in remaining:
+                redundancy = max((_jaccard(terms[i], terms[j]) for j, _ in selected), default=0.0)
+                candidate = docs[i].metadata.get(META_CANDIDATE_ID) or NO_CANDIDATE
+                crowding = per_candidate.get(candidate, 0) / self.max_per_candidate if candidate else 0.0
+                score = self.mmr_lambda * relevance[i] - (1.0 - self.mmr_lambda) * max(redundancy, crowding)
+                if best_score is None or score > best_score:
+                    best, best_score = i, score
+            remaining.remove(best)
+            candidate = docs[best].metadata.get(META_CANDIDATE_ID) or NO_CANDIDATE
+            if candidate and per_candidate.get(candidate, 0) >= self.max_per_candidate:
+                continue
+            if any(_jaccard(terms[best], terms[j]) >= DUPLICATE_SIMILARITY for j, _ in selected):
+                dropped_duplicates += 1
+                continue
+            text = docs[best].page_content
+            for j, kept in selected:
+                if (docs[j].metadata.get(META_CANDIDATE_ID) or NO_CANDIDATE) == candidate:
+                    text = _strip_overlap(text, kept)
+            if not text:
+                dropped_duplicates += 1
+                continue
+            tokens = estimate_tokens(text)
+            if used_tokens + tokens > self.token_budget:
+                continue
+            used_tokens += tokens
+            per_candidate[candidate] = per_candidate.get(candidate, 0) + 1
+            selected.append((best, text))
+
+        packed = self._grouped(docs, selected)
+        self._record(docs, packed, used_tokens, dropped_duplicates)
+        return packed
+
+    def _relevance(self, docs: List[Document]) -> List[float]:
+        scores = [doc.metadata.get(META_FUSED_SCORE) for doc in docs]
+        if all(isinstance(score, (int, float)) for score in scores):
+            top = max(scores) or 1.0
+            return [score / top for score in scores]
+        return [1.0 / (rank + 1) for rank in range(len(docs))]
+
+    def _grouped(self, docs: List[Document], selected: List[Tuple[int, str]]) -> List[Document]:
+        order: Dict[str, int] = {}
+        for i, _ in sorted(selected):
+            order.setdefault(docs[i].metadata.get(META_CANDIDATE_ID) or NO_CANDIDATE, len(order))
+        ranked = sorted(selected, key=lambda item: (order[docs[item[0]].metadata.get(META_CANDIDATE_ID) or NO_CANDIDATE], item[0]))
+        return [
+            Document(id=docs[i].id, page_content=text, metadata={**docs[i].metadata, META_CONTEXT_RANK: i + 1})
+            for i, text in ranked
+        ]
+
+    def _record(self, docs: List[Document], packed: List[Document], used_tokens: int, dropped_duplicates: int) -> None:
+        retrieved_tokens = sum(estimate_tokens(doc.page_content) for doc in docs)
+        baseline = docs[:self.baseline_k] if self.baseline_k else docs
+        baseline_tokens = sum(estimate_tokens(doc.page_content) for doc in baseline)
+        candidates = {doc.metadata.get(META_CANDIDATE_ID) for doc in packed}
+        baseline_candidates = {doc.metadata.get(META_CANDIDATE_ID) for doc in baseline}
+        retrieved_candidates = {doc.metadata.get(META_CANDIDATE_ID) for doc in docs}
+        CONTEXT_TOKENS.observe(retrieved_tokens, KIND_RETRIEVED)
+        CONTEXT_TOKENS.observe(baseline_tokens, KIND_TOP_K)
+        CONTEXT_TOKENS.observe(used_tokens, KIND_PACKED)
+        CONTEXT_DROPPED.observe(len(docs) - len(packed), KIND_CHUNKS)
+        CONTEXT_DROPPED.observe(dropped_duplicates, KIND_DUPLICATES)
+        CONTEXT_DROPPED.observe(len(retrieved_candidates - candidates), KIND_CANDIDATES)
+        if self._report is None:
+            return
+        self._report(
+            f"[CONTEXT] chunks {len(docs)}->{len(packed)} duplicates={dropped_duplicates} "
+            f"tokens retrieved={retrieved_tokens} top_k={baseline_tokens} packed={used_tokens}/{self.token_budget} "
+            f"candidates top_k={len(baseline_candidates)} packed={len(candidates)}"
+        )
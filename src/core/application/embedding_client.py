@@ -1,17 +1,154 @@
 import os
-from langchain_huggingface import HuggingFaceEmbeddings
+import threading
+from pathlib import Path
+from langchain_core.embeddings import Embeddings
+
+from src.core.infrastructure.embedding_cache import (
+    CachedEmbeddings, open_embedding_store, cache_namespace, embed_queries,
+)
+from src.core.infrastructure.embedding_batcher import MicroBatchingEmbeddings
+from src.core.infrastructure.metrics import timed_stage, Histogram
 
 ENV_EMB_MODEL = "EMB_MODEL"
 ENV_EMB_NORMALIZE = "EMB_NORMALIZE"
+ENV_EMB_CACHE = "EMB_CACHE"
+ENV_EMB_CACHE_DIR = "EMB_CACHE_DIR"
+ENV_EMB_CACHE_MAX_ENTRIES = "EMB_CACHE_MAX_ENTRIES"
+ENV_EMB_CACHE_MEMORY_ENTRIES = "EMB_CACHE_MEMORY_ENTRIES"
+ENV_EMB_BATCHING = "EMB_BATCHING"
+ENV_EMB_BATCH_MAX_SIZE = "EMB_BATCH_MAX_SIZE"
+ENV_EMB_BATCH_MAX_WAIT_MS = "EMB_BATCH_MAX_WAIT_MS"
+ENV_EMB_BACKEND = "EMB_BACKEND"
+ENV_EMB_ONNX_QUANTIZE = "EMB_ONNX_QUANTIZE"
+ENV_EMB_ONNX_THREADS = "EMB_ONNX_THREADS"
+ENV_SERVE_WORKERS = "SERVE_WORKERS"
+ENV_DATA_DIR = "DATA_DIR"
 DEFAULT_EMB_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 DEFAULT_DEVICE = "cpu"
 DEFAULT_NORMALIZE = "true"
+DEFAULT_EMB_CACHE = "true"
+DEFAULT_EMB_BATCHING = "true"
+DEFAULT_EMB_BATCH_MAX_SIZE = "32"
+DEFAULT_EMB_BATCH_MAX_WAIT_MS = "2"
+EMB_BACKEND_TORCH = "torch"
+EMB_BACKEND_ONNX = "onnx"
+EMB_BACKEND_ONNX_INT8 = "onnx-int8"
+EMB_BACKENDS = (EMB_BACKEND_TORCH, EMB_BACKEND_ONNX, EMB_BACKEND_ONNX_INT8)
+DEFAULT_EMB_BACKEND = EMB_BACKEND_TORCH
+DEFAULT_EMB_ONNX_QUANTIZE = "true"
+DEFAULT_EMB_ONNX_THREADS = "0"
+DEFAULT_SERVE_WORKERS = "1"
+DEFAULT_DATA_DIR = "./data"
+DEFAULT_EMB_CACHE_MAX_ENTRIES = "200000"
+DEFAULT_EMB_CACHE_MEMORY_ENTRIES = "10000"
+CACHE_SUBDIR = "cache"
+EMBEDDINGS_CACHE_SUBDIR = "embeddings"
+ONNX_CACHE_SUBDIR = "onnx"
+MS_PER_S = 1000
+
+def embedding_backend() -> str:
+    backend = os.getenv(ENV_EMB_BACKEND, DEFAULT_EMB_BACKEND).lower()
+    if backend not in EMB_BACKENDS:
+        raise ValueError(f"Unsupported EMB_BACKEND: {backend}")
+    if backend == EMB_BACKEND_ONNX and os.getenv(ENV_EMB_ONNX_QUANTIZE, DEFAULT_EMB_ONNX_QUANTIZE).lower() == "true":
+        return EMB_BACKEND_ONNX_INT8
+    return backend
+
+def onnx_threads() -> int:
+    threads = int(os.getenv(ENV_EMB_ONNX_THREADS, DEFAULT_EMB_ONNX_THREADS))
+    if threads > 0:
+        return threads
+    workers = max(1, int(os.getenv(ENV_SERVE_WORKERS, DEFAULT_SERVE_WORKERS)))
+    return max(1, (os.cpu_count() or 1) // workers)
+
+def load_model(backend: str | None = None):
+    model_name = os.getenv(ENV_EMB_MODEL, DEFAULT_EMB_MODEL)
+    normalize = os.getenv(ENV_EMB_NORMALIZE, DEFAULT_NORMALIZE).lower() == "true"
+    backend = backend or embedding_backend()
+    if backend not in EMB_BACKENDS:
+        raise ValueError(f"Unsupported EMB_BACKEND: {backend}")
+    if backend == EMB_BACKEND_TORCH:
+        from langchain_huggingface import HuggingFaceEmbeddings
+        return HuggingFaceEmbeddings(
+            model_name=model_name,
+            model_kwargs={"device": DEFAULT_DEVICE},
+            encode_kwargs={"normalize_embeddings": normalize}
+        )
+    from src.core.infrastructure.onnx_embeddings import OnnxEmbeddings, export_onnx, onnx_model_dir
+
+    quantized = backend == EMB_BACKEND_ONNX_INT8
+    directory = onnx_model_dir(_data_dir() / CACHE_SUBDIR / ONNX_CACHE_SUBDIR, model_name)
+    export_onnx(model_name, directory, quantize=quantized)
+    return OnnxEmbeddings.load(directory, quantized=quantized, threads=onnx_threads(), normalize=normalize)
 
 def load_embeddings():
     model_name = os.getenv(ENV_EMB_MODEL, DEFAULT_EMB_MODEL)
     normalize = os.getenv(ENV_EMB_NORMALIZE, DEFAULT_NORMALIZE).lower() == "true"
-    return HuggingFaceEmbeddings(
-        model_name=model_name,
-        model_kwargs={"device": DEFAULT_DEVICE},
-        encode_kwargs={"normalize_embeddings": normalize}
-    )
\ No newline at end of file
+    backend = embedding_backend()
+    embeddings = load_model(backend)
+    if os.getenv(ENV_EMB_BATCHING, DEFAULT_EMB_BATCHING).lower() == "true":
+        embeddings = MicroBatchingEmbeddings(
+            embeddings,
+            max_batch_size=int(os.getenv(ENV_EMB_BATCH_MAX_SIZE, DEFAULT_EMB_BATCH_MAX_SIZE)),
+            max_wait_s=float(os.getenv(ENV_EMB_BATCH_MAX_WAIT_MS, DEFAULT_EMB_BATCH_MAX_WAIT_MS)) / MS_PER_S,
+        )
+    if os.getenv(ENV_EMB_CACHE, DEFAULT_EMB_CACHE).lower() != "true":
+        return embeddings
+    model_key = model_name if backend == EMB_BACKEND_TORCH else f"{model_name}#{backend}"
+    return CachedEmbeddings(embeddings, _open_cache_store(model_key, normalize))
+
+def _data_dir() -> Path:
+    return Path(os.getenv(ENV_DATA_DIR, DEFAULT_DATA_DIR))
+
+def _open_cache_store(model_key: str, normalize: bool):
+    default_dir = _data_dir() / CACHE_SUBDIR / EMBEDDINGS_CACHE_SUBDIR
+    cache_dir = Path(os.getenv(ENV_EMB_CACHE_DIR, str(default_dir)))
+    return open_embedding_store(
+        cache_dir / cache_namespace(model_key, normalize),
+        max_entries=int(os.getenv(ENV_EMB_CACHE_MAX_ENTRIES, DEFAULT_EMB_CACHE_MAX_ENTRIES)),
+        memory_entries=int(os.getenv(ENV_EMB_CACHE_MEMORY_ENTRIES, DEFAULT_EMB_CACHE_MEMORY_ENTRIES)),
+    )
+
+class LazyEmbeddings(Embeddings):
+    def __init__(self, factory=load_embeddings):
+        self._factory = factory
+        self._embeddings = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._embeddings is not None
+
+    def _load(self):
+        if self._embeddings is None:
+            with self._lock:
+                if self._embeddings is None:
+                    self._embeddings = self._factory()
+        return self._embeddings
+
+    def embed_documents(self, texts):
+        return self._load().embed_documents(texts)
+
+    def embed_query(self, text):
+        return self._load().embed_query(text)
+
+    def embed_queries(self, texts):
+        return embed_queries(self._load(), texts)
+
+class TimedEmbeddings(Embeddings):
+    def __init__(self, embeddings: Embeddings, stage: str, histogram: Histogram):
+        self.embeddings = embeddings
+        self.stage = stage
+        self.histogram = histogram
+
+    def embed_documents(self, texts):
+        with timed_stage(self.stage, self.histogram):
+            return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text):
+        with timed_stage(self.stage, self.histogram):
+            return self.embeddings.embed_query(text)
+
+    def embed_queries(self, texts):
+        with timed_stage(self.stage, self.histogram):
+            return embed_queries(self.embeddings, texts)
@@ -0,0 +1,118 @@
+from typing import Any, Dict, List, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.runnables.config import run_in_executor
+
+from src.core.application.attribute_index import FiltersUnavailableError
+from src.core.infrastructure.metrics import timed_stage, STAGE_EMBED_QUERY, STAGE_LEXICAL_SEARCH, STAGE_VECTOR_SEARCH
+
+__all__ = ["HybridRetriever", "reciprocal_rank_fusion"]
+
+DEFAULT_FETCH_K = 20
+DEFAULT_RRF_K = 60
+META_TYPE = "type"
+META_CANDIDATE_ID = "candidate_id"
+META_LEXICAL_RANK = "lexical_rank"
+META_VECTOR_RANK = "vector_rank"
+META_FUSED_SCORE = "fused_score"
+
+def reciprocal_rank_fusion(rankings: List[List[str]], rrf_k: int = DEFAULT_RRF_K) -> List[Tuple[str, float]]:
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+class HybridRetriever(BaseRetriever):
+    vector_store: Any
+    lexical_index: Any = None
+    attribute_index: Any = None
+    k: int
+    fetch_k: int = DEFAULT_FETCH_K
+    rrf_k: int = DEFAULT_RRF_K
+    types: List[str] | None = None
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+        filters: Dict[str, Any] | None = None,
+        embedding: List[float] | None = None,
+    ) -> List[Document]:
+        allowlist = self._resolve_filters(filters)
+        if allowlist is not None and not allowlist:
+            return []
+        if self.lexical_index is None:
+            return self._vector_search(query, self.k, allowlist, embedding)
+
+        with timed_stage(STAGE_LEXICAL_SEARCH):
+            lexical_hits = self.lexical_index.search(
+                query,
+                self.fetch_k,
+                types=set(self.types) if self.types is not None else None,
+                candidate_ids=set(allowlist) if allowlist is not None else None,
+            )
+        vector_docs = self._vector_search(query, self.fetch_k, allowlist, embedding)
+        docs_by_id = {doc.id: doc for doc in vector_docs if doc.id}
+        lexical_ranking = [chunk_id for chunk_id, _ in lexical_hits]
+        vector_ranking = [doc.id for doc in vector_docs if doc.id]
+        fused = reciprocal_rank_fusion([lexical_ranking, vector_ranking], self.rrf_k)[:self.k]
+
+        missing = [doc_id for doc_id, _ in fused if doc_id not in docs_by_id]
+        if missing:
+            docs_by_id.update({doc.id: doc for doc in self.vector_store.get_by_ids(missing)})
+
+        lexical_ranks = {doc_id: rank for rank, doc_id in enumerate(lexical_ranking, start=1)}
+        vector_ranks = {doc_id: rank for rank, doc_id in enumerate(vector_ranking, start=1)}
+        results = []
+        for doc_id, score in fused:
+            doc = docs_by_id.get(doc_id)
+            if doc is None:
+                continue
+            metadata = {
+                **doc.metadata,
+                META_FUSED_SCORE: round(score, 6),
+                META_LEXICAL_RANK: lexical_ranks.get(doc_id),
+                META_VECTOR_RANK: vector_ranks.get(doc_id),
+            }
+            results.append(Document(id=doc.id, page_content=doc.page_content, metadata=metadata))
+        return results
+
+    async def _aget_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: AsyncCallbackManagerForRetrieverRun,
+        filters: Dict[str, Any] | None = None,
+        embedding: List[float] | None = None,
+    ) -> List[Document]:
+        return await run_in_executor(
+            None, self._get_relevant_documents, query, run_manager=run_manager.get_sync(), filters=filters, embedding=embedding
+        )
+
+    def _vector_search(self, query: str, k: int, allowlist: List[str] | None, embedding: List[float] | None = None) -> List[Document]:
+        if embedding is None:
+            with timed_stage(STAGE_EMBED_QUERY):
+                embedding = self.vector_store.embeddings.embed_query(query)
+        with timed_stage(STAGE_VECTOR_SEARCH):
+            return self.vector_store.similarity_search_by_vector(embedding, k=k, filter=self._vector_filter(allowlist))
+
+    def _resolve_filters(self, filters: Dict[str, Any] | None) -> List[str] | None:
+        if not filters:
+            return None
+        if self.attribute_index is None:
+            raise FiltersUnavailableError("This index has no attribute data; rebuild the index to use filters")
+        return self.attribute_index.resolve(filters)
+
+    def _vector_filter(self, allowlist: List[str] | None = None) -> Dict[str, Any] | None:
+        clauses = []
+        if self.types is not None:
+            clauses.append({META_TYPE: {"$in": list(self.types)}})
+        if allowlist is not None:
+            clauses.append({META_CANDIDATE_ID: {"$in": allowlist}})
+        if len(clauses) > 1:
+            return {"$and": clauses}
+        return clauses[0] if clauses else None
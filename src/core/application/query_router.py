@@ -0,0 +1,115 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, List
+import json
+import re
+import threading
+
+from src.core.application.attribute_index import AttributeIndex, FILTER_ENGLISH_LEVEL_MIN, FILTER_PREPARED
+from src.core.domain.candidate import ENGLISH_LEVEL_MAP
+
+__all__ = ["QueryRouter", "parse_intent", "ROUTE_STRUCTURED", "ROUTE_RAG"]
+
+ROUTE_STRUCTURED = "structured"
+ROUTE_RAG = "rag"
+REGEX_WORD = r"[a-z0-9]+\+?"
+REGEX_CEFR = r"^([abc][12])\+?$"
+WORD_ENGLISH = "english"
+PREPARED_WORDS = {"prepared", "ready"}
+NEGATION_WORDS = {"not", "unprepared"}
+ENGLISH_LEVEL_WORDS = {
+    "fluent": "C1",
+    "advanced": "C1",
+    "upper": "B2",
+    "intermediate": "B1",
+}
+FILLER_WORDS = {
+    "who", "which", "what", "whom", "list", "show", "me", "give", "find", "get", "all", "any", "there",
+    "candidate", "candidates", "people", "person", "persons", "profile", "profiles", "cv", "cvs", "pool", "in", "the",
+    "our", "us", "a", "an", "of", "is", "are", "do", "does", "has", "have", "having", "with", "and", "at", "least",
+    "or", "above", "higher", "better", "more", "minimum", "min", "level", "speak", "speaks", "speaking", "english",
+    "language", "proficiency", "cefr", "that", "be", "can", "considered", "marked", "as",
+}
+FIELD_CANDIDATE_ID = "CandidateId"
+FIELD_ENGLISH = "English"
+FIELD_EVIDENCE = "Evidence"
+UNKNOWN_LEVEL = "UNKNOWN"
+
+def parse_intent(question: str) -> Dict[str, Any] | None:
+    words = re.findall(REGEX_WORD, question.lower())
+    filters: Dict[str, Any] = {}
+    levels = []
+    for word in words:
+        cefr = re.match(REGEX_CEFR, word)
+        if cefr:
+            levels.append(cefr.group(1).upper())
+        elif word in ENGLISH_LEVEL_WORDS:
+            levels.append(ENGLISH_LEVEL_WORDS[word])
+        elif word in PREPARED_WORDS:
+            filters[FILTER_PREPARED] = True
+        elif word in NEGATION_WORDS:
+            continue
+        elif word not in FILLER_WORDS:
+            return None
+    if levels:
+        if WORD_ENGLISH not in words:
+            return None
+        filters[FILTER_ENGLISH_LEVEL_MIN] = max(levels, key=ENGLISH_LEVEL_MAP.__getitem__)
+    if FILTER_PREPARED in filters and NEGATION_WORDS & set(words):
+        filters[FILTER_PREPARED] = False
+    elif NEGATION_WORDS & set(words):
+        return None
+    return filters or None
+
+class QueryRouter:
+    def __init__(self, version_reader: Callable[[], str], index_loader: Callable[[str], AttributeIndex | None]):
+        self.version_reader = version_reader
+        self.index_loader = index_loader
+        self.structured = 0
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+        self._version: str | None = None
+        self._index: AttributeIndex | None = None
+
+    def route(self, question: str, filters: Dict[str, Any] | None = None) -> dict | None:
+        intent = parse_intent(question)
+        index = self._current_index() if intent is not None else None
+        if intent is None or index is None or not len(index):
+            with self._lock:
+                self.fallbacks += 1
+            return None
+        applied = {**(filters or {}), **intent}
+        rows = sorted(index.select(applied), key=lambda row: (-row["english_level_num"], row["candidate_id"]))
+        with self._lock:
+            self.structured += 1
+        return {
+            "answer": json.dumps([self._item(row, applied) for row in rows], ensure_ascii=False),
+            "sources": [
+                {"type": "candidate", "candidate_id": row["candidate_id"], "english_level": row["english_level"], "prepared": row["prepared"]}
+                for row in rows
+            ],
+            "route": {"path": ROUTE_STRUCTURED, "filters": applied},
+        }
+
+    def stats(self) -> dict:
+        return {"structured": self.structured, "fallbacks": self.fallbacks}
+
+    def _item(self, row: Dict[str, Any], filters: Dict[str, Any]) -> Dict[str, str]:
+        evidence: List[str] = [row.get("english_evidence") or ""]
+        if FILTER_PREPARED in filters:
+            state = "Prepared" if row["prepared"] else "Not prepared"
+            evidence.append(f"{state}: {row.get('prepared_evidence') or 'no score or seniority'}")
+        return {
+            FIELD_CANDIDATE_ID: row["candidate_id"],
+            FIELD_ENGLISH: row["english_level"] or UNKNOWN_LEVEL,
+            FIELD_EVIDENCE: "; ".join(part for part in evidence if part),
+        }
+
+    def _current_index(self) -> AttributeIndex | None:
+        version = self.version_reader()
+        with self._lock:
+            if version == self._version and self._index is not None:
+                return self._index
+        index = self.index_loader(version)
+        with self._lock:
+            self._version, self._index = version, index
+        return index
@@ -0,0 +1,226 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+import asyncio
+import hashlib
+import heapq
+import json
+import re
+import threading
+
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables.config import run_in_executor
+
+from src.core.application.prompting import load_prompt
+from src.core.domain.candidate import CandidateRecord
+
+__all__ = ["CandidateRanker", "CandidatePool", "ScoreCache", "candidate_profile", "parse_score", "RANK_TASKS", "UnknownRankTaskError"]
+
+FILE_ENCODING = "utf-8"
+RANK_TASKS = {
+    "rank": "rank_candidates.txt",
+    "language": "filter_by_language.txt",
+    "experience": "verify_experience.txt",
+}
+DEFAULT_TASK = "rank"
+DEFAULT_TOP_N = 10
+DEFAULT_CONCURRENCY = 4
+SCORE_MIN = 0.0
+SCORE_MAX = 100.0
+HASH_LENGTH = 16
+PROFILE_MAX_SKILLS = 25
+PROFILE_MAX_LIST_ITEMS = 5
+PROFILE_SUMMARY_MAX_CHARS = 600
+REGEX_JSON_OBJECT = r"\{.*\}"
+SCORE_INSTRUCTIONS = (
+    "You see ONE candidate at a time; the whole pool is merged afterwards.\n"
+    "Score how well this candidate satisfies the task above, from 0 (not at all) to 100 (perfect fit), "
+    "using only the profile.\n"
+    'Reply with JSON only: {{"Score": <0-100>, "Why": "<one sentence with the evidence>"}}'
+)
+HUMAN_TEMPLATE = "Extra criteria: {criteria}\n\nCandidate profile:\n{profile}"
+NO_CRITERIA = "none"
+FIELD_CANDIDATE_ID = "CandidateId"
+FIELD_SCORE = "Score"
+FIELD_WHY = "Why"
+FIELD_KEY = "Key"
+SCORES_SUFFIX = ".jsonl"
+
+class UnknownRankTaskError(ValueError):
+    pass
+
+def candidate_profile(record: CandidateRecord) -> str:
+    general_info = record.raw.get("GeneralInfo") or {}
+    title = " / ".join(str(t) for t in _unique([general_info.get("TitleDetected"), general_info.get("TitlePredicted")]))
+    lines = [f"CandidateId: {record.candidate_id}"]
+    if title:
+        lines.append(f"Title: {title}")
+    years = record.years_experience
+    lines.append(f"Seniority: {record.seniority}" + (f"; YearsExperience: {years:g}" if years is not None else ""))
+    lines.append(f"English: {record.english_level}; Prepared: {'yes' if record.prepared else 'no'}")
+    if record.location:
+        lines.append(f"Location: {record.location}")
+    if record.skills:
+        lines.append("Skills: " + ", ".join(_format_skill(skill) for skill in record.skills[:PROFILE_MAX_SKILLS]))
+    if record.derived_keywords:
+        lines.append("DerivedKeywords: " + ", ".join(record.derived_keywords))
+    scores = [f"{key} {value}" for key, value in (record.scores or {}).items() if isinstance(value, (int, float))]
+    if scores:
+        lines.append("Scores: " + ", ".join(scores))
+    for name in ("Strengths", "AreasToImprove"):
+        items = record.raw.get(name) or []
+        if items:
+            lines.append(f"{name}: " + "; ".join(map(str, items[:PROFILE_MAX_LIST_ITEMS])))
+    summary = " ".join(record.summary.split())
+    if summary:
+        lines.append("Summary: " + summary[:PROFILE_SUMMARY_MAX_CHARS])
+    return "\n".join(lines)
+
+def parse_score(text: str) -> Dict[str, Any]:
+    match = re.search(REGEX_JSON_OBJECT, text, re.DOTALL)
+    if not match:
+        raise ValueError(f"No JSON score in LLM output: {text[:200]!r}")
+    data = json.loads(match.group(0))
+    score = float(data[FIELD_SCORE])
+    return {FIELD_SCORE: min(SCORE_MAX, max(SCORE_MIN, score)), FIELD_WHY: str(data.get(FIELD_WHY, ""))}
+
+def _format_skill(skill: Dict[str, Any]) -> str:
+    level = skill.get("SkillLevel")
+    return f"{skill.get('SkillName', '')} ({level})" if level else str(skill.get("SkillName", ""))
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode(FILE_ENCODING)).hexdigest()[:HASH_LENGTH]
+
+def _unique(values: Sequence[Any]) -> List[Any]:
+    return list(dict.fromkeys(v for v in values if v))
+
+class ScoreCache:
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self._scores: Dict[str, Dict[str, dict]] = {}
+
+    def get(self, prompt_hash: str, content_hash: str) -> dict | None:
+        with self._lock:
+            return self._load(prompt_hash).get(content_hash)
+
+    def get_many(self, prompt_hash: str, content_hashes: Sequence[str]) -> Dict[str, dict]:
+        with self._lock:
+            entries = self._load(prompt_hash)
+            return {content_hash: entries[content_hash] for content_hash in content_hashes if content_hash in entries}
+
+    def put_many(self, prompt_hash: str, scores: Dict[str, dict]) -> None:
+        if not scores:
+            return
+        lines = "".join(json.dumps({FIELD_KEY: key, **score}, ensure_ascii=False) + "\n" for key, score in scores.items())
+        with self._lock:
+            self._load(prompt_hash).update(scores)
+            path = self._path(prompt_hash)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "a", encoding=FILE_ENCODING) as handle:
+                handle.write(lines)
+
+    def _load(self, prompt_hash: str) -> Dict[str, dict]:
+        entries = self._scores.get(prompt_hash)
+        if entries is None:
+            entries = {}
+            path = self._path(prompt_hash)
+            if path.exists():
+                for line in path.read_text(encoding=FILE_ENCODING).splitlines():
+                    try:
+                        row = json.loads(line)
+                        entries[row.pop(FIELD_KEY)] = row
+                    except (ValueError, KeyError, AttributeError):
+                        continue
+            self._scores[prompt_hash] = entries
+        return entries
+
+    def _path(self, prompt_hash: str) -> Path:
+        return self.directory / f"{prompt_hash}{SCORES_SUFFIX}"
+
+class CandidatePool:
+    def __init__(self, version_reader: Callable[[], str], loader: Callable[[str], List[CandidateRecord]]):
+        self.version_reader = version_reader
+        self.loader = loader
+        self._lock = threading.Lock()
+        self._version: str | None = None
+        self._records: List[CandidateRecord] | None = None
+        self.loads = 0
+
+    def records(self) -> List[CandidateRecord]:
+        version = self.version_reader()
+        with self._lock:
+            if version == self._version and self._records is not None:
+                return self._records
+            records = self.loader(version)
+            self._version, self._records = version, records
+            self.loads += 1
+            return records
+
+class CandidateRanker:
+    def __init__(
+        self,
+        llm_factory: Callable[[], Any],
+        cache: ScoreCache,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        prompt_loader: Callable[[str], str | None] = load_prompt,
+    ):
+        self.llm_factory = llm_factory
+        self.cache = cache
+        self.concurrency = max(1, concurrency)
+        self.prompt_loader = prompt_loader
+
+    async def rank(
+        self,
+        records: Sequence[CandidateRecord],
+        task: str = DEFAULT_TASK,
+        top_n: int = DEFAULT_TOP_N,
+        criteria: str | None = None,
+        min_score: float = SCORE_MIN,
+    ) -> dict:
+        if task not in RANK_TASKS:
+            raise UnknownRankTaskError(f"Unknown rank task: {task} (expected one of {', '.join(RANK_TASKS)})")
+        llm = self.llm_factory()
+        system = (self.prompt_loader(RANK_TASKS[task]) or "").replace("{", "{{").replace("}", "}}") + "\n\n" + SCORE_INSTRUCTIONS
+        prompt = ChatPromptTemplate.from_messages([("system", system), ("human", HUMAN_TEMPLATE)])
+        criteria = (criteria or "").strip() or NO_CRITERIA
+        model = str(getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__)
+        prompt_hash = _hash(json.dumps([system, HUMAN_TEMPLATE, criteria, model]))
+        chain = prompt | llm | StrOutputParser()
+
+        profiles = {record.candidate_id: candidate_profile(record) for record in records}
+        content_hashes = {candidate_id: _hash(profile) for candidate_id, profile in profiles.items()}
+        cached = await run_in_executor(None, self.cache.get_many, prompt_hash, list(content_hashes.values()))
+        scored: Dict[str, dict] = {}
+        misses: Dict[str, str] = {}
+        for candidate_id, content_hash in content_hashes.items():
+            if content_hash in cached:
+                scored[candidate_id] = cached[content_hash]
+            else:
+                misses[candidate_id] = content_hash
+
+        pool = asyncio.Semaphore(self.concurrency)
+        failed: Dict[str, str] = {}
+
+        async def score(candidate_id: str) -> None:
+            async with pool:
+                try:
+                    output = await chain.ainvoke({"criteria": criteria, "profile": profiles[candidate_id]})
+                    scored[candidate_id] = parse_score(output)
+                except Exception as e:
+                    failed[candidate_id] = str(e)
+
+        await asyncio.gather(*[score(candidate_id) for candidate_id in misses])
+        await run_in_executor(None, self.cache.put_many, prompt_hash, {misses[c]: scored[c] for c in misses if c in scored})
+
+        eligible = ((candidate_id, s) for candidate_id, s in scored.items() if s[FIELD_SCORE] >= min_score)
+        top = heapq.nsmallest(max(0, top_n), eligible, key=lambda item: (-item[1][FIELD_SCORE], item[0]))
+        return {
+            "task": task,
+            "ranked": [{FIELD_CANDIDATE_ID: candidate_id, **s} for candidate_id, s in top],
+            "candidates": len(profiles),
+            "scored": len(misses) - len(failed),
+            "cached": len(profiles) - len(misses),
+            "failed": [{FIELD_CANDIDATE_ID: candidate_id, "error": error} for candidate_id, error in failed.items()],
+        }
@@ -1,30 +1,216 @@
 import os
+import shutil
+import uuid
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Dict, Any
-from langchain_chroma import Chroma
-from langchain_core.documents import Document
+from typing import List, Dict, Any, Tuple, TYPE_CHECKING
+
+from src.core.infrastructure.lexical_index import LexicalIndex
+from src.core.application.attribute_index import AttributeIndex
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
 
 ENV_DATA_DIR = "DATA_DIR"
 DEFAULT_DATA_DIR = "./data"
 VECTORS_SUBDIR = "vectors"
 CHROMA_SUBDIR = "chroma"
+FAISS_SUBDIR = "faiss"
+LEXICAL_SUBDIR = "lexical"
+GENERATIONS_SUBDIR = "generations"
+CURRENT_GENERATION_FILE = "CURRENT"
+GENERATION_COMPLETE_FILE = "manifest.json"
+GENERATION_TIME_FORMAT = "%Y%m%d-%H%M%S-%f"
+INDEX_VERSION_ENCODING = "utf-8"
+INDEX_VERSION_NONE = ""
 ENGLISH_LEVEL_MAP = {"A1": 1, "A2": 2, "B1": 3, "B2": 4, "C1": 5, "C2": 6}
 META_PREPARED = "prepared"
-META_ENGLISH_LEVEL_MIN = "english_level_num_min"
+META_ENGLISH_LEVEL_NUM = "english_level_num"
+ENV_VECTOR_STORE = "VECTOR_STORE"
+ENV_FAISS_INDEX_TYPE = "FAISS_INDEX_TYPE"
+ENV_FAISS_QUANTIZATION = "FAISS_QUANTIZATION"
+ENV_FAISS_NLIST = "FAISS_NLIST"
+ENV_FAISS_NPROBE = "FAISS_NPROBE"
+ENV_FAISS_HNSW_M = "FAISS_HNSW_M"
+ENV_FAISS_EF_SEARCH = "FAISS_EF_SEARCH"
+ENV_FAISS_PQ_M = "FAISS_PQ_M"
+ENV_FAISS_MMAP = "FAISS_MMAP"
+VECTOR_STORE_CHROMA = "chroma"
+VECTOR_STORE_FAISS = "faiss"
+DEFAULT_VECTOR_STORE = VECTOR_STORE_CHROMA
+DEFAULT_FAISS_INDEX_TYPE = "flat"
+DEFAULT_FAISS_QUANTIZATION = "none"
+DEFAULT_FAISS_NLIST = "0"
+DEFAULT_FAISS_NPROBE = "8"
+DEFAULT_FAISS_HNSW_M = "32"
+DEFAULT_FAISS_EF_SEARCH = "64"
+DEFAULT_FAISS_PQ_M = "0"
+DEFAULT_FAISS_MMAP = "true"
+
+PRELOAD_LEXICAL = "lexical"
+PRELOAD_ATTRIBUTE = "attribute"
 
 BASE_VECTORS_DIR = Path(os.getenv(ENV_DATA_DIR, DEFAULT_DATA_DIR)) / VECTORS_SUBDIR
-BASE_VECTORS_DIR.mkdir(parents=True, exist_ok=True)
+_preloaded: Dict[Tuple[str, str, str], Any] = {}
+
+def generations_dir() -> Path:
+    return BASE_VECTORS_DIR / GENERATIONS_SUBDIR
+
+def index_dir(generation: str | None = None) -> Path:
+    generation = read_index_version() if generation is None else generation
+    if not generation:
+        return BASE_VECTORS_DIR
+    return generations_dir() / generation
+
+def chroma_from_documents(docs: List["Document"], embeddings, directory: Path | None = None):
+    from langchain_chroma import Chroma
+    return Chroma.from_documents(docs, embeddings, persist_directory=str((directory or index_dir()) / CHROMA_SUBDIR))
+
+def chroma_persistent(embeddings, directory: Path | None = None):
+    from langchain_chroma import Chroma
+    return Chroma(persist_directory=str((directory or index_dir()) / CHROMA_SUBDIR), embedding_function=embeddings)
+
+def chroma_reset(embeddings, directory: Path | None = None):
+    vector_store = chroma_persistent(embeddings, directory)
+    vector_store.reset_collection()
+    return vector_store
+
+def vector_store_backend() -> str:
+    backend = os.getenv(ENV_VECTOR_STORE, DEFAULT_VECTOR_STORE).lower()
+    if backend not in (VECTOR_STORE_CHROMA, VECTOR_STORE_FAISS):
+        raise ValueError(f"Unsupported VECTOR_STORE: {backend}")
+    return backend
+
+def faiss_options() -> Dict[str, Any]:
+    return {
+        "index_type": os.getenv(ENV_FAISS_INDEX_TYPE, DEFAULT_FAISS_INDEX_TYPE).lower(),
+        "quantization": os.getenv(ENV_FAISS_QUANTIZATION, DEFAULT_FAISS_QUANTIZATION).lower(),
+        "nlist": int(os.getenv(ENV_FAISS_NLIST, DEFAULT_FAISS_NLIST)),
+        "nprobe": int(os.getenv(ENV_FAISS_NPROBE, DEFAULT_FAISS_NPROBE)),
+        "hnsw_m": int(os.getenv(ENV_FAISS_HNSW_M, DEFAULT_FAISS_HNSW_M)),
+        "ef_search": int(os.getenv(ENV_FAISS_EF_SEARCH, DEFAULT_FAISS_EF_SEARCH)),
+        "pq_m": int(os.getenv(ENV_FAISS_PQ_M, DEFAULT_FAISS_PQ_M)),
+    }
+
+def vector_store_fingerprint() -> Dict[str, Any]:
+    backend = vector_store_backend()
+    if backend != VECTOR_STORE_FAISS:
+        return {"backend": backend}
+    options = faiss_options()
+    return {"backend": backend, **{key: options[key] for key in ("index_type", "quantization", "nlist", "hnsw_m", "pq_m")}}
+
+def vector_store_exists(directory: Path | None = None) -> bool:
+    directory = directory or index_dir()
+    if vector_store_backend() == VECTOR_STORE_FAISS:
+        from src.core.infrastructure.faiss_store import FaissVectorStore
+        return FaissVectorStore.exists(directory / FAISS_SUBDIR)
+    return (directory / CHROMA_SUBDIR).exists()
+
+def vector_store_persistent(embeddings, mmap: bool | None = None, directory: Path | None = None):
+    directory = directory or index_dir()
+    if vector_store_backend() == VECTOR_STORE_FAISS:
+        from src.core.infrastructure.faiss_store import FaissVectorStore
+        if mmap is None:
+            mmap = os.getenv(ENV_FAISS_MMAP, DEFAULT_FAISS_MMAP).lower() == "true"
+        return FaissVectorStore.load(embeddings, directory / FAISS_SUBDIR, mmap=mmap, **faiss_options())
+    return chroma_persistent(embeddings, directory)
+
+def vector_store_reset(embeddings, directory: Path | None = None):
+    directory = directory or index_dir()
+    if vector_store_backend() == VECTOR_STORE_FAISS:
+        from src.core.infrastructure.faiss_store import FaissVectorStore
+        return FaissVectorStore(embeddings, directory / FAISS_SUBDIR, **faiss_options())
+    return chroma_reset(embeddings, directory)
+
+def vector_store_from_documents(docs: List["Document"], embeddings, directory: Path | None = None):
+    if vector_store_backend() == VECTOR_STORE_FAISS:
+        vector_store = vector_store_reset(embeddings, directory)
+        vector_store.add_documents(docs)
+        vector_store.save()
+        return vector_store
+    return chroma_from_documents(docs, embeddings, directory)
+
+def persist_vector_store(vector_store) -> None:
+    save = getattr(vector_store, "save", None)
+    if save is not None:
+        save()
+
+def close_vector_store(vector_store) -> None:
+    close = getattr(getattr(vector_store, "_client", None), "close", None)
+    if close is not None:
+        close()
+
+def lexical_index_dir(directory: Path | None = None) -> Path:
+    return (directory or index_dir()) / LEXICAL_SUBDIR
+
+def load_lexical_index(version: str | None = None) -> LexicalIndex | None:
+    version = read_index_version() if version is None else version
+    directory = lexical_index_dir(index_dir(version))
+    preloaded = _preloaded.get((PRELOAD_LEXICAL, str(directory), version))
+    if preloaded is not None:
+        return preloaded
+    if not LexicalIndex.exists(directory):
+        return None
+    return LexicalIndex.load(directory)
+
+def load_attribute_index(version: str | None = None) -> AttributeIndex | None:
+    version = read_index_version() if version is None else version
+    directory = index_dir(version)
+    preloaded = _preloaded.get((PRELOAD_ATTRIBUTE, str(directory), version))
+    if preloaded is not None:
+        return preloaded
+    if not AttributeIndex.exists(directory):
+        return None
+    return AttributeIndex.load(directory)
+
+def preload_indexes() -> dict:
+    version = read_index_version()
+    directory = index_dir(version)
+    _preloaded.clear()
+    lexical_index = load_lexical_index(version)
+    if lexical_index is not None:
+        lexical_index.freeze()
+        _preloaded[(PRELOAD_LEXICAL, str(lexical_index_dir(directory)), version)] = lexical_index
+    attribute_index = load_attribute_index(version)
+    if attribute_index is not None:
+        _preloaded[(PRELOAD_ATTRIBUTE, str(directory), version)] = attribute_index
+    return {"index_version": version, "lexical_chunks": len(lexical_index) if lexical_index is not None else 0, "attribute_index": attribute_index is not None}
+
+def read_index_version() -> str:
+    version_path = BASE_VECTORS_DIR / CURRENT_GENERATION_FILE
+    try:
+        return version_path.read_text(encoding=INDEX_VERSION_ENCODING).strip()
+    except FileNotFoundError:
+        return INDEX_VERSION_NONE
+
+def new_generation() -> str:
+    return f"{datetime.now(timezone.utc).strftime(GENERATION_TIME_FORMAT)}-{uuid.uuid4().hex[:8]}"
 
-def chroma_from_documents(docs: List[Document], embeddings):
-    return Chroma.from_documents(docs, embeddings, persist_directory=str(BASE_VECTORS_DIR / CHROMA_SUBDIR))
+def activate_generation(generation: str) -> None:
+    BASE_VECTORS_DIR.mkdir(parents=True, exist_ok=True)
+    version_path = BASE_VECTORS_DIR / CURRENT_GENERATION_FILE
+    tmp_path = version_path.with_suffix(".tmp")
+    tmp_path.write_text(generation, encoding=INDEX_VERSION_ENCODING)
+    os.replace(tmp_path, version_path)
 
-def chroma_persistent(embeddings):
-    return Chroma(persist_directory=str(BASE_VECTORS_DIR / CHROMA_SUBDIR), embedding_function=embeddings)
+def collect_generations(keep: int) -> List[str]:
+    if not generations_dir().exists():
+        return []
+    current = read_index_version()
+    names = sorted((path.name for path in generations_dir().iterdir() if path.is_dir()), reverse=True)
+    complete = [name for name in names if name != current and (generations_dir() / name / GENERATION_COMPLETE_FILE).exists()]
+    retained = {current, *complete[:max(0, keep - 1)]}
+    removed = [name for name in names if name not in retained]
+    for name in removed:
+        shutil.rmtree(generations_dir() / name, ignore_errors=True)
+    return removed
 
 def build_metadata_filter(prepared: bool | None = None, english_min: str | None = None) -> Dict[str, Any] | None:
-    metadata: Dict[str, Any] = {}
+    clauses: List[Dict[str, Any]] = []
     if prepared is not None:
-        metadata[META_PREPARED] = prepared
+        clauses.append({META_PREPARED: prepared})
     if english_min:
-        metadata[META_ENGLISH_LEVEL_MIN] = ENGLISH_LEVEL_MAP.get(english_min.upper(), 0)
-    return metadata or None
+        clauses.append({META_ENGLISH_LEVEL_NUM: {"$gte": ENGLISH_LEVEL_MAP.get(english_min.upper(), 0)}})
+    if len(clauses) > 1:
+        return {"$and": clauses}
+    return clauses[0] if clauses else None
@@ -1,7 +1,7 @@
 from __future__ import annotations
 from pydantic import BaseModel
-from typing import Any, Dict, List
-import json, re
+from typing import Any, Dict, List, Tuple
+import re
 
 ENGLISH_LEVEL_MAP = {
     "A1": 1,
@@ -13,7 +13,15 @@ ENGLISH_LEVEL_MAP = {
 }
 ENGLISH_LEVEL_INV = {v: k for k, v in ENGLISH_LEVEL_MAP.items()}
 ENGLISH_LANGUAGE_NAMES = {"english", "inglés", "en"}
+ENGLISH_LEVEL_KEYWORDS = (
+    ("advanced", ENGLISH_LEVEL_MAP["C1"]),
+    ("upper", ENGLISH_LEVEL_MAP["B2"]),
+    ("intermediate", ENGLISH_LEVEL_MAP["B1"]),
+)
+EVIDENCE_SNIPPET_CHARS = 60
 SENIORITY_LEVEL_KEYWORDS = ("mid", "senior", "lead", "staff", "principal")
+SENIORITY_ORDER = ("intern", "junior", "mid", "senior", "lead", "staff", "principal")
+SENIORITY_UNKNOWN = "unknown"
 MIN_PREPARED_SCORE = 60
 BACKEND_TITLE_KEYWORDS = ("backend", ".net", "c#", "asp.net")
 FRONTEND_TITLE_KEYWORDS = ("frontend", "react")
@@ -24,6 +32,37 @@ REGEX_ASPNET = r"\basp\.net\b"
 REGEX_ENTITY_FRAMEWORK = r"\bentity framework\b"
 REGEX_SQL_SERVER = r"\bsql server\b"
 REGEX_AZURE = r"\bazure\b"
+SECTION_SUMMARY = "Summary"
+SECTION_SKILLS = "SkillMatrix"
+SECTION_GENERAL_INFO = "GeneralInfo"
+SECTION_LANGUAGES = "Languages"
+SECTION_SCORES = "Scores"
+SECTION_ASSESSMENT = "Assessment"
+SECTION_TIPS = "Tips"
+SECTION_KEYWORD_COVERAGE = "KeywordCoverage"
+SECTION_RESUME = "CleanedResumeText"
+SCORE_SECTIONS = ("Scores", "Relevance", "ClarityAndFormatting")
+ASSESSMENT_SECTIONS = ("Strengths", "AreasToImprove")
+GENERAL_INFO_SKIPPED_FIELDS = ("CandidateId", "OtherLanguages")
+RESUME_SECTION_ALIASES = (
+    ("experienc", "Experience"),
+    ("educa", "Education"),
+    ("formaci", "Education"),
+    ("certif", "Certifications"),
+    ("curso", "Certifications"),
+    ("summary", SECTION_SUMMARY),
+    ("profile", SECTION_SUMMARY),
+    ("perfil", SECTION_SUMMARY),
+    ("resumen", SECTION_SUMMARY),
+    ("skill", SECTION_SKILLS),
+    ("habilidad", SECTION_SKILLS),
+    ("competenc", SECTION_SKILLS),
+    ("language", SECTION_LANGUAGES),
+    ("idioma", SECTION_LANGUAGES),
+)
+RESUME_COVERED_SECTIONS = (SECTION_SUMMARY, SECTION_SKILLS, SECTION_LANGUAGES)
+RESUME_HEADING_MAX_CHARS = 50
+RESUME_BLOCK_MAX_CHARS = 900
 KEYWORD_PATTERNS = [
     (REGEX_DOTNET, ".NET"),
     (REGEX_CSHARP, "C#"),
@@ -47,55 +86,146 @@ class CandidateRecord(BaseModel):
         seniority_level = ((self.raw.get("GeneralInfo") or {}).get("SeniorityLevel") or "").lower()
         return general_score >= MIN_PREPARED_SCORE or any(keyword in seniority_level for keyword in SENIORITY_LEVEL_KEYWORDS)
 
+    @property
+    def prepared_evidence(self) -> str:
+        general_score = (self.scores or {}).get("GeneralScore")
+        seniority_level = (self.raw.get("GeneralInfo") or {}).get("SeniorityLevel")
+        return "; ".join(_unique([
+            f"GeneralScore {general_score}" if general_score is not None else "",
+            f"SeniorityLevel {seniority_level}" if seniority_level else "",
+        ]))
+
     @property
     def english_level(self) -> str:
         return self._get_english_level()
 
+    @property
+    def english_evidence(self) -> str:
+        return self._assess_english()[1]
+
+    @property
+    def english_level_num(self) -> int:
+        return ENGLISH_LEVEL_MAP.get(self.english_level, 0)
+
+    @property
+    def seniority(self) -> str:
+        general_info = self.raw.get("GeneralInfo") or {}
+        seniority_text = str(general_info.get("SeniorityLevel") or general_info.get("Seniority") or "").lower()
+        for level in reversed(SENIORITY_ORDER):
+            if level in seniority_text:
+                return level
+        return SENIORITY_UNKNOWN
+
+    @property
+    def years_experience(self) -> float | None:
+        years = (self.raw.get("GeneralInfo") or {}).get("YearsExperience")
+        return float(years) if isinstance(years, (int, float)) else None
+
+    @property
+    def location(self) -> str:
+        return str((self.raw.get("GeneralInfo") or {}).get("Location") or "")
+
+    @property
+    def skill_names(self) -> List[str]:
+        return [str(skill.get("SkillName", "")) for skill in self.skills if skill.get("SkillName")]
+
+    @property
+    def derived_keywords(self) -> List[str]:
+        return sorted(self._get_derived_keywords())
+
     def _get_english_level(self) -> str:
-        english_level_sources: List[str] = []
+        return ENGLISH_LEVEL_INV.get(self._assess_english()[0], "UNKNOWN")
+
+    def _assess_english(self) -> Tuple[int, str]:
+        english_level_sources: List[Tuple[str, str | None]] = []
         for language_record in self.languages or []:
             language_name = str(language_record.get("Language", "")).lower()
             if language_name in ENGLISH_LANGUAGE_NAMES:
-                english_level_sources.append(str(language_record.get("Proficiency", "")))
+                proficiency = str(language_record.get("Proficiency", ""))
+                details = _unique([proficiency, str(language_record.get("Evidence") or "")])
+                english_level_sources.append((proficiency, f"{SECTION_LANGUAGES}: English {'; '.join(details)}"))
 
         general_info = self.raw.get("GeneralInfo") or {}
         if general_info.get("EnglishLevel"):
-            english_level_sources.append(str(general_info["EnglishLevel"]))
+            english_level_sources.append((str(general_info["EnglishLevel"]), f"{SECTION_GENERAL_INFO}: EnglishLevel {general_info['EnglishLevel']}"))
 
         if self.raw.get("CleanedResumeText"):
-            english_level_sources.append(str(self.raw["CleanedResumeText"]))
-
-        best_level = 0
-        for source_text in english_level_sources:
-            normalized_text = source_text.lower()
-            match = re.search(REGEX_ENGLISH_LEVEL, normalized_text)
-            if match:
-                best_level = max(best_level, ENGLISH_LEVEL_MAP[match.group(1).upper()])
-            if "advanced" in normalized_text:
-                best_level = max(best_level, ENGLISH_LEVEL_MAP["C1"])
-            if "upper" in normalized_text:
-                best_level = max(best_level, ENGLISH_LEVEL_MAP["B2"])
-            if "intermediate" in normalized_text and best_level < ENGLISH_LEVEL_MAP["B2"]:
-                best_level = max(best_level, ENGLISH_LEVEL_MAP["B1"])
-
-        return ENGLISH_LEVEL_INV.get(best_level, "UNKNOWN")
+            english_level_sources.append((str(self.raw["CleanedResumeText"]), None))
+
+        best_level, best_evidence = 0, ""
+        for source_text, evidence in english_level_sources:
+            level, position = _english_level_in(source_text.lower())
+            if level > best_level:
+                best_level = level
+                best_evidence = evidence or f"{SECTION_RESUME}: ...{_snippet(source_text, position)}..."
+        return best_level, best_evidence
 
     def to_text_blocks(self) -> List[str]:
-        text_blocks: List[str] = []
-        general_info = self.raw.get("GeneralInfo", {})
+        return [text for _, text in self.to_section_blocks()]
+
+    def to_section_blocks(self) -> List[Tuple[str, str]]:
+        general_info = self.raw.get("GeneralInfo") or {}
         title_hint = self._get_title_hint(general_info)
-        derived_keywords = self._get_derived_keywords()
+        section_blocks: List[Tuple[str, str]] = [
+            (SECTION_SUMMARY, f"[Candidate] {self.candidate_id} {title_hint}\nSummary:\n{self.summary}"),
+        ]
 
-        candidate_summary = f"[Candidate] {self.candidate_id} {title_hint}\nSummary:\n{self.summary}"
-        text_blocks.append(candidate_summary)
+        skill_lines = []
         if self.skills:
-            skills_summary = ", ".join([skill.get("SkillName", "") for skill in self.skills])
-            text_blocks.append(f"Skills: {skills_summary}")
+            skill_lines.append("Skills: " + ", ".join(self._format_skill(skill) for skill in self.skills))
+        derived_keywords = self._get_derived_keywords()
         if derived_keywords:
-            text_blocks.append(f"DerivedKeywords: {', '.join(sorted(derived_keywords))}")
+            skill_lines.append(f"DerivedKeywords: {', '.join(sorted(derived_keywords))}")
+        keywords_detected = (self.raw.get(SECTION_KEYWORD_COVERAGE) or {}).get("KeywordsDetected") or []
+        if keywords_detected:
+            skill_lines.append(f"KeywordsDetected: {', '.join(map(str, keywords_detected))}")
+        self._add_block(section_blocks, SECTION_SKILLS, skill_lines)
+
+        self._add_block(section_blocks, SECTION_GENERAL_INFO, [
+            f"{key}: {value}" for key, value in general_info.items()
+            if key not in GENERAL_INFO_SKIPPED_FIELDS and _is_scalar(value) and value not in (None, "")
+        ])
+
+        language_records: Dict[str, Dict[str, Any]] = {}
+        for language_record in list(self.languages or []) + list(general_info.get("OtherLanguages") or []):
+            language_records.setdefault(str(language_record.get("Language", "")).lower(), language_record)
+        self._add_block(section_blocks, SECTION_LANGUAGES, [self._format_language(r) for r in language_records.values()])
+
+        self._add_block(section_blocks, SECTION_SCORES, [
+            f"{name}: " + ", ".join(f"{key} {value}" for key, value in (self.raw.get(name) or {}).items() if _is_scalar(value))
+            for name in SCORE_SECTIONS if self.raw.get(name)
+        ])
+
+        assessment_lines = [
+            f"{name}: " + "; ".join(map(str, self.raw[name])) for name in ASSESSMENT_SECTIONS if self.raw.get(name)
+        ]
+        keyword_coverage = self.raw.get(SECTION_KEYWORD_COVERAGE) or {}
+        if keyword_coverage.get("KeywordsMissing"):
+            assessment_lines.append(f"KeywordsMissing: {', '.join(map(str, keyword_coverage['KeywordsMissing']))}")
+        self._add_block(section_blocks, SECTION_ASSESSMENT, assessment_lines)
+        tips_lines = [f"- {tip}" for tip in self.raw.get(SECTION_TIPS) or []]
+        if keyword_coverage.get("Context"):
+            tips_lines.append(f"KeywordContext: {keyword_coverage['Context']}")
+        self._add_block(section_blocks, SECTION_TIPS, tips_lines)
+
+        for section, heading, entries in _resume_sections(str(self.raw.get(SECTION_RESUME) or "")):
+            if section in RESUME_COVERED_SECTIONS:
+                continue
+            for block in _pack_entries(heading, entries, RESUME_BLOCK_MAX_CHARS):
+                section_blocks.append((section, f"[Candidate] {self.candidate_id} {section}:\n{block}"))
+        return section_blocks
+
+    def _add_block(self, section_blocks: List[Tuple[str, str]], section: str, lines: List[str]) -> None:
+        if lines:
+            section_blocks.append((section, f"[Candidate] {self.candidate_id} {section}:\n" + "\n".join(lines)))
 
-        text_blocks.append(json.dumps(self.raw, ensure_ascii=False))
-        return text_blocks
+    def _format_skill(self, skill: Dict[str, Any]) -> str:
+        level = skill.get("SkillLevel")
+        return f"{skill.get('SkillName', '')} ({level})" if level else str(skill.get("SkillName", ""))
+
+    def _format_language(self, language_record: Dict[str, Any]) -> str:
+        details = _unique([str(language_record.get("Proficiency") or ""), str(language_record.get("Evidence") or "")])
+        return f"{language_record.get('Language', '')}: {'; '.join(details)}"
 
     def _get_title_hint(self, general_info: Dict[str, Any]) -> str:
         detected_title = str(general_info.get("TitleDetected", ""))
@@ -115,4 +245,74 @@ class CandidateRecord(BaseModel):
         for regex_pattern, keyword_name in KEYWORD_PATTERNS:
             if re.search(regex_pattern, combined_text, re.IGNORECASE):
                 derived_keywords.add(keyword_name)
-        return derived_keywords
\ No newline at end of file
+        return derived_keywords
+
+def _english_level_in(normalized_text: str) -> Tuple[int, int]:
+    level, position = 0, -1
+    match = re.search(REGEX_ENGLISH_LEVEL, normalized_text)
+    if match:
+        level, position = ENGLISH_LEVEL_MAP[match.group(1).upper()], match.start()
+    for keyword, keyword_level in ENGLISH_LEVEL_KEYWORDS:
+        index = normalized_text.find(keyword)
+        if index >= 0 and keyword_level > level:
+            level, position = keyword_level, index
+    return level, position
+
+def _snippet(text: str, position: int) -> str:
+    start = max(0, position - EVIDENCE_SNIPPET_CHARS)
+    return " ".join(text[start:position + EVIDENCE_SNIPPET_CHARS].split())
+
+def _is_scalar(value: Any) -> bool:
+    return isinstance(value, (str, int, float, bool))
+
+def _unique(lines: List[str]) -> List[str]:
+    return list(dict.fromkeys(line for line in lines if line))
+
+def _resume_section_name(heading: str) -> str:
+    lowered = heading.lower()
+    for keyword, section in RESUME_SECTION_ALIASES:
+        if keyword in lowered:
+            return section
+    return heading.title()
+
+def _is_resume_heading(line: str, previous_line: str | None) -> bool:
+    stripped = line.strip()
+    return (
+        previous_line is not None
+        and not previous_line.strip()
+        and 0 < len(stripped) <= RESUME_HEADING_MAX_CHARS
+        and stripped == stripped.upper()
+        and any(ch.isalpha() for ch in stripped)
+        and "|" not in stripped
+    )
+
+def _resume_sections(resume_text: str) -> List[Tuple[str, str, List[str]]]:
+    sections: List[Tuple[str, str, List[str]]] = []
+    entry_lines: List[str] = []
+    previous_line = None
+    for line in resume_text.splitlines():
+        if _is_resume_heading(line, previous_line):
+            heading = line.strip().title()
+            sections.append((_resume_section_name(heading), heading, []))
+        elif not line.strip():
+            if sections and entry_lines:
+                sections[-1][2].append("\n".join(entry_lines))
+            entry_lines = []
+        elif sections:
+            entry_lines.append(line.strip())
+        previous_line = line
+    if sections and entry_lines:
+        sections[-1][2].append("\n".join(entry_lines))
+    return [section for section in sections if section[2]]
+
+def _pack_entries(heading: str, entries: List[str], max_chars: int) -> List[str]:
+    blocks: List[str] = []
+    current = ""
+    for entry in entries:
+        if current and len(current) + len(entry) + 2 > max_chars:
+            blocks.append(current)
+            current = ""
+        current = f"{current}\n\n{entry}" if current else f"{heading}:\n{entry}"
+    if current:
+        blocks.append(current)
+    return blocks
@@ -0,0 +1,115 @@
+import os
+import queue
+import threading
+import time
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+from src.core.infrastructure.embedding_cache import embed_queries
+from src.core.infrastructure.metrics import Histogram, EMBED_BATCH_SIZE, EMBED_QUEUE_WAIT_SECONDS
+
+__all__ = ["MicroBatchingEmbeddings"]
+
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_MAX_WAIT_S = 0.002
+WORKER_THREAD_NAME = "embedding-batcher"
+
+class _Pending:
+    __slots__ = ("text", "enqueued_at", "done", "vector", "error")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.enqueued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.vector: List[float] | None = None
+        self.error: Exception | None = None
+
+class MicroBatchingEmbeddings(Embeddings):
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_s: float = DEFAULT_MAX_WAIT_S,
+        batch_sizes: Histogram = EMBED_BATCH_SIZE,
+        queue_wait: Histogram = EMBED_QUEUE_WAIT_SECONDS,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self.embeddings = embeddings
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max(0.0, max_wait_s)
+        self.batch_sizes = batch_sizes
+        self.queue_wait = queue_wait
+        self.batches = 0
+        self.queries = 0
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[_Pending]" = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self._worker_pid: int | None = None
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        return embed_queries(self.embeddings, texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        pending = _Pending(text)
+        self._ensure_worker()
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.vector
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "queries": self.queries,
+            "mean_batch_size": round(self.queries / self.batches, 2) if self.batches else 0.0,
+            "queued": self._queue.qsize(),
+        }
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker_pid == os.getpid():
+                return
+            if self._worker_pid != os.getpid():
+                self._queue = queue.Queue()
+            self._worker = threading.Thread(target=self._run, args=(self._queue,), name=WORKER_THREAD_NAME, daemon=True)
+            self._worker_pid = os.getpid()
+            self._worker.start()
+
+    def _run(self, pending_queue: "queue.Queue[_Pending]") -> None:
+        while True:
+            batch = [pending_queue.get()]
+            deadline = batch[0].enqueued_at + self.max_wait_s
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    batch.append(pending_queue.get(timeout=remaining) if remaining > 0 else pending_queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._process(batch)
+
+    def _process(self, batch: List[_Pending]) -> None:
+        started = time.perf_counter()
+        for pending in batch:
+            self.queue_wait.observe(started - pending.enqueued_at)
+        self.batch_sizes.observe(len(batch))
+        self.batches += 1
+        self.queries += len(batch)
+        texts = list(dict.fromkeys(pending.text for pending in batch))
+        try:
+            vectors = dict(zip(texts, embed_queries(self.embeddings, texts)))
+        except Exception as e:
+            for pending in batch:
+                pending.error = e
+                pending.done.set()
+            return
+        for pending in batch:
+            pending.vector = vectors[pending.text]
+            pending.done.set()
@@ -0,0 +1,305 @@
+from __future__ import annotations
+from collections import OrderedDict
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Dict, List, Sequence
+import atexit
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+__all__ = ["EmbeddingStore", "CachedEmbeddings", "open_embedding_store", "cache_namespace", "embed_queries"]
+
+FILE_ENCODING = "utf-8"
+META_FILE = "meta.json"
+VECTORS_FILE = "vectors.f32"
+KEYS_FILE = "keys.bin"
+TICKS_FILE = "ticks.bin"
+EPOCH_FILE = "epoch.bin"
+LOCK_FILE = ".lock"
+KEY_BYTES = 16
+KEY_DTYPE = np.uint64
+KEY_WORDS = KEY_BYTES // np.dtype(KEY_DTYPE).itemsize
+VECTOR_DTYPE = np.float32
+TICK_DTYPE = np.int64
+EVICTION_FRACTION = 0.1
+KIND_DOCUMENT = "document"
+KIND_QUERY = "query"
+DEFAULT_MAX_ENTRIES = 200_000
+DEFAULT_MEMORY_ENTRIES = 10_000
+
+_stores: Dict[str, "EmbeddingStore"] = {}
+_stores_lock = threading.Lock()
+
+def cache_namespace(model_name: str, normalize: bool) -> str:
+    return hashlib.sha256(f"{model_name}|{normalize}".encode(FILE_ENCODING)).hexdigest()[:16]
+
+def text_key(text: str, kind: str) -> bytes:
+    return hashlib.sha256(f"{kind}\0{text}".encode(FILE_ENCODING)).digest()[:KEY_BYTES]
+
+def embed_queries(embeddings: Embeddings, texts: List[str]) -> List[List[float]]:
+    batched = getattr(embeddings, "embed_queries", None)
+    if batched is not None:
+        return batched(texts)
+    if getattr(embeddings, "query_encode_kwargs", None) == {}:
+        return embeddings.embed_documents(texts)
+    return [embeddings.embed_query(text) for text in texts]
+
+def open_embedding_store(path: Path, max_entries: int = DEFAULT_MAX_ENTRIES, memory_entries: int = DEFAULT_MEMORY_ENTRIES) -> "EmbeddingStore":
+    resolved = str(Path(path).resolve())
+    with _stores_lock:
+        store = _stores.get(resolved)
+        if store is None:
+            store = EmbeddingStore(Path(path), max_entries=max_entries, memory_entries=memory_entries)
+            _stores[resolved] = store
+        return store
+
+@atexit.register
+def _flush_stores() -> None:
+    for store in list(_stores.values()):
+        store.flush()
+
+class EmbeddingStore:
+    def __init__(self, path: Path, max_entries: int = DEFAULT_MAX_ENTRIES, memory_entries: int = DEFAULT_MEMORY_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._memory: OrderedDict[bytes, List[float]] = OrderedDict()
+        self._slots: Dict[bytes, int] = {}
+        self._free: List[int] = []
+        self._vectors = None
+        self._keys = None
+        self._ticks = None
+        self._epoch = None
+        self._seen_epoch = -1
+        self._tick = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if (path / META_FILE).exists():
+            with self._file_lock():
+                self._open_existing()
+
+    @property
+    def dim(self) -> int | None:
+        return None if self._vectors is None else self._vectors.shape[1]
+
+    def get_many(self, keys: Sequence[bytes]) -> List[List[float] | None]:
+        out: List[List[float] | None] = []
+        self._check_fork()
+        with self._lock:
+            if self._vectors is None and (self.path / META_FILE).exists():
+                with self._file_lock():
+                    self._open_existing()
+            self._refresh()
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    out.append(vector)
+                    continue
+                slot = self._slots.get(key)
+                vector = self._read_slot(slot, key) if slot is not None else None
+                if vector is None:
+                    if slot is not None:
+                        self._slots.pop(key, None)
+                    self.misses += 1
+                    out.append(None)
+                    continue
+                self._tick += 1
+                self._ticks[slot] = self._tick
+                self._remember(key, vector)
+                self.disk_hits += 1
+                out.append(vector)
+        return out
+
+    def put_many(self, keys: Sequence[bytes], vectors: Sequence[Sequence[float]]) -> List[List[float]]:
+        stored: List[List[float]] = []
+        if not keys:
+            return stored
+        self._check_fork()
+        with self._lock, self._file_lock():
+            if self._vectors is None:
+                if (self.path / META_FILE).exists():
+                    self._open_existing()
+                else:
+                    self._create(len(vectors[0]))
+            self._refresh()
+            self._tick = max(self._tick, int(self._ticks.max()))
+            for key, vector in zip(keys, vectors):
+                slot = self._slots.get(key)
+                if slot is None:
+                    slot = self._allocate()
+                    self._slots[key] = slot
+                self._keys[slot] = 0
+                self._vectors[slot] = np.asarray(vector, dtype=VECTOR_DTYPE)
+                self._keys[slot] = np.frombuffer(key, dtype=KEY_DTYPE)
+                self._tick += 1
+                self._ticks[slot] = self._tick
+                stored_vector = self._vectors[slot].tolist()
+                self._remember(key, stored_vector)
+                stored.append(stored_vector)
+            self._epoch[0] += 1
+            self._seen_epoch = int(self._epoch[0])
+        return stored
+
+    def flush(self) -> None:
+        with self._lock:
+            for array in (self._vectors, self._keys, self._ticks, self._epoch):
+                if array is not None:
+                    array.flush()
+
+    def stats(self) -> dict:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "hits": self.memory_hits + self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._slots),
+            "memory_entries": len(self._memory),
+            "max_entries": self.max_entries,
+        }
+
+    def _remember(self, key: bytes, vector: List[float]) -> None:
+        if self.memory_entries <= 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _check_fork(self) -> None:
+        if self._pid == os.getpid():
+            return
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._seen_epoch = -1
+
+    def _read_slot(self, slot: int, key: bytes) -> List[float] | None:
+        expected = np.frombuffer(key, dtype=KEY_DTYPE)
+        if not np.array_equal(self._keys[slot], expected):
+            return None
+        vector = self._vectors[slot].tolist()
+        return vector if np.array_equal(self._keys[slot], expected) else None
+
+    def _refresh(self) -> None:
+        if self._epoch is None or int(self._epoch[0]) == self._seen_epoch:
+            return
+        self._seen_epoch = int(self._epoch[0])
+        self._slots = {}
+        used = self._used_slots()
+        for slot in used.tolist():
+            self._slots[self._keys[slot].tobytes()] = slot
+        free = np.ones(self.max_entries, dtype=bool)
+        free[used] = False
+        self._free = np.flatnonzero(free)[::-1].tolist()
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self.path / LOCK_FILE, "a+b") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _allocate(self) -> int:
+        if not self._free:
+            self._evict()
+        return self._free.pop()
+
+    def _evict(self) -> None:
+        used = self._used_slots()
+        count = max(1, int(self.max_entries * EVICTION_FRACTION))
+        oldest = used[np.argpartition(self._ticks[used], min(count, len(used)) - 1)[:count]]
+        for slot in oldest.tolist():
+            key = self._keys[slot].tobytes()
+            self._slots.pop(key, None)
+            self._memory.pop(key, None)
+            self._keys[slot] = 0
+            self._ticks[slot] = 0
+            self._free.append(slot)
+        self.evictions += len(oldest)
+
+    def _create(self, dim: int) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        meta = {"dim": dim, "max_entries": self.max_entries}
+        (self.path / META_FILE).write_text(json.dumps(meta), encoding=FILE_ENCODING)
+        self._map_files(dim, mode="w+")
+        self._free = list(range(self.max_entries - 1, -1, -1))
+        self._slots = {}
+        self._epoch[0] += 1
+        self._seen_epoch = int(self._epoch[0])
+
+    def _open_existing(self) -> None:
+        meta = json.loads((self.path / META_FILE).read_text(encoding=FILE_ENCODING))
+        if meta.get("max_entries") != self.max_entries:
+            self._create(int(meta["dim"]))
+            return
+        self._map_files(int(meta["dim"]), mode="r+")
+        self._seen_epoch = -1
+        self._refresh()
+        self._tick = int(self._ticks.max()) if self.max_entries else 0
+
+    def _used_slots(self) -> np.ndarray:
+        return np.flatnonzero(self._keys.any(axis=1))
+
+    def _map_files(self, dim: int, mode: str) -> None:
+        self._vectors = np.memmap(self.path / VECTORS_FILE, dtype=VECTOR_DTYPE, mode=mode, shape=(self.max_entries, dim))
+        self._keys = np.memmap(self.path / KEYS_FILE, dtype=KEY_DTYPE, mode=mode, shape=(self.max_entries, KEY_WORDS))
+        self._ticks = np.memmap(self.path / TICKS_FILE, dtype=TICK_DTYPE, mode=mode, shape=(self.max_entries,))
+        epoch_mode = "r+" if (self.path / EPOCH_FILE).exists() else "w+"
+        self._epoch = np.memmap(self.path / EPOCH_FILE, dtype=TICK_DTYPE, mode=epoch_mode, shape=(1,))
+
+class CachedEmbeddings(Embeddings):
+    def __init__(self, embeddings: Embeddings, store: EmbeddingStore):
+        self.embeddings = embeddings
+        self.store = store
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(texts, KIND_DOCUMENT)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text], KIND_QUERY)[0]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(texts, KIND_QUERY)
+
+    def stats(self) -> dict:
+        return self.store.stats()
+
+    def _embed(self, texts: List[str], kind: str) -> List[List[float]]:
+        keys = [text_key(text, kind) for text in texts]
+        vectors = self.store.get_many(keys)
+        missing: Dict[bytes, str] = {}
+        for key, text, vector in zip(keys, texts, vectors):
+            if vector is None:
+                missing.setdefault(key, text)
+        if missing:
+            missing_keys = list(missing)
+            missing_texts = list(missing.values())
+            if kind == KIND_QUERY:
+                computed = embed_queries(self.embeddings, missing_texts)
+            else:
+                computed = self.embeddings.embed_documents(missing_texts)
+            by_key = dict(zip(missing_keys, self.store.put_many(missing_keys, computed)))
+            vectors = [vector if vector is not None else by_key[key] for key, vector in zip(keys, vectors)]
+        return vectors
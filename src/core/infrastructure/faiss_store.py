@@ -0,0 +1,440 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import json
+import math
+import os
+import threading
+import uuid
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+__all__ = ["FaissVectorStore", "INDEX_TYPES", "QUANTIZATIONS"]
+
+FILE_ENCODING = "utf-8"
+INDEX_FILE = "index.faiss"
+VECTORS_FILE = "vectors.npy"
+DOCSTORE_FILE = "docstore.json"
+FAISS_STORE_VERSION = 1
+INDEX_FLAT = "flat"
+INDEX_IVF = "ivf"
+INDEX_HNSW = "hnsw"
+INDEX_TYPES = (INDEX_FLAT, INDEX_IVF, INDEX_HNSW)
+QUANT_NONE = "none"
+QUANT_PQ = "pq"
+QUANT_INT8 = "int8"
+QUANTIZATIONS = (QUANT_NONE, QUANT_PQ, QUANT_INT8)
+SPEC_EXACT = "Flat"
+PQ_BITS = 8
+PQ_MIN_TRAIN = 1 << PQ_BITS
+IVF_POINTS_PER_LIST = 39
+IVF_LISTS_PER_SQRT = 4
+RETRAIN_GROWTH = 4
+COMPACT_DEAD_RATIO = 0.2
+EXACT_SEARCH_MAX = 2048
+DEFAULT_NPROBE = 8
+DEFAULT_HNSW_M = 32
+DEFAULT_EF_SEARCH = 64
+VECTOR_DTYPE = np.float32
+
+def _pq_subquantizers(dim: int, requested: int) -> int:
+    target = requested or max(1, dim // 8)
+    for m in range(min(target, dim), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+def _needs_training(spec: str) -> bool:
+    return "IVF" in spec or "PQ" in spec
+
+def _mmap_flags() -> int:
+    return getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+class _Column:
+    def __init__(self, values: Iterable[Any]):
+        codes: Dict[Any, int] = {}
+        self.codes = np.array([codes.setdefault(v, len(codes)) for v in values], dtype=np.int32)
+        self.values: List[Any] = list(codes)
+
+    def mask(self, predicate: Callable[[Any], bool]) -> np.ndarray:
+        table = np.array([predicate(v) for v in self.values], dtype=bool)
+        return table[self.codes]
+
+def _compare(op: str, operand: Any) -> Callable[[Any], bool]:
+    if op == "$eq":
+        return lambda v: v == operand
+    if op == "$ne":
+        return lambda v: v != operand
+    if op == "$in":
+        allowed = set(operand)
+        return lambda v: v in allowed
+    if op == "$nin":
+        blocked = set(operand)
+        return lambda v: v not in blocked
+    comparisons = {
+        "$gt": lambda v: v > operand,
+        "$gte": lambda v: v >= operand,
+        "$lt": lambda v: v < operand,
+        "$lte": lambda v: v <= operand,
+    }
+    if op not in comparisons:
+        raise ValueError(f"Unsupported filter operator: {op}")
+    compare = comparisons[op]
+    return lambda v: isinstance(v, (int, float)) and not isinstance(v, bool) and compare(v)
+
+class FaissVectorStore(VectorStore):
+    def __init__(
+        self,
+        embedding: Embeddings,
+        directory: Path | None = None,
+        index_type: str = INDEX_FLAT,
+        quantization: str = QUANT_NONE,
+        nlist: int = 0,
+        nprobe: int = DEFAULT_NPROBE,
+        hnsw_m: int = DEFAULT_HNSW_M,
+        ef_search: int = DEFAULT_EF_SEARCH,
+        pq_m: int = 0,
+    ):
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unsupported FAISS index type: {index_type}")
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unsupported FAISS quantization: {quantization}")
+        self._embedding = embedding
+        self.directory = directory
+        self.index_type = index_type
+        self.quantization = quantization
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.hnsw_m = hnsw_m
+        self.ef_search = ef_search
+        self.pq_m = pq_m
+        self.dim: int | None = None
+        self.spec: str | None = None
+        self.trained_on = 0
+        self.mmap = False
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadatas: List[dict] = []
+        self._alive: List[bool] = []
+        self._docnos: Dict[str, int] = {}
+        self._vectors: np.ndarray | None = None
+        self._pending: List[np.ndarray] = []
+        self._index = None
+        self._indexed = 0
+        self._columns: Dict[str, _Column] = {}
+        self._alive_mask = np.zeros(0, dtype=bool)
+        self._lock = threading.RLock()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def __len__(self) -> int:
+        return len(self._docnos)
+
+    @classmethod
+    def exists(cls, directory: Path) -> bool:
+        return all((directory / name).exists() for name in (INDEX_FILE, VECTORS_FILE, DOCSTORE_FILE))
+
+    @classmethod
+    def load(cls, embedding: Embeddings, directory: Path, mmap: bool = True, **options) -> "FaissVectorStore":
+        store = cls(embedding, directory, **options)
+        if not cls.exists(directory):
+            return store
+        meta = json.loads((directory / DOCSTORE_FILE).read_text(encoding=FILE_ENCODING))
+        if meta.get("version") != FAISS_STORE_VERSION:
+            return store
+        store.dim = meta["dim"]
+        store.spec = meta["spec"]
+        store.trained_on = meta["trained_on"]
+        store._ids = meta["ids"]
+        store._texts = meta["texts"]
+        store._metadatas = meta["metadatas"]
+        store._alive = meta["alive"]
+        store._docnos = {doc_id: i for i, doc_id in enumerate(store._ids) if store._alive[i]}
+        store._vectors = np.load(directory / VECTORS_FILE, mmap_mode="r" if mmap else None)
+        store._index = faiss.read_index(str(directory / INDEX_FILE), _mmap_flags() if mmap else 0)
+        store._indexed = store._index.ntotal
+        store.mmap = mmap
+        store._invalidate()
+        return store
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> "FaissVectorStore":
+        store = cls(embedding, **kwargs)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        if store.directory is not None:
+            store.save()
+        return store
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        vectors = self._embedding.embed_documents(texts) if texts else []
+        return self.add_embeddings(texts, vectors, metadatas=metadatas, ids=ids)
+
+    def add_embeddings(
+        self,
+        texts: Sequence[str],
+        vectors: Sequence[Sequence[float]] | np.ndarray,
+        metadatas: Optional[Sequence[dict]] = None,
+        ids: Optional[Sequence[str]] = None,
+    ) -> List[str]:
+        if not len(texts):
+            return []
+        vectors = np.ascontiguousarray(vectors, dtype=VECTOR_DTYPE)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match index dimension {self.dim}")
+        ids = list(ids) if ids is not None else [uuid.uuid4().hex for _ in texts]
+        metadatas = list(metadatas) if metadatas is not None else [{} for _ in texts]
+        with self._lock:
+            self.delete([doc_id for doc_id in ids if doc_id in self._docnos])
+            for doc_id, text, metadata in zip(ids, texts, metadatas):
+                self._docnos[doc_id] = len(self._ids)
+                self._ids.append(doc_id)
+                self._texts.append(text)
+                self._metadatas.append(dict(metadata or {}))
+                self._alive.append(True)
+            self._pending.append(vectors)
+            self._sync()
+            self._invalidate()
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        removed = False
+        with self._lock:
+            for doc_id in ids or []:
+                docno = self._docnos.pop(doc_id, None)
+                if docno is not None:
+                    self._alive[docno] = False
+                    removed = True
+            if removed:
+                self._invalidate()
+        return True
+
+    def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
+        return [self._document(self._docnos[doc_id]) for doc_id in ids if doc_id in self._docnos]
+
+    def similarity_search(self, query: str, k: int = 4, filter: Dict[str, Any] | None = None, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, filter=filter)]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, filter: Dict[str, Any] | None = None, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self._embedding.embed_query(query), k, filter=filter)
+
+    def similarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Dict[str, Any] | None = None, **kwargs: Any
+    ) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, filter=filter)]
+
+    def similarity_search_with_score_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Dict[str, Any] | None = None
+    ) -> List[Tuple[Document, float]]:
+        results, rows = self._search(embedding, k, filter)
+        return [(self._document(docno, rows), score) for docno, score in results]
+
+    def search_docnos(self, embedding: List[float], k: int, filter: Dict[str, Any] | None = None) -> List[Tuple[int, float]]:
+        return self._search(embedding, k, filter)[0]
+
+    def save(self, directory: Path | None = None) -> None:
+        directory = directory or self.directory
+        if directory is None:
+            raise ValueError("FaissVectorStore.save() needs a directory")
+        with self._lock:
+            self._save(directory)
+
+    def _save(self, directory: Path) -> None:
+        if self._alive and self._alive.count(False) / len(self._alive) > COMPACT_DEAD_RATIO:
+            self._compact()
+        self._sync()
+        directory.mkdir(parents=True, exist_ok=True)
+        vectors = self._all_vectors()
+        index = self._index if self._index is not None else faiss.IndexFlatL2(self.dim or 1)
+        meta = {
+            "version": FAISS_STORE_VERSION,
+            "dim": self.dim or 1,
+            "spec": self.spec or SPEC_EXACT,
+            "trained_on": self.trained_on,
+            "ids": self._ids,
+            "texts": self._texts,
+            "metadatas": self._metadatas,
+            "alive": self._alive,
+        }
+        tmp_vectors = directory / f"{VECTORS_FILE}.tmp.npy"
+        tmp_index = directory / f"{INDEX_FILE}.tmp"
+        tmp_meta = directory / f"{DOCSTORE_FILE}.tmp"
+        np.save(tmp_vectors, vectors)
+        faiss.write_index(index, str(tmp_index))
+        tmp_meta.write_text(json.dumps(meta, ensure_ascii=False), encoding=FILE_ENCODING)
+        os.replace(tmp_vectors, directory / VECTORS_FILE)
+        os.replace(tmp_index, directory / INDEX_FILE)
+        os.replace(tmp_meta, directory / DOCSTORE_FILE)
+        self.directory = directory
+
+    def stats(self) -> dict:
+        return {
+            "documents": len(self._docnos),
+            "rows": len(self._ids),
+            "dim": self.dim,
+            "spec": self.spec,
+            "trained_on": self.trained_on,
+            "mmap": self.mmap,
+            "index_bytes": self._index_bytes(),
+        }
+
+    def target_spec(self, n: int) -> str:
+        dim = self.dim or 1
+        pq_m = _pq_subquantizers(dim, self.pq_m)
+        if self.quantization == QUANT_PQ and n < PQ_MIN_TRAIN:
+            return SPEC_EXACT
+        if self.index_type == INDEX_IVF:
+            nlist = self.nlist or int(IVF_LISTS_PER_SQRT * math.sqrt(n))
+            nlist = max(1, min(nlist, n // IVF_POINTS_PER_LIST))
+            codec = {QUANT_NONE: "Flat", QUANT_INT8: "SQ8", QUANT_PQ: f"PQ{pq_m}"}[self.quantization]
+            return f"IVF{nlist},{codec}"
+        if self.index_type == INDEX_HNSW:
+            codec = {QUANT_NONE: "", QUANT_INT8: ",SQ8", QUANT_PQ: f"_PQ{pq_m}"}[self.quantization]
+            return f"HNSW{self.hnsw_m}{codec}"
+        return {QUANT_NONE: SPEC_EXACT, QUANT_INT8: "SQ8", QUANT_PQ: f"IVF1,PQ{pq_m}"}[self.quantization]
+
+    def _document(self, docno: int, rows: Tuple[List[str], List[str], List[dict]] | None = None) -> Document:
+        ids, texts, metadatas = rows or (self._ids, self._texts, self._metadatas)
+        return Document(id=ids[docno], page_content=texts[docno], metadata=metadatas[docno])
+
+    def _search(self, embedding: List[float], k: int, filter: Dict[str, Any] | None) -> Tuple[List[Tuple[int, float]], tuple]:
+        with self._lock:
+            index, vectors, mask = self._index, self._vectors, self._alive_mask
+            rows = (self._ids, self._texts, self._metadatas)
+            if filter and len(mask):
+                mask = mask & self._filter_mask(filter)
+        allowed = int(mask.sum())
+        if not allowed or k <= 0:
+            return [], rows
+        query = np.asarray(embedding, dtype=VECTOR_DTYPE).reshape(1, -1)
+        if allowed <= EXACT_SEARCH_MAX and allowed < len(mask):
+            return self._exact_search(vectors, query, np.flatnonzero(mask), k), rows
+        bitmap = None if allowed == len(mask) else np.packbits(mask, bitorder="little")
+        distances, docnos = index.search(query, min(k, allowed), params=self._search_params(index, bitmap))
+        return [(int(docno), float(dist)) for docno, dist in zip(docnos[0], distances[0]) if docno >= 0], rows
+
+    def _invalidate(self) -> None:
+        self._columns = {}
+        self._alive_mask = np.asarray(self._alive, dtype=bool)
+
+    def _all_vectors(self) -> np.ndarray:
+        if self._pending:
+            parts = ([self._vectors] if self._vectors is not None else []) + self._pending
+            self._vectors = np.concatenate(parts).astype(VECTOR_DTYPE, copy=False)
+            self._pending = []
+        if self._vectors is None:
+            return np.zeros((0, self.dim or 1), dtype=VECTOR_DTYPE)
+        return self._vectors
+
+    def _sync(self) -> None:
+        vectors = self._all_vectors()
+        n = len(vectors)
+        if self._needs_rebuild(n):
+            self._build(vectors, self.target_spec(n))
+        elif self._indexed < n:
+            if self.mmap:
+                self._index = faiss.read_index(str(self.directory / INDEX_FILE))
+                self.mmap = False
+            self._index.add(vectors[self._indexed:])
+            self._indexed = n
+
+    def _needs_rebuild(self, n: int) -> bool:
+        if self._index is None:
+            return True
+        if self.spec == SPEC_EXACT:
+            return self.target_spec(n) != SPEC_EXACT
+        return _needs_training(self.spec) and n > RETRAIN_GROWTH * max(1, self.trained_on)
+
+    def _build(self, vectors: np.ndarray, spec: str) -> None:
+        index = faiss.index_factory(self.dim or 1, spec)
+        training = np.ascontiguousarray(vectors, dtype=VECTOR_DTYPE)
+        if not index.is_trained:
+            index.train(training)
+        if len(training):
+            index.add(training)
+        self._index = index
+        self._indexed = len(training)
+        self.spec = spec
+        self.trained_on = len(training)
+        self.mmap = False
+
+    def _compact(self) -> None:
+        vectors = self._all_vectors()
+        keep = np.flatnonzero(np.asarray(self._alive, dtype=bool))
+        self._vectors = np.ascontiguousarray(vectors[keep])
+        self._ids = [self._ids[i] for i in keep]
+        self._texts = [self._texts[i] for i in keep]
+        self._metadatas = [self._metadatas[i] for i in keep]
+        self._alive = [True] * len(keep)
+        self._docnos = {doc_id: i for i, doc_id in enumerate(self._ids)}
+        self._index = None
+        self._invalidate()
+
+    def _exact_search(self, vectors: np.ndarray, query: np.ndarray, docnos: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        candidates = np.asarray(vectors[docnos], dtype=VECTOR_DTYPE)
+        distances = ((candidates - query) ** 2).sum(axis=1)
+        top = np.argsort(distances, kind="stable")[:k]
+        return [(int(docnos[i]), float(distances[i])) for i in top]
+
+    def _search_params(self, index, bitmap: np.ndarray | None):
+        selector = faiss.IDSelectorBitmap(bitmap) if bitmap is not None else None
+        inner = faiss.downcast_index(index)
+        if isinstance(inner, faiss.IndexIVF):
+            params = faiss.SearchParametersIVF(nprobe=min(self.nprobe, inner.nlist))
+        elif isinstance(inner, faiss.IndexHNSW):
+            params = faiss.SearchParametersHNSW(efSearch=self.ef_search)
+        else:
+            params = faiss.SearchParameters()
+        if selector is not None:
+            params.sel = selector
+            params._keep = (selector, bitmap)
+        return params
+
+    def _filter_mask(self, where: Dict[str, Any]) -> np.ndarray:
+        masks = []
+        for key, condition in where.items():
+            if key == "$and":
+                masks.append(np.logical_and.reduce([self._filter_mask(c) for c in condition]))
+            elif key == "$or":
+                masks.append(np.logical_or.reduce([self._filter_mask(c) for c in condition]))
+            elif isinstance(condition, dict):
+                column = self._column(key)
+                for op, operand in condition.items():
+                    masks.append(column.mask(_compare(op, operand)))
+            else:
+                masks.append(self._column(key).mask(_compare("$eq", condition)))
+        return np.logical_and.reduce(masks) if masks else np.ones(len(self._ids), dtype=bool)
+
+    def _column(self, key: str) -> _Column:
+        column = self._columns.get(key)
+        if column is None:
+            column = self._columns[key] = _Column(metadata.get(key) for metadata in self._metadatas)
+        return column
+
+    def _index_bytes(self) -> int:
+        if self._index is None:
+            return 0
+        return int(faiss.serialize_index(self._index).nbytes)
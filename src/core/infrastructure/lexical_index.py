@@ -0,0 +1,254 @@
+from __future__ import annotations
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+import json
+import math
+import os
+import re
+
+import numpy as np
+
+__all__ = ["LexicalIndex", "tokenize"]
+
+FILE_ENCODING = "utf-8"
+ARRAYS_FILE = "lexical.npz"
+META_FILE = "lexical.json"
+LEXICAL_INDEX_VERSION = 1
+BM25_K1 = 1.5
+BM25_B = 0.75
+COMPACT_DEAD_RATIO = 0.2
+DOCNO_DTYPE = np.int32
+TF_DTYPE = np.float32
+CODE_DTYPE = np.int32
+NO_CODE = -1
+REGEX_TOKEN = r"[a-z0-9#+]+(?:\.[a-z0-9#+]+)*|\.[a-z0-9]+"
+TOKEN_ALIASES = {"dotnet": ".net", "csharp": "c#", "aspnet": "asp.net", "mssql": "sql"}
+
+_token_re = re.compile(REGEX_TOKEN)
+
+def tokenize(text: str) -> List[str]:
+    tokens: List[str] = []
+    for token in _token_re.findall(text.lower()):
+        token = TOKEN_ALIASES.get(token, token)
+        tokens.append(token)
+        dot = token.find(".", 1)
+        while dot > 0:
+            tokens.append(token[dot:])
+            dot = token.find(".", dot + 1)
+    return tokens
+
+class _Codes:
+    def __init__(self, values: List[str] | None = None):
+        self.values: List[str] = values or []
+        self.codes: Dict[str, int] = {v: i for i, v in enumerate(self.values)}
+
+    def encode(self, value: str | None) -> int:
+        if value is None:
+            return NO_CODE
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.codes[value] = code
+        return code
+
+    def table(self, values: Iterable[str]) -> np.ndarray:
+        allowed = np.zeros(len(self.values) + 1, dtype=bool)
+        allowed[[self.codes[v] for v in values if v in self.codes]] = True
+        return allowed
+
+class LexicalIndex:
+    def __init__(self):
+        self.doc_ids: List[str] = []
+        self._docnos: Dict[str, int] = {}
+        self._lengths: List[int] = []
+        self._alive: List[bool] = []
+        self._types = _Codes()
+        self._candidates = _Codes()
+        self._type_codes: List[int] = []
+        self._candidate_codes: List[int] = []
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._pending: Dict[str, Tuple[List[int], List[int]]] = {}
+        self._frozen: dict | None = None
+        self._dead = 0
+
+    def __len__(self) -> int:
+        return len(self._docnos)
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self._docnos
+
+    def freeze(self) -> None:
+        self._freeze()
+
+    def add(self, chunk_id: str, text: str, doc_type: str | None = None, candidate_id: str | None = None) -> None:
+        if chunk_id in self._docnos:
+            self.remove([chunk_id])
+        docno = len(self.doc_ids)
+        tokens = tokenize(text)
+        self.doc_ids.append(chunk_id)
+        self._docnos[chunk_id] = docno
+        self._lengths.append(len(tokens))
+        self._alive.append(True)
+        self._type_codes.append(self._types.encode(doc_type))
+        self._candidate_codes.append(self._candidates.encode(candidate_id))
+        for term, tf in Counter(tokens).items():
+            pending = self._pending.get(term)
+            if pending is None:
+                pending = self._pending[term] = ([], [])
+            pending[0].append(docno)
+            pending[1].append(tf)
+        self._frozen = None
+
+    def remove(self, chunk_ids: Iterable[str]) -> int:
+        removed = 0
+        for chunk_id in chunk_ids:
+            docno = self._docnos.pop(chunk_id, None)
+            if docno is None:
+                continue
+            self._alive[docno] = False
+            removed += 1
+        self._dead += removed
+        if removed:
+            self._frozen = None
+        return removed
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        types: Set[str] | None = None,
+        candidate_ids: Set[str] | None = None,
+    ) -> List[Tuple[str, float]]:
+        frozen = self._freeze()
+        n_docs = len(self._docnos)
+        if not n_docs or k <= 0:
+            return []
+        scores = np.zeros(len(self.doc_ids), dtype=np.float32)
+        avg_length = frozen["avg_length"]
+        lengths = frozen["lengths"]
+        for term in set(tokenize(query)):
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            docnos, tfs = posting
+            idf = math.log(1.0 + (n_docs - len(docnos) + 0.5) / (len(docnos) + 0.5))
+            norm = BM25_K1 * (1.0 - BM25_B + BM25_B * lengths[docnos] / avg_length)
+            scores[docnos] += idf * tfs * (BM25_K1 + 1.0) / (tfs + norm)
+        hits = np.flatnonzero(frozen["alive"] & (scores > 0))
+        if types is not None:
+            hits = hits[self._types.table(types)[frozen["type_codes"][hits]]]
+        if candidate_ids is not None:
+            hits = hits[self._candidates.table(candidate_ids)[frozen["candidate_codes"][hits]]]
+        if not len(hits):
+            return []
+        if len(hits) > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        return [(self.doc_ids[i], float(scores[i])) for i in hits.tolist()]
+
+    def save(self, directory: Path) -> None:
+        if self._dead and self._dead / max(1, len(self.doc_ids)) > COMPACT_DEAD_RATIO:
+            self._compact()
+        self._freeze()
+        directory.mkdir(parents=True, exist_ok=True)
+        terms = sorted(self._postings)
+        counts = np.array([len(self._postings[t][0]) for t in terms], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        empty = np.zeros(0, dtype=DOCNO_DTYPE)
+        arrays = {
+            "offsets": offsets,
+            "docnos": np.concatenate([self._postings[t][0] for t in terms]) if terms else empty,
+            "tfs": np.concatenate([self._postings[t][1] for t in terms]) if terms else empty.astype(TF_DTYPE),
+            "lengths": np.asarray(self._lengths, dtype=np.int32),
+            "alive": np.asarray(self._alive, dtype=bool),
+            "type_codes": np.asarray(self._type_codes, dtype=CODE_DTYPE),
+            "candidate_codes": np.asarray(self._candidate_codes, dtype=CODE_DTYPE),
+        }
+        meta = {
+            "version": LEXICAL_INDEX_VERSION,
+            "terms": terms,
+            "doc_ids": self.doc_ids,
+            "types": self._types.values,
+            "candidates": self._candidates.values,
+        }
+        tmp_arrays = directory / f"{ARRAYS_FILE}.tmp.npz"
+        tmp_meta = directory / f"{META_FILE}.tmp"
+        np.savez(tmp_arrays, **arrays)
+        tmp_meta.write_text(json.dumps(meta, ensure_ascii=False), encoding=FILE_ENCODING)
+        os.replace(tmp_arrays, directory / ARRAYS_FILE)
+        os.replace(tmp_meta, directory / META_FILE)
+
+    @classmethod
+    def exists(cls, directory: Path) -> bool:
+        return (directory / ARRAYS_FILE).exists() and (directory / META_FILE).exists()
+
+    @classmethod
+    def load(cls, directory: Path) -> "LexicalIndex":
+        index = cls()
+        if not cls.exists(directory):
+            return index
+        meta = json.loads((directory / META_FILE).read_text(encoding=FILE_ENCODING))
+        if meta.get("version") != LEXICAL_INDEX_VERSION:
+            return index
+        with np.load(directory / ARRAYS_FILE) as data:
+            arrays = {name: data[name] for name in data.files}
+        offsets, docnos, tfs = arrays["offsets"], arrays["docnos"], arrays["tfs"]
+        for i, term in enumerate(meta["terms"]):
+            start, end = offsets[i], offsets[i + 1]
+            index._postings[term] = (docnos[start:end], tfs[start:end])
+        index.doc_ids = meta["doc_ids"]
+        index._lengths = arrays["lengths"].tolist()
+        index._alive = arrays["alive"].tolist()
+        index._type_codes = arrays["type_codes"].tolist()
+        index._candidate_codes = arrays["candidate_codes"].tolist()
+        index._types = _Codes(meta["types"])
+        index._candidates = _Codes(meta["candidates"])
+        index._docnos = {chunk_id: i for i, chunk_id in enumerate(index.doc_ids) if index._alive[i]}
+        index._dead = len(index.doc_ids) - len(index._docnos)
+        return index
+
+    def _freeze(self) -> dict:
+        if self._frozen is not None:
+            return self._frozen
+        for term, (pending_docnos, pending_tfs) in self._pending.items():
+            new_docnos = np.array(pending_docnos, dtype=DOCNO_DTYPE)
+            new_tfs = np.array(pending_tfs, dtype=TF_DTYPE)
+            existing = self._postings.get(term)
+            if existing is not None:
+                new_docnos = np.concatenate([existing[0], new_docnos])
+                new_tfs = np.concatenate([existing[1], new_tfs])
+            self._postings[term] = (new_docnos, new_tfs)
+        self._pending = {}
+        alive = np.asarray(self._alive, dtype=bool)
+        lengths = np.asarray(self._lengths, dtype=np.float32)
+        live_lengths = lengths[alive]
+        self._frozen = {
+            "alive": alive,
+            "lengths": lengths,
+            "avg_length": float(live_lengths.mean()) if len(live_lengths) and live_lengths.mean() > 0 else 1.0,
+            "type_codes": np.asarray(self._type_codes, dtype=CODE_DTYPE),
+            "candidate_codes": np.asarray(self._candidate_codes, dtype=CODE_DTYPE),
+        }
+        return self._frozen
+
+    def _compact(self) -> None:
+        self._freeze()
+        alive = np.asarray(self._alive, dtype=bool)
+        remap = np.cumsum(alive, dtype=np.int64) - 1
+        postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for term, (docnos, tfs) in self._postings.items():
+            keep = alive[docnos]
+            if keep.any():
+                postings[term] = (remap[docnos[keep]].astype(DOCNO_DTYPE), tfs[keep])
+        keep_docnos = np.flatnonzero(alive).tolist()
+        self._postings = postings
+        self.doc_ids = [self.doc_ids[i] for i in keep_docnos]
+        self._lengths = [self._lengths[i] for i in keep_docnos]
+        self._type_codes = [self._type_codes[i] for i in keep_docnos]
+        self._candidate_codes = [self._candidate_codes[i] for i in keep_docnos]
+        self._alive = [True] * len(keep_docnos)
+        self._docnos = {chunk_id: i for i, chunk_id in enumerate(self.doc_ids)}
+        self._dead = 0
+        self._frozen = None
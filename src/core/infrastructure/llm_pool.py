@@ -0,0 +1,323 @@
+import asyncio
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+import httpx
+import numpy as np
+
+from src.core.infrastructure.metrics import LLM_BACKEND_SECONDS
+
+__all__ = ["LoadBalancedTransport", "shared_transport", "backend_stats", "parse_backend_urls"]
+
+DEFAULT_MAX_CONNECTIONS = 32
+DEFAULT_KEEPALIVE_S = 60.0
+DEFAULT_EJECT_AFTER_FAILURES = 3
+DEFAULT_EJECT_S = 30.0
+DEFAULT_HEDGE_AFTER_S = 0.0
+LATENCY_WINDOW = 256
+LATENCY_PERCENTILES = (50, 95)
+MS_PER_S = 1000
+SERVER_ERROR_STATUS = 500
+URL_SEPARATOR = ","
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+_shared: Dict[Tuple[Any, ...], "LoadBalancedTransport"] = {}
+_shared_lock = threading.Lock()
+_live: "weakref.WeakSet[LoadBalancedTransport]" = weakref.WeakSet()
+
+def parse_backend_urls(value: str | None) -> List[str]:
+    return [url.strip().rstrip("/") for url in (value or "").split(URL_SEPARATOR) if url.strip()]
+
+def shared_transport(backends: Sequence[str], **options) -> "LoadBalancedTransport":
+    key = (tuple(backends), tuple(sorted(options.items())))
+    with _shared_lock:
+        transport = _shared.get(key)
+        if transport is None:
+            transport = _shared[key] = LoadBalancedTransport(backends, **options)
+        return transport
+
+def backend_stats() -> List[dict]:
+    return [backend for transport in list(_live) for backend in transport.stats()["backends"]]
+
+class _Backend:
+    def __init__(self, url: str):
+        self.url = url
+        self.origin = httpx.URL(url)
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+
+    def ejected(self, now: float) -> bool:
+        return self.ejected_until > now
+
+    def stats(self, now: float) -> dict:
+        latencies_ms = [value * MS_PER_S for value in self.latencies]
+        percentiles = np.percentile(latencies_ms, LATENCY_PERCENTILES) if latencies_ms else [0.0] * len(LATENCY_PERCENTILES)
+        return {
+            "url": self.url,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "ejections": self.ejections,
+            "ejected": self.ejected(now),
+            **{f"p{p}_ms": round(float(v), 2) for p, v in zip(LATENCY_PERCENTILES, percentiles)},
+        }
+
+class _TrackedSyncStream(httpx.SyncByteStream):
+    def __init__(self, stream: httpx.SyncByteStream, on_close: Callable[[], None]):
+        self._stream = stream
+        self._on_close = on_close
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._on_close()
+
+class _TrackedAsyncStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Callable[[], None]):
+        self._stream = stream
+        self._on_close = on_close
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._on_close()
+
+class LoadBalancedTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    def __init__(
+        self,
+        backends: Sequence[str],
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        keepalive_s: float = DEFAULT_KEEPALIVE_S,
+        eject_after_failures: int = DEFAULT_EJECT_AFTER_FAILURES,
+        eject_s: float = DEFAULT_EJECT_S,
+        hedge_after_s: float = DEFAULT_HEDGE_AFTER_S,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not backends:
+            raise ValueError("LoadBalancedTransport needs at least one backend URL")
+        self.backends = [_Backend(url) for url in backends]
+        self.primary = self.backends[0].origin
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections, keepalive_expiry=keepalive_s)
+        self.eject_after_failures = eject_after_failures
+        self.eject_s = eject_s
+        self.hedge_after_s = hedge_after_s
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._next = 0
+        self._sync: Dict[str, httpx.HTTPTransport] = {}
+        self._async: Dict[str, httpx.AsyncHTTPTransport] = {}
+        self._pid = os.getpid()
+        _live.add(self)
+
+    def stats(self) -> dict:
+        now = self._clock()
+        with self._lock:
+            return {
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "backends": [backend.stats(now) for backend in self.backends],
+            }
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        tried: List[_Backend] = []
+        while True:
+            backend = self._acquire(tried)
+            try:
+                return self._send(backend, request)
+            except RETRYABLE_ERRORS:
+                tried.append(backend)
+                if len(tried) >= len(self.backends):
+                    raise
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        first = self._acquire([])
+        primary = asyncio.ensure_future(self._send_async_with_failover(first, request))
+        if self.hedge_after_s <= 0 or len(self.backends) < 2:
+            return await primary
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.hedge_after_s)
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        if done:
+            return primary.result()
+        second = self._acquire([first], healthy_only=True)
+        if second is None:
+            return await primary
+        with self._lock:
+            self.hedges += 1
+        hedge = asyncio.ensure_future(self._send_async_with_failover(second, request, tried=[first]))
+        return await self._first_success(primary, hedge)
+
+    def close(self) -> None:
+        for transport in self._sync.values():
+            transport.close()
+        self._sync.clear()
+
+    async def aclose(self) -> None:
+        for transport in self._async.values():
+            await transport.aclose()
+        self._async.clear()
+
+    async def _first_success(self, primary: asyncio.Future, hedge: asyncio.Future) -> httpx.Response:
+        pending = {primary, hedge}
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winners = [task for task in done if task.exception() is None]
+                if not winners:
+                    error = next(iter(done)).exception()
+                    continue
+                winner = primary if primary in winners else winners[0]
+                for task in winners:
+                    if task is not winner:
+                        await task.result().aclose()
+                if winner is hedge:
+                    with self._lock:
+                        self.hedge_wins += 1
+                return winner.result()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _send_async_with_failover(self, backend: _Backend, request: httpx.Request, tried: List[_Backend] | None = None) -> httpx.Response:
+        tried = list(tried or [])
+        while True:
+            try:
+                return await self._send_async(backend, request)
+            except RETRYABLE_ERRORS:
+                tried.append(backend)
+                if len(tried) >= len(self.backends):
+                    raise
+                backend = self._acquire(tried)
+
+    def _send(self, backend: _Backend, request: httpx.Request) -> httpx.Response:
+        started = self._clock()
+        try:
+            response = self._sync_transport(backend).handle_request(self._route(backend, request))
+        except BaseException as e:
+            self._finish(backend, failed=not isinstance(e, (KeyboardInterrupt, SystemExit)))
+            raise
+        self._record(backend, started, response.status_code)
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_TrackedSyncStream(response.stream, lambda: self._release(backend)),
+            extensions=response.extensions,
+        )
+
+    async def _send_async(self, backend: _Backend, request: httpx.Request) -> httpx.Response:
+        started = self._clock()
+        try:
+            response = await self._async_transport(backend).handle_async_request(self._route(backend, request))
+        except asyncio.CancelledError:
+            self._finish(backend, failed=False)
+            raise
+        except BaseException:
+            self._finish(backend, failed=True)
+            raise
+        self._record(backend, started, response.status_code)
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_TrackedAsyncStream(response.stream, lambda: self._release(backend)),
+            extensions=response.extensions,
+        )
+
+    def _route(self, backend: _Backend, request: httpx.Request) -> httpx.Request:
+        url = request.url
+        suffix = url.raw_path.decode("ascii")
+        prefix = self.primary.raw_path.decode("ascii").rstrip("/")
+        if prefix and suffix.startswith(prefix):
+            suffix = suffix[len(prefix):]
+        target = backend.origin.raw_path.decode("ascii").rstrip("/") + suffix
+        routed = url.copy_with(scheme=backend.origin.scheme, host=backend.origin.host, port=backend.origin.port, raw_path=target.encode("ascii"))
+        headers = httpx.Headers(request.headers)
+        headers["Host"] = routed.netloc.decode("ascii")
+        return httpx.Request(request.method, routed, headers=headers, content=request.content, extensions=request.extensions)
+
+    def _acquire(self, exclude: List[_Backend], healthy_only: bool = False) -> _Backend | None:
+        now = self._clock()
+        with self._lock:
+            candidates = [backend for backend in self.backends if backend not in exclude] or list(self.backends)
+            healthy = [backend for backend in candidates if not backend.ejected(now)]
+            if healthy_only and not healthy:
+                return None
+            pool = healthy or sorted(candidates, key=lambda backend: backend.ejected_until)[:1]
+            offset = self._next % len(self.backends)
+            self._next += 1
+            ordered = sorted(pool, key=lambda backend: (backend.outstanding, (self.backends.index(backend) - offset) % len(self.backends)))
+            chosen = ordered[0]
+            chosen.outstanding += 1
+            chosen.requests += 1
+            return chosen
+
+    def _record(self, backend: _Backend, started: float, status_code: int) -> None:
+        elapsed = self._clock() - started
+        LLM_BACKEND_SECONDS.observe(elapsed, backend.url)
+        with self._lock:
+            backend.latencies.append(elapsed)
+            if status_code >= SERVER_ERROR_STATUS:
+                self._fail(backend)
+            else:
+                backend.consecutive_failures = 0
+
+    def _finish(self, backend: _Backend, failed: bool) -> None:
+        with self._lock:
+            backend.outstanding -= 1
+            if failed:
+                self._fail(backend)
+
+    def _release(self, backend: _Backend) -> None:
+        with self._lock:
+            backend.outstanding -= 1
+
+    def _fail(self, backend: _Backend) -> None:
+        backend.failures += 1
+        backend.consecutive_failures += 1
+        if backend.consecutive_failures >= self.eject_after_failures:
+            if not backend.ejected(self._clock()):
+                backend.ejections += 1
+            backend.ejected_until = self._clock() + self.eject_s
+
+    def _check_fork(self) -> None:
+        if self._pid != os.getpid():
+            self._sync, self._async, self._pid = {}, {}, os.getpid()
+
+    def _sync_transport(self, backend: _Backend) -> httpx.HTTPTransport:
+        self._check_fork()
+        transport = self._sync.get(backend.url)
+        if transport is None:
+            transport = self._sync.setdefault(backend.url, httpx.HTTPTransport(limits=self.limits))
+        return transport
+
+    def _async_transport(self, backend: _Backend) -> httpx.AsyncHTTPTransport:
+        self._check_fork()
+        transport = self._async.get(backend.url)
+        if transport is None:
+            transport = self._async.setdefault(backend.url, httpx.AsyncHTTPTransport(limits=self.limits))
+        return transport
@@ -0,0 +1,285 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+__all__ = [
+    "MetricsRegistry", "Histogram", "Counter", "MetricsCallbackHandler", "REGISTRY",
+    "STAGE_SECONDS", "INGEST_STAGE_SECONDS", "LLM_TOKENS", "RETRIEVED_CHUNKS", "STAGE_ERRORS",
+    "INGEST_CHUNKS", "CHAT_REQUESTS", "EMBED_BATCH_SIZE", "EMBED_QUEUE_WAIT_SECONDS", "LLM_BACKEND_SECONDS", "CONTEXT_TOKENS", "CONTEXT_DROPPED", "CHAT_STREAM_TTFT_SECONDS", "record_stage", "timed_stage", "timed_iter", "collect_timings", "server_timing_header",
+]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS_S = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+CHUNK_BUCKETS = (0, 1, 2, 4, 6, 8, 12, 16, 20, 32, 50)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+CHARS_PER_TOKEN = 4
+MS_PER_S = 1000
+STAGE_EMBED_QUERY = "embed_query"
+STAGE_LEXICAL_SEARCH = "lexical_search"
+STAGE_VECTOR_SEARCH = "vector_search"
+STAGE_RETRIEVE = "retrieve"
+STAGE_PACK_CONTEXT = "pack_context"
+STAGE_FORMAT_DOCS = "format_docs"
+STAGE_PROMPT = "prompt"
+STAGE_LLM = "llm"
+STAGE_CHAIN = "chain"
+STAGE_ANSWER_CACHE = "answer_cache"
+STAGE_ROUTE = "route"
+STAGE_REQUEST = "request"
+INGEST_PREPARE = "prepare"
+INGEST_EMBED = "embed"
+INGEST_VECTOR_UPSERT = "vector_upsert"
+INGEST_LEXICAL_UPSERT = "lexical_upsert"
+INGEST_DELETE = "delete"
+INGEST_COPY = "copy"
+INGEST_PERSIST = "persist"
+INGEST_TOTAL = "total"
+RUN_TYPE_PROMPT = "prompt"
+TOKENS_PROMPT = "prompt"
+TOKENS_COMPLETION = "completion"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float], labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        self.registry: "MetricsRegistry | None" = None
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        if self.registry is not None and not self.registry.enabled:
+            return
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 3)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def snapshot(self, *labels: str) -> Dict[str, float]:
+        with self._lock:
+            series = list(self._series.get(labels) or [0.0] * (len(self.buckets) + 3))
+        return {"count": series[-1], "sum": series[-2]}
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        lines = []
+        for labels, values in sorted(series.items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), values[:-2]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {_format_value(cumulative)}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(values[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {_format_value(values[-1])}")
+        return lines
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.registry: "MetricsRegistry | None" = None
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        if self.registry is not None and not self.registry.enabled:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}" for labels, value in sorted(values.items())]
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: List[Any] = []
+        self._collectors: List[Callable[[], List[Tuple[str, str, str, Sequence[str], List[Tuple[Sequence[str], float]]]]]] = []
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float], labelnames: Sequence[str] = ()) -> Histogram:
+        metric = Histogram(name, help_text, buckets, labelnames)
+        metric.registry = self
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help_text, labelnames)
+        metric.registry = self
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], List[Tuple[str, str, str, Sequence[str], List[Tuple[Sequence[str], float]]]]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, kind, help_text, labelnames, samples in collector():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}" for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+STAGE_SECONDS = REGISTRY.histogram("rag_stage_seconds", "Latency of /chat pipeline stages", LATENCY_BUCKETS_S, ("stage",))
+STAGE_ERRORS = REGISTRY.counter("rag_stage_errors_total", "Pipeline stages that raised", ("stage",))
+INGEST_STAGE_SECONDS = REGISTRY.histogram("rag_ingest_stage_seconds", "Latency of build_index stages", LATENCY_BUCKETS_S, ("stage",))
+INGEST_CHUNKS = REGISTRY.counter("rag_ingest_chunks_total", "Chunks processed by build_index", ("result",))
+LLM_TOKENS = REGISTRY.histogram("rag_llm_tokens", "Prompt and completion tokens per LLM call", TOKEN_BUCKETS, ("kind",))
+RETRIEVED_CHUNKS = REGISTRY.histogram("rag_retrieved_chunks", "Chunks returned per retrieval stage", CHUNK_BUCKETS, ("stage",))
+CHAT_STREAM_TTFT_SECONDS = REGISTRY.histogram("rag_chat_stream_ttft_seconds", "Time from a /chat/stream request to its first token", LATENCY_BUCKETS_S)
+CHAT_REQUESTS = REGISTRY.counter("rag_chat_requests_total", "Chat requests by route and outcome", ("route", "outcome"))
+EMBED_BATCH_SIZE = REGISTRY.histogram("rag_embed_batch_size", "Queries per micro-batched embedding pass", BATCH_SIZE_BUCKETS)
+EMBED_QUEUE_WAIT_SECONDS = REGISTRY.histogram("rag_embed_queue_wait_seconds", "Time a query waited for its embedding micro-batch", LATENCY_BUCKETS_S)
+LLM_BACKEND_SECONDS = REGISTRY.histogram("rag_llm_backend_seconds", "Time to response headers per LLM backend", LATENCY_BUCKETS_S, ("backend",))
+CONTEXT_TOKENS = REGISTRY.histogram("rag_context_tokens", "Estimated tokens per packed context, next to the retrieved and top-k baseline", TOKEN_BUCKETS, ("kind",))
+CONTEXT_DROPPED = REGISTRY.histogram("rag_context_dropped", "Chunks and candidates dropped while packing the context", CHUNK_BUCKETS, ("kind",))
+
+_timings: ContextVar[Dict[str, float] | None] = ContextVar("rag_stage_timings", default=None)
+
+def record_stage(stage: str, seconds: float, histogram: Histogram = STAGE_SECONDS) -> None:
+    if not REGISTRY.enabled:
+        return
+    histogram.observe(seconds, stage)
+    timings = _timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+@contextmanager
+def timed_stage(stage: str, histogram: Histogram = STAGE_SECONDS) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(1.0, stage)
+        raise
+    finally:
+        record_stage(stage, time.perf_counter() - started, histogram)
+
+def timed_iter(items: Iterable[Any], stage: str, histogram: Histogram = INGEST_STAGE_SECONDS) -> Iterator[Any]:
+    iterator = iter(items)
+    while True:
+        started = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        record_stage(stage, time.perf_counter() - started, histogram)
+        yield item
+
+@contextmanager
+def collect_timings() -> Iterator[Dict[str, float]]:
+    timings: Dict[str, float] = {}
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    return ", ".join(f"{stage};dur={seconds * MS_PER_S:.1f}" for stage, seconds in timings.items())
+
+def _estimate_tokens(chars: int) -> int:
+    return (chars + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    run_inline = True
+
+    def __init__(self, chain_stages: Dict[str, str]):
+        self.chain_stages = chain_stages
+        self._started: Dict[UUID, Tuple[str, float, int]] = {}
+
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, **kwargs: Any) -> None:
+        stage = STAGE_PROMPT if kwargs.get("run_type") == RUN_TYPE_PROMPT else self.chain_stages.get(kwargs.get("name") or "")
+        if stage:
+            self._started[run_id] = (stage, time.perf_counter(), 0)
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        stage, at, _ = started
+        record_stage(stage, time.perf_counter() - at)
+        if isinstance(outputs, list):
+            RETRIEVED_CHUNKS.observe(len(outputs), stage)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            STAGE_ERRORS.inc(1.0, started[0])
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any) -> None:
+        prompt_chars = sum(len(str(message.content)) for batch in messages for message in batch)
+        self._started[run_id] = (STAGE_LLM, time.perf_counter(), prompt_chars)
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = (STAGE_LLM, time.perf_counter(), sum(len(prompt) for prompt in prompts))
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        stage, at, prompt_chars = started
+        record_stage(stage, time.perf_counter() - at)
+        if not REGISTRY.enabled:
+            return
+        prompt_tokens, completion_tokens = self._token_usage(response, prompt_chars)
+        LLM_TOKENS.observe(prompt_tokens, TOKENS_PROMPT)
+        LLM_TOKENS.observe(completion_tokens, TOKENS_COMPLETION)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            STAGE_ERRORS.inc(1.0, started[0])
+
+    def _token_usage(self, response, prompt_chars: int) -> Tuple[int, int]:
+        generations = [generation for batch in response.generations for generation in batch]
+        usage = [getattr(getattr(generation, "message", None), "usage_metadata", None) for generation in generations]
+        if usage and all(usage):
+            return sum(u["input_tokens"] for u in usage), sum(u["output_tokens"] for u in usage)
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        if token_usage.get("prompt_tokens") is not None:
+            return token_usage["prompt_tokens"], token_usage.get("completion_tokens", 0)
+        return _estimate_tokens(prompt_chars), sum(_estimate_tokens(len(generation.text)) for generation in generations)
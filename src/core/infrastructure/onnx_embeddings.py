@@ -0,0 +1,198 @@
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+__all__ = ["OnnxEmbeddings", "export_onnx", "mean_pool", "cosine_parity", "onnx_model_dir"]
+
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model.int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+EXPORT_INFO_FILE = "export.json"
+SENTENCE_CONFIG_FILE = "sentence_bert_config.json"
+FILE_ENCODING = "utf-8"
+MODEL_INPUTS = ("input_ids", "attention_mask", "token_type_ids")
+OUTPUT_HIDDEN_STATE = "last_hidden_state"
+DYNAMIC_AXES = {0: "batch", 1: "sequence"}
+ONNX_OPSET = 17
+PAD_TOKEN = "[PAD]"
+DEFAULT_MAX_LENGTH = 256
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_MIN_COSINE = 0.95
+PARITY_SAMPLE_TEXTS = (
+    "Senior .NET developer with 8 years of C#, ASP.NET Core and SQL Server.",
+    "Frontend engineer: React, Next.js, TypeScript; English C1.",
+    "Tech Lead mentoring a team of five, Azure DevOps pipelines and Kubernetes.",
+    "who has at least B2 English and Python experience?",
+    "QA automation with Selenium and Cypress",
+)
+
+def onnx_model_dir(cache_dir: Path, model_name: str) -> Path:
+    return Path(cache_dir) / model_name.replace("/", "__")
+
+def mean_pool(hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    mask = attention_mask[..., None].astype(np.float32)
+    return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+def cosine_parity(reference: Sequence[Sequence[float]], candidate: Sequence[Sequence[float]]) -> Dict[str, float]:
+    a = np.asarray(reference, dtype=np.float32)
+    b = np.asarray(candidate, dtype=np.float32)
+    norms = np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1)
+    cosines = (a * b).sum(axis=1) / np.clip(norms, 1e-12, None)
+    return {"min_cosine": round(float(cosines.min()), 6), "mean_cosine": round(float(cosines.mean()), 6)}
+
+class OnnxEmbeddings(Embeddings):
+    def __init__(
+        self,
+        session: Any,
+        tokenizer: Any,
+        normalize: bool = True,
+        max_length: int = DEFAULT_MAX_LENGTH,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        self.session = session
+        self.tokenizer = tokenizer
+        self.normalize = normalize
+        self.batch_size = batch_size
+        self._input_names = [item.name for item in session.get_inputs()]
+        tokenizer.enable_truncation(max_length)
+        if tokenizer.padding is None:
+            pad_id = tokenizer.token_to_id(PAD_TOKEN)
+            tokenizer.enable_padding(pad_id=pad_id or 0, pad_token=PAD_TOKEN)
+
+    @classmethod
+    def load(cls, directory: Path, quantized: bool = True, threads: int = 0, normalize: bool = True) -> "OnnxEmbeddings":
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        directory = Path(directory)
+        info = json.loads((directory / EXPORT_INFO_FILE).read_text(encoding=FILE_ENCODING))
+        model_path = directory / (QUANTIZED_MODEL_FILE if quantized else MODEL_FILE)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        session = ort.InferenceSession(str(model_path), sess_options=options, providers=["CPUExecutionProvider"])
+        tokenizer = Tokenizer.from_file(str(directory / TOKENIZER_FILE))
+        return cls(session, tokenizer, normalize=normalize, max_length=info.get("max_length", DEFAULT_MAX_LENGTH))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors: List[np.ndarray | None] = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            for i, vector in zip(batch, self._encode([texts[i] for i in batch])):
+                vectors[i] = vector
+        return [vector.tolist() for vector in vectors]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_documents(texts)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        arrays = {
+            "input_ids": np.asarray([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.asarray([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.asarray([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        hidden = self.session.run(None, {name: arrays[name] for name in self._input_names})[0]
+        pooled = mean_pool(np.asarray(hidden, dtype=np.float32), arrays["attention_mask"])
+        if self.normalize:
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled
+
+def export_onnx(model_name: str, directory: Path, quantize: bool = True, min_cosine: float = DEFAULT_MIN_COSINE) -> dict:
+    directory = Path(directory)
+    info_path = directory / EXPORT_INFO_FILE
+    if info_path.exists():
+        info = json.loads(info_path.read_text(encoding=FILE_ENCODING))
+        if not quantize or (directory / QUANTIZED_MODEL_FILE).exists():
+            return info
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{directory.name}-", dir=directory.parent))
+    try:
+        reference = _export_torch_model(model_name, staging)
+        info = {"model": model_name, "opset": ONNX_OPSET, **reference["info"], "parity": {}}
+        _write_info(staging, info)
+        info["parity"]["fp32"] = _check_parity(staging, False, reference["embed"], min_cosine)
+        if quantize:
+            quantize_onnx(staging / MODEL_FILE, staging / QUANTIZED_MODEL_FILE)
+            info["parity"]["int8"] = _check_parity(staging, True, reference["embed"], min_cosine)
+        _write_info(staging, info)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(staging, directory)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    print(f"[EMBED] Exported {model_name} to ONNX in {directory}: {info['parity']}")
+    return info
+
+def _write_info(directory: Path, info: dict) -> None:
+    (directory / EXPORT_INFO_FILE).write_text(json.dumps(info, indent=2), encoding=FILE_ENCODING)
+
+def quantize_onnx(source: Path, target: Path) -> None:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(str(source), str(target), weight_type=QuantType.QInt8)
+
+def _check_parity(directory: Path, quantized: bool, reference: Callable[[List[str]], np.ndarray], min_cosine: float) -> dict:
+    texts = list(PARITY_SAMPLE_TEXTS)
+    candidate = OnnxEmbeddings.load(directory, quantized=quantized, normalize=False).embed_documents(texts)
+    parity = cosine_parity(reference(texts), candidate)
+    if parity["min_cosine"] < min_cosine:
+        raise RuntimeError(f"ONNX export drifted from the torch model: min cosine {parity['min_cosine']} < {min_cosine}")
+    return parity
+
+def _export_torch_model(model_name: str, directory: Path) -> dict:
+    try:
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+    except ImportError as e:
+        raise RuntimeError(f"Exporting {model_name} to ONNX needs torch and transformers: {e}") from e
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+    tokenizer.save_pretrained(str(directory))
+    if not (directory / TOKENIZER_FILE).exists():
+        raise RuntimeError(f"{model_name} has no fast tokenizer ({TOKENIZER_FILE}); it cannot run on the ONNX backend")
+    max_length = _max_seq_length(model_name, tokenizer)
+    sample = tokenizer(["ONNX export sample"], return_tensors="pt")
+    names = [name for name in MODEL_INPUTS if name in sample]
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in names),
+            str(directory / MODEL_FILE),
+            input_names=names,
+            output_names=[OUTPUT_HIDDEN_STATE],
+            dynamic_axes={name: DYNAMIC_AXES for name in names + [OUTPUT_HIDDEN_STATE]},
+            opset_version=ONNX_OPSET,
+        )
+
+    def embed(texts: List[str]) -> np.ndarray:
+        batch = tokenizer(texts, padding=True, truncation=True, max_length=max_length, return_tensors="pt")
+        with torch.no_grad():
+            hidden = model(**{name: batch[name] for name in names})[0].numpy()
+        return mean_pool(hidden, batch["attention_mask"].numpy())
+
+    return {"info": {"inputs": names, "max_length": max_length}, "embed": embed}
+
+def _max_seq_length(model_name: str, tokenizer: Any) -> int:
+    try:
+        from huggingface_hub import hf_hub_download
+
+        config = json.loads(Path(hf_hub_download(model_name, SENTENCE_CONFIG_FILE)).read_text(encoding=FILE_ENCODING))
+        return int(config["max_seq_length"])
+    except Exception:
+        return min(int(getattr(tokenizer, "model_max_length", DEFAULT_MAX_LENGTH)), DEFAULT_MAX_LENGTH)
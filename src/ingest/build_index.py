@@ -1,14 +1,39 @@
 import os
 import json
+import shutil
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import Callable, List, Iterator, Tuple
 from langchain_core.documents import Document
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 from src.core.domain.candidate import CandidateRecord
-from src.core.application.embedding_client import load_embeddings
-from src.core.application.retriever import chroma_from_documents
-from src.core.infrastructure.embeddings import load_instruction_pairs
+from src.core.application.embedding_client import (
+    load_embeddings, LazyEmbeddings, TimedEmbeddings,
+    ENV_EMB_MODEL, ENV_EMB_NORMALIZE, DEFAULT_EMB_MODEL, DEFAULT_NORMALIZE, embedding_backend,
+)
+from src.core.application.retriever import (
+    vector_store_from_documents, vector_store_persistent, vector_store_reset, vector_store_exists,
+    vector_store_fingerprint, persist_vector_store, close_vector_store, index_dir, new_generation, activate_generation, collect_generations,
+    read_index_version, BASE_VECTORS_DIR, LEXICAL_SUBDIR, CHROMA_SUBDIR, GENERATIONS_SUBDIR, CURRENT_GENERATION_FILE,
+)
+from src.core.application.attribute_index import AttributeIndex, candidate_attributes, ATTRIBUTES_VERSION
+from src.core.infrastructure.lexical_index import LexicalIndex, LEXICAL_INDEX_VERSION
+from src.core.infrastructure.embeddings import load_instruction_pairs, FIELD_PAIR_ID
 from src.core.infrastructure.llm import load_llm_instruction_records
+from src.ingest.manifest import IndexManifest, SourceEntry, MANIFEST_FILE, make_chunk_id, content_hash
+from src.ingest.pipeline import parallel_map, BatchWriter, ProgressReporter, IndexBuildCancelled
+from src.core.infrastructure.metrics import (
+    timed_stage, timed_iter, INGEST_STAGE_SECONDS, INGEST_CHUNKS,
+    INGEST_PREPARE, INGEST_EMBED, INGEST_VECTOR_UPSERT, INGEST_LEXICAL_UPSERT, INGEST_DELETE, INGEST_PERSIST, INGEST_TOTAL, INGEST_COPY,
+)
 
 DEFAULT_DATA_DIR = "./data"
 INPUT_SUBDIR = "input"
@@ -16,17 +41,43 @@ DEFAULT_EMBEDDING_INSTRUCTION_FILE = "data/instructions/embedings.jsonl"
 DEFAULT_LLM_INSTRUCTION_FILE = "data/instructions/llm.jsonl"
 CHUNK_SIZE = 600
 CHUNK_OVERLAP = 60
+SECTION_CHUNK_SIZE = 1000
+SECTION_CHUNK_OVERLAP = 0
+CANDIDATE_CHUNKER_VERSION = 3
 ENGLISH_LEVEL_MAP = {"A1": 1, "A2": 2, "B1": 3, "B2": 4, "C1": 5, "C2": 6}
 FIELD_INSTRUCTION = "instruction"
 FIELD_INPUT = "input"
 FIELD_OUTPUT = "output"
 FIELD_ROW_ID = "_row_id"
 LLM_PREFIX = "[LLMInstruction]"
+SOURCE_CANDIDATE = "candidate"
+SOURCE_EMBEDDING_INSTRUCTION = "embedding_instruction"
+SOURCE_LLM_INSTRUCTION = "llm_instruction"
+SOURCE_KEY_SEPARATOR = ":"
+UPSERT_BATCH_SIZE = 256
+ENV_INDEX_STREAMING = "INDEX_STREAMING"
+ENV_INDEX_WORKERS = "INDEX_WORKERS"
+ENV_INDEX_BATCH_SIZE = "INDEX_BATCH_SIZE"
+ENV_INDEX_QUEUE_BATCHES = "INDEX_QUEUE_BATCHES"
+DEFAULT_INDEX_STREAMING = "false"
+DEFAULT_INDEX_QUEUE_BATCHES = "4"
+PROGRESS_LABEL = "INDEX"
+STAT_ADDED = "added"
+STAT_UPDATED = "updated"
+STAT_DELETED = "deleted"
+STAT_SKIPPED = "skipped"
+INDEX_LOCK_FILE = "index.lock"
+LEGACY_INDEX_VERSION_FILE = "index_version"
+GENERATION_COPY_IGNORE = (GENERATIONS_SUBDIR, CURRENT_GENERATION_FILE, INDEX_LOCK_FILE, LEGACY_INDEX_VERSION_FILE, "*.tmp")
+STAGE_ACTIVATE = "activate"
+GENERATION_COPIED_SUBDIRS = (CHROMA_SUBDIR,)
+ENV_INDEX_KEEP_GENERATIONS = "INDEX_KEEP_GENERATIONS"
+DEFAULT_INDEX_KEEP_GENERATIONS = "2"
 
 DATA_DIR = Path(os.getenv("DATA_DIR", DEFAULT_DATA_DIR))
 INPUT_DIR = DATA_DIR / INPUT_SUBDIR
 
-__all__ = ["to_documents", "load_candidate_records", "build_index", "build_index_from_records"]
+__all__ = ["to_documents", "load_candidate_records", "build_index", "build_index_from_records", "index_is_current", "IndexBuildCancelled"]
 
 def _english_to_num(level: str) -> int:
     return ENGLISH_LEVEL_MAP.get((level or "UNK").upper(), 0)
@@ -38,32 +89,36 @@ def _load_candidate_records_from_dir(input_dir: Path) -> list:
     candidate_records = []
     for file_path in sorted(input_dir.glob("*.json")):
         data = json.loads(file_path.read_text(encoding="utf-8"))
-        candidate_id = data.get("GeneralInfo", {}).get("CandidateId") or file_path.stem
-        candidate_records.append(CandidateRecord(
-            candidate_id=candidate_id,
-            raw=data,
-            summary=data.get("Summary", ""),
-            skills=data.get("SkillMatrix", []) or [],
-            languages=data.get("Languages", []) or [],
-            scores=data.get("Scores", {}) or {}
-        ))
+        candidate_records.append(_candidate_record_from_data(data, file_path))
     return candidate_records
 
+def _candidate_record_from_data(data: dict, file_path: Path) -> CandidateRecord:
+    candidate_id = data.get("GeneralInfo", {}).get("CandidateId") or file_path.stem
+    return CandidateRecord(
+        candidate_id=candidate_id,
+        raw=data,
+        summary=data.get("Summary", ""),
+        skills=data.get("SkillMatrix", []) or [],
+        languages=data.get("Languages", []) or [],
+        scores=data.get("Scores", {}) or {}
+    )
+
 def to_documents(records: list) -> list:
     docs = []
     for record in records:
         docs.extend(_candidate_to_documents(record))
-    return _split_documents(docs)
+    return _get_splitter(SECTION_CHUNK_SIZE, SECTION_CHUNK_OVERLAP).split_documents(docs)
 
 def _candidate_to_documents(candidate: CandidateRecord) -> list:
     from langchain_core.documents import Document
     documents = []
-    for block in candidate.to_text_blocks():
+    for section, block in candidate.to_section_blocks():
         documents.append(Document(
             page_content=block,
             metadata={
                 "type": "candidate",
                 "candidate_id": candidate.candidate_id,
+                "section": section,
                 "prepared": candidate.prepared,
                 "english_level": candidate.english_level,
                 "english_level_num": _english_to_num(candidate.english_level),
@@ -72,28 +127,323 @@ def _candidate_to_documents(candidate: CandidateRecord) -> list:
     return documents
 
 def _split_documents(documents: list) -> list:
+    return _get_splitter().split_documents(documents)
+
+@lru_cache(maxsize=2)
+def _get_splitter(chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP):
     try:
         from langchain_text_splitters import RecursiveCharacterTextSplitter
     except Exception:
         from langchain.text_splitter import RecursiveCharacterTextSplitter
-    splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
-    return splitter.split_documents(documents)
+    return RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
 
-def build_index() -> dict:
-    records = load_candidate_records()
-    docs = to_documents(records)
+def build_index(
+    embeddings=None,
+    streaming: bool | None = None,
+    workers: int | None = None,
+    on_progress: Callable[[dict], None] | None = None,
+    cancelled: Callable[[], bool] | None = None,
+) -> dict:
+    if streaming is None:
+        streaming = os.getenv(ENV_INDEX_STREAMING, DEFAULT_INDEX_STREAMING).lower() == "true"
+    if workers is None:
+        workers = int(os.getenv(ENV_INDEX_WORKERS, str(os.cpu_count() or 1))) if streaming else 0
+    batch_size = int(os.getenv(ENV_INDEX_BATCH_SIZE, str(UPSERT_BATCH_SIZE)))
+    queue_batches = int(os.getenv(ENV_INDEX_QUEUE_BATCHES, DEFAULT_INDEX_QUEUE_BATCHES)) if streaming else 0
+
+    with _index_lock(), timed_stage(INGEST_TOTAL, INGEST_STAGE_SECONDS):
+        info = _build_index(embeddings, streaming, workers, batch_size, queue_batches, on_progress, cancelled)
+    for result in (STAT_ADDED, STAT_UPDATED, STAT_DELETED, STAT_SKIPPED):
+        INGEST_CHUNKS.inc(info[result], result)
+    return info
+
+@contextmanager
+def _index_lock():
+    if fcntl is None:
+        yield
+        return
+    BASE_VECTORS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(BASE_VECTORS_DIR / INDEX_LOCK_FILE, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _build_index(
+    embeddings,
+    streaming: bool,
+    workers: int,
+    batch_size: int,
+    queue_batches: int,
+    on_progress: Callable[[dict], None] | None = None,
+    cancelled: Callable[[], bool] | None = None,
+) -> dict:
+    emb = TimedEmbeddings(embeddings or LazyEmbeddings(load_embeddings), INGEST_EMBED, INGEST_STAGE_SECONDS)
+    source_dir = index_dir()
+    manifest = IndexManifest.load(source_dir / MANIFEST_FILE)
+    pipeline = _pipeline_fingerprint()
+    instruction_files = _instruction_file_signatures()
+    rebuild = manifest.pipeline != pipeline or not manifest.sources or not _stores_exist(source_dir)
+    progress = ProgressReporter(PROGRESS_LABEL, report=print if streaming else _silent)
+    total_cvs = sum(1 for _ in INPUT_DIR.glob("*.json"))
+    notify = on_progress or _silent
+    details: dict = {}
+
+    def report(stage: str, **extra) -> None:
+        if cancelled is not None and cancelled():
+            raise IndexBuildCancelled("Index build cancelled")
+        details.update(extra)
+        notify({"stage": stage, "cvs": progress.cvs, "total_cvs": total_cvs, "chunks": progress.chunks, "elapsed_s": round(progress.elapsed_s, 3), **details})
+
+    report(INGEST_PREPARE)
+    if not rebuild and _is_current(manifest, instruction_files):
+        chunks = len(manifest.chunk_ids())
+        candidates = sum(1 for key in manifest.sources if key.startswith(SOURCE_CANDIDATE + SOURCE_KEY_SEPARATOR))
+        return {"candidates": candidates, "chunks": chunks, STAT_ADDED: 0, STAT_UPDATED: 0, STAT_DELETED: 0, STAT_SKIPPED: chunks,
+                "generation": read_index_version(), **progress.finish()}
+
+    generation = new_generation()
+    target_dir = index_dir(generation)
+    try:
+        info = _build_generation(emb, manifest, pipeline, instruction_files, rebuild, source_dir, target_dir, workers, batch_size, queue_batches, progress, report)
+    except BaseException:
+        shutil.rmtree(target_dir, ignore_errors=True)
+        raise
+    report(STAGE_ACTIVATE)
+    if rebuild or info[STAT_ADDED] or info[STAT_UPDATED] or info[STAT_DELETED]:
+        activate_generation(generation)
+        collect_generations(int(os.getenv(ENV_INDEX_KEEP_GENERATIONS, DEFAULT_INDEX_KEEP_GENERATIONS)))
+    else:
+        shutil.rmtree(target_dir, ignore_errors=True)
+        generation = read_index_version()
+    return {**info, "generation": generation, **details, **progress.finish()}
+
+def _build_generation(
+    emb,
+    manifest: IndexManifest,
+    pipeline: dict,
+    instruction_files: dict,
+    rebuild: bool,
+    source_dir: Path,
+    target_dir: Path,
+    workers: int,
+    batch_size: int,
+    queue_batches: int,
+    progress: ProgressReporter,
+    report: Callable[[str], None],
+) -> dict:
+    lexical_dir = target_dir / LEXICAL_SUBDIR
+    with _open_generation(emb, manifest, pipeline, rebuild, source_dir, target_dir, report) as (vector_store, lexical_index, attribute_index):
+        stats = {STAT_ADDED: 0, STAT_UPDATED: 0, STAT_DELETED: 0, STAT_SKIPPED: 0}
+        previous_ids = manifest.chunk_ids()
+        live_ids: set = set()
+        seen_keys: set = set()
+        candidates = 0
+        with BatchWriter(lambda docs, ids: _upsert(vector_store, lexical_index, docs, ids), batch_size, queue_batches) as writer:
+            for key, entry, docs, attributes in timed_iter(_iter_sources(manifest, workers), INGEST_PREPARE):
+                is_candidate = key.startswith(SOURCE_CANDIDATE + SOURCE_KEY_SEPARATOR)
+                candidates += is_candidate
+                seen_keys.add(key)
+                previous = manifest.sources.get(key)
+                written = 0
+                if docs is None:
+                    stats[STAT_SKIPPED] += len(entry.chunk_ids)
+                else:
+                    stat_key = STAT_UPDATED if previous else STAT_ADDED
+                    for doc, chunk_id in zip(docs, entry.chunk_ids):
+                        if chunk_id in previous_ids or chunk_id in live_ids:
+                            stats[STAT_SKIPPED] += 1
+                        else:
+                            writer.add(doc, chunk_id)
+                            stats[stat_key] += 1
+                            written += 1
+                        live_ids.add(chunk_id)
+                live_ids.update(entry.chunk_ids)
+                if attributes is not None:
+                    attribute_index.upsert(key, attributes)
+                manifest.sources[key] = entry
+                progress.update(cvs=int(is_candidate), chunks=written)
+                report(INGEST_PREPARE)
+
+        report(INGEST_DELETE)
+        removed_keys = set(manifest.sources) - seen_keys
+        for key in removed_keys:
+            del manifest.sources[key]
+        attribute_index.remove(removed_keys)
+        stale_ids = sorted(previous_ids - live_ids)
+        with timed_stage(INGEST_DELETE, INGEST_STAGE_SECONDS):
+            for start in range(0, len(stale_ids), UPSERT_BATCH_SIZE):
+                vector_store.delete(ids=stale_ids[start:start + UPSERT_BATCH_SIZE])
+            lexical_index.remove(stale_ids)
+        stats[STAT_DELETED] = len(stale_ids)
+
+        report(INGEST_PERSIST)
+        with timed_stage(INGEST_PERSIST, INGEST_STAGE_SECONDS):
+            persist_vector_store(vector_store)
+            lexical_index.save(lexical_dir)
+            attribute_index.save(target_dir)
+            manifest.files = instruction_files
+            manifest.save(target_dir / MANIFEST_FILE)
+        return {"candidates": candidates, "chunks": len(live_ids), **stats}
+
+@contextmanager
+def _open_generation(emb, manifest: IndexManifest, pipeline: dict, rebuild: bool, source_dir: Path, target_dir: Path, report: Callable[..., None]):
+    if rebuild:
+        target_dir.mkdir(parents=True)
+        vector_store = vector_store_reset(emb, target_dir)
+        lexical_index = LexicalIndex()
+        attribute_index = AttributeIndex()
+        manifest.reset(pipeline)
+    else:
+        report(INGEST_COPY, **_copy_generation(source_dir, target_dir))
+        vector_store = vector_store_persistent(emb, mmap=False, directory=target_dir)
+        lexical_index = LexicalIndex.load(target_dir / LEXICAL_SUBDIR)
+        attribute_index = AttributeIndex.load(target_dir)
+    try:
+        yield vector_store, lexical_index, attribute_index
+    finally:
+        close_vector_store(vector_store)
 
-    instr_path = Path(os.getenv("EMBEDING_INSTRUCTION_FILE", DEFAULT_EMBEDDING_INSTRUCTION_FILE))
+def _copy_generation(source_dir: Path, target_dir: Path) -> dict:
+    counts = {"linked": 0, "copied": 0}
+    started = time.perf_counter()
+
+    def link_or_copy(source: str, target: str) -> None:
+        if Path(source).relative_to(source_dir).parts[0] not in GENERATION_COPIED_SUBDIRS:
+            try:
+                os.link(source, target)
+                counts["linked"] += 1
+                return
+            except OSError:
+                pass
+        shutil.copy2(source, target)
+        counts["copied"] += 1
+
+    with timed_stage(INGEST_COPY, INGEST_STAGE_SECONDS):
+        shutil.copytree(source_dir, target_dir, ignore=shutil.ignore_patterns(*GENERATION_COPY_IGNORE), copy_function=link_or_copy)
+    return {"copy_s": round(time.perf_counter() - started, 3), "linked_files": counts["linked"], "copied_files": counts["copied"]}
+
+def index_is_current() -> bool:
+    manifest = IndexManifest.load(index_dir() / MANIFEST_FILE)
+    if not manifest.sources or manifest.pipeline != _pipeline_fingerprint() or not _stores_exist():
+        return False
+    return _is_current(manifest, _instruction_file_signatures())
+
+def _is_current(manifest: IndexManifest, instruction_files: dict) -> bool:
+    if manifest.files != instruction_files:
+        return False
+    prefix = SOURCE_CANDIDATE + SOURCE_KEY_SEPARATOR
+    indexed = {key for key in manifest.sources if key.startswith(prefix)}
+    files = sorted(INPUT_DIR.glob("*.json"))
+    if len(files) != len(indexed):
+        return False
+    for file_path in files:
+        entry = manifest.sources.get(_source_key(SOURCE_CANDIDATE, file_path.name))
+        file_stat = file_path.stat()
+        if entry is None or entry.size != file_stat.st_size or entry.mtime_ns != file_stat.st_mtime_ns:
+            return False
+    return True
+
+def _stores_exist(directory: Path | None = None) -> bool:
+    directory = directory or index_dir()
+    return (
+        vector_store_exists(directory)
+        and LexicalIndex.exists(directory / LEXICAL_SUBDIR)
+        and AttributeIndex.exists(directory)
+    )
+
+def _instruction_paths() -> List[Path]:
+    return [
+        Path(os.getenv("EMBEDING_INSTRUCTION_FILE", DEFAULT_EMBEDDING_INSTRUCTION_FILE)),
+        Path(os.getenv("LLM_INSTRUCTION_FILE", DEFAULT_LLM_INSTRUCTION_FILE)),
+    ]
+
+def _instruction_file_signatures() -> dict:
+    signatures = {}
+    for path in _instruction_paths():
+        if path.exists():
+            file_stat = path.stat()
+            signatures[str(path)] = [file_stat.st_size, file_stat.st_mtime_ns]
+    return signatures
+
+def _silent(_: str) -> None:
+    pass
+
+def _pipeline_fingerprint() -> dict:
+    return {
+        "emb_model": os.getenv(ENV_EMB_MODEL, DEFAULT_EMB_MODEL),
+        "emb_normalize": os.getenv(ENV_EMB_NORMALIZE, DEFAULT_NORMALIZE).lower() == "true",
+        "emb_backend": embedding_backend(),
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+        "candidate_chunker": CANDIDATE_CHUNKER_VERSION,
+        "lexical_index": LEXICAL_INDEX_VERSION,
+        "attributes": ATTRIBUTES_VERSION,
+        "vector_store": vector_store_fingerprint(),
+    }
+
+def _upsert(vector_store, lexical_index: LexicalIndex, docs: list, ids: list) -> None:
+    with timed_stage(INGEST_VECTOR_UPSERT, INGEST_STAGE_SECONDS):
+        vector_store.add_documents(docs, ids=ids)
+    with timed_stage(INGEST_LEXICAL_UPSERT, INGEST_STAGE_SECONDS):
+        for doc, chunk_id in zip(docs, ids):
+            lexical_index.add(chunk_id, doc.page_content, doc.metadata.get("type"), doc.metadata.get("candidate_id"))
+
+def _source_key(kind: str, name) -> str:
+    return f"{kind}{SOURCE_KEY_SEPARATOR}{name}"
+
+def _iter_sources(manifest: IndexManifest, workers: int = 0) -> Iterator[Tuple[str, SourceEntry, list | None, dict | None]]:
+    yield from _iter_candidate_sources(INPUT_DIR, manifest, workers)
+
+    instr_path, llm_instr_path = _instruction_paths()
     if instr_path.exists():
-        docs += _load_and_split_instruction_docs(instr_path)
+        docs = _load_and_split_instruction_docs(instr_path)
+        yield from _iter_row_sources(SOURCE_EMBEDDING_INSTRUCTION, docs, FIELD_PAIR_ID, manifest)
 
-    llm_instr_path = Path(os.getenv("LLM_INSTRUCTION_FILE", DEFAULT_LLM_INSTRUCTION_FILE))
     if llm_instr_path.exists():
-        docs += _load_and_split_llm_instruction_docs(llm_instr_path)
+        docs = _load_and_split_llm_instruction_docs(llm_instr_path)
+        yield from _iter_row_sources(SOURCE_LLM_INSTRUCTION, docs, FIELD_ROW_ID, manifest)
 
-    emb = load_embeddings()
-    chroma_from_documents(docs, emb)
-    return {"candidates": len(records), "chunks": len(docs)}
+def _iter_candidate_sources(input_dir: Path, manifest: IndexManifest, workers: int = 0) -> Iterator[Tuple[str, SourceEntry, list | None, dict | None]]:
+    changed = []
+    for file_path in sorted(input_dir.glob("*.json")):
+        key = _source_key(SOURCE_CANDIDATE, file_path.name)
+        file_stat = file_path.stat()
+        previous = manifest.sources.get(key)
+        if previous and previous.size == file_stat.st_size and previous.mtime_ns == file_stat.st_mtime_ns:
+            yield key, previous, None, None
+        else:
+            changed.append((key, str(file_path), previous))
+    yield from parallel_map(_prepare_candidate_source, changed, workers)
+
+def _prepare_candidate_source(item: Tuple[str, str, SourceEntry | None]) -> Tuple[str, SourceEntry, list | None, dict | None]:
+    key, path, previous = item
+    file_path = Path(path)
+    file_stat = file_path.stat()
+    raw = file_path.read_bytes()
+    digest = content_hash(raw)
+    if previous and previous.digest == digest:
+        return key, previous.model_copy(update={"size": file_stat.st_size, "mtime_ns": file_stat.st_mtime_ns}), None, None
+    record = _candidate_record_from_data(json.loads(raw.decode("utf-8")), file_path)
+    docs = to_documents([record])
+    chunk_ids = [make_chunk_id(record.candidate_id, d.page_content, d.metadata) for d in docs]
+    entry = SourceEntry(digest=digest, chunk_ids=chunk_ids, size=file_stat.st_size, mtime_ns=file_stat.st_mtime_ns)
+    return key, entry, docs, candidate_attributes(record)
+
+def _iter_row_sources(kind: str, docs: list, row_field: str, manifest: IndexManifest) -> Iterator[Tuple[str, SourceEntry, list | None, dict | None]]:
+    rows = defaultdict(list)
+    for doc in docs:
+        rows[doc.metadata.get(row_field)].append(doc)
+    for row, row_docs in rows.items():
+        key = _source_key(kind, row)
+        chunk_ids = [make_chunk_id(key, d.page_content, d.metadata) for d in row_docs]
+        digest = content_hash("\n".join(chunk_ids))
+        previous = manifest.sources.get(key)
+        if previous and previous.digest == digest:
+            yield key, previous, None, None
+        else:
+            yield key, SourceEntry(digest=digest, chunk_ids=chunk_ids), row_docs, None
 
 def _load_and_split_instruction_docs(instr_path: Path) -> list:
     from langchain_core.documents import Document
@@ -114,4 +464,7 @@ def _load_and_split_llm_instruction_docs(path: Path) -> list:
 def build_index_from_records(records: list):
     emb = load_embeddings()
     docs = to_documents(records)
-    return chroma_from_documents(docs, emb)
\ No newline at end of file
+    generation = new_generation()
+    vector_store = vector_store_from_documents(docs, emb, index_dir(generation))
+    activate_generation(generation)
+    return vector_store
\ No newline at end of file
@@ -0,0 +1,180 @@
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from src.ingest.pipeline import IndexBuildCancelled
+
+__all__ = ["IndexJobManager", "IndexJobNotFoundError"]
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATES = (JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED)
+JOB_FILE_SUFFIX = ".json"
+CANCEL_FILE_SUFFIX = ".cancel"
+FILE_ENCODING = "utf-8"
+JOB_ID_LENGTH = 12
+JOB_THREAD_NAME = "index-job"
+DEFAULT_MAX_JOBS = 50
+DEFAULT_PROGRESS_INTERVAL_S = 0.5
+ERROR_WORKER_EXITED = "The process running this job exited"
+
+class IndexJobNotFoundError(LookupError):
+    pass
+
+def _default_build(**kwargs) -> dict:
+    from src.ingest.build_index import build_index
+    return build_index(**kwargs)
+
+def _mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0.0
+
+def _process_alive(pid: int) -> bool:
+    if os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class IndexJobManager:
+    def __init__(
+        self,
+        jobs_dir: Path,
+        build: Callable[..., dict] | None = None,
+        on_success: Callable[[dict], None] | None = None,
+        max_jobs: int = DEFAULT_MAX_JOBS,
+        progress_interval_s: float = DEFAULT_PROGRESS_INTERVAL_S,
+    ):
+        self.jobs_dir = Path(jobs_dir)
+        self._build = build or _default_build
+        self._on_success = on_success
+        self.max_jobs = max_jobs
+        self.progress_interval_s = progress_interval_s
+        self._lock = threading.Lock()
+        self._active: Dict[str, Any] | None = None
+        self._threads: Dict[str, threading.Thread] = {}
+
+    def submit(self) -> dict:
+        with self._lock:
+            if self._active is not None and self._active["state"] not in FINISHED_STATES:
+                return dict(self._active)
+            job = {
+                "id": uuid.uuid4().hex[:JOB_ID_LENGTH],
+                "state": JOB_QUEUED,
+                "pid": os.getpid(),
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "progress": {},
+                "result": None,
+                "error": None,
+            }
+            self._active = job
+            self._save(job)
+            thread = threading.Thread(target=self._run, args=(job,), name=JOB_THREAD_NAME, daemon=True)
+            self._threads[job["id"]] = thread
+            thread.start()
+        self._prune()
+        return dict(job)
+
+    def get(self, job_id: str) -> dict:
+        try:
+            job = json.loads(self._job_path(job_id).read_text(encoding=FILE_ENCODING))
+        except (FileNotFoundError, ValueError):
+            raise IndexJobNotFoundError(f"Unknown index job: {job_id}")
+        if job["state"] not in FINISHED_STATES and not _process_alive(job["pid"]):
+            job.update(state=JOB_FAILED, error=ERROR_WORKER_EXITED)
+        return job
+
+    def list(self) -> List[dict]:
+        jobs = []
+        for path in self._job_paths():
+            try:
+                jobs.append(self.get(path.stem))
+            except IndexJobNotFoundError:
+                continue
+        return sorted(jobs, key=lambda job: job["created_at"], reverse=True)
+
+    def cancel(self, job_id: str) -> dict:
+        job = self.get(job_id)
+        if job["state"] not in FINISHED_STATES:
+            self._cancel_path(job_id).touch()
+            job["cancel_requested"] = True
+        return job
+
+    def wait(self, job_id: str, timeout: float | None = None) -> dict:
+        thread = self._threads.get(job_id)
+        if thread is not None:
+            thread.join(timeout)
+        return self.get(job_id)
+
+    def _run(self, job: dict) -> None:
+        last_saved = [0.0]
+
+        def on_progress(progress: dict) -> None:
+            job["progress"] = progress
+            if job["state"] == JOB_QUEUED:
+                job.update(state=JOB_RUNNING, started_at=time.time())
+            now = time.monotonic()
+            if now - last_saved[0] >= self.progress_interval_s:
+                last_saved[0] = now
+                self._save(job)
+
+        try:
+            result = self._build(on_progress=on_progress, cancelled=lambda: self._cancel_path(job["id"]).exists())
+            job.update(state=JOB_SUCCEEDED, result=result)
+        except IndexBuildCancelled:
+            job.update(state=JOB_CANCELLED)
+        except Exception as e:
+            job.update(state=JOB_FAILED, error=str(e))
+        job["finished_at"] = time.time()
+        self._save(job)
+        self._cancel_path(job["id"]).unlink(missing_ok=True)
+        self._threads.pop(job["id"], None)
+        if job["state"] == JOB_SUCCEEDED and self._on_success is not None:
+            try:
+                self._on_success(job)
+            except Exception as e:
+                print(f"[INDEX] Post-index hook failed: {e}")
+
+    def _save(self, job: dict) -> None:
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        path = self._job_path(job["id"])
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(job, ensure_ascii=False, default=str), encoding=FILE_ENCODING)
+        os.replace(tmp_path, path)
+
+    def _prune(self) -> None:
+        paths = sorted(self._job_paths(), key=_mtime, reverse=True)
+        for path in paths[self.max_jobs:]:
+            try:
+                if self.get(path.stem)["state"] in FINISHED_STATES:
+                    path.unlink(missing_ok=True)
+            except (IndexJobNotFoundError, OSError):
+                continue
+
+    def _job_paths(self) -> List[Path]:
+        if not self.jobs_dir.exists():
+            return []
+        return list(self.jobs_dir.glob("*" + JOB_FILE_SUFFIX))
+
+    def _job_path(self, job_id: str) -> Path:
+        if not job_id.isalnum():
+            raise IndexJobNotFoundError(f"Unknown index job: {job_id}")
+        return self.jobs_dir / f"{job_id}{JOB_FILE_SUFFIX}"
+
+    def _cancel_path(self, job_id: str) -> Path:
+        return self.jobs_dir / f"{job_id}{CANCEL_FILE_SUFFIX}"
@@ -0,0 +1,59 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, List
+import hashlib
+import json
+import os
+
+from pydantic import BaseModel
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_SCHEMA_VERSION = 1
+FILE_ENCODING = "utf-8"
+CHUNK_HASH_LENGTH = 20
+CHUNK_ID_SEPARATOR = ":"
+
+__all__ = ["IndexManifest", "SourceEntry", "make_chunk_id", "content_hash"]
+
+class SourceEntry(BaseModel):
+    digest: str
+    chunk_ids: List[str] = []
+    size: int | None = None
+    mtime_ns: int | None = None
+
+class IndexManifest(BaseModel):
+    schema_version: int = MANIFEST_SCHEMA_VERSION
+    pipeline: Dict[str, Any] = {}
+    sources: Dict[str, SourceEntry] = {}
+    files: Dict[str, List[int]] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> "IndexManifest":
+        if not path.exists():
+            return cls()
+        data = json.loads(path.read_text(encoding=FILE_ENCODING))
+        if data.get("schema_version") != MANIFEST_SCHEMA_VERSION:
+            return cls()
+        return cls.model_validate(data)
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(self.model_dump_json(), encoding=FILE_ENCODING)
+        os.replace(tmp_path, path)
+
+    def reset(self, pipeline: Dict[str, Any]) -> None:
+        self.pipeline = pipeline
+        self.sources = {}
+
+    def chunk_ids(self) -> set:
+        return {chunk_id for entry in self.sources.values() for chunk_id in entry.chunk_ids}
+
+def content_hash(data: bytes | str) -> str:
+    if isinstance(data, str):
+        data = data.encode(FILE_ENCODING)
+    return hashlib.sha256(data).hexdigest()
+
+def make_chunk_id(owner: str, content: str, metadata: Dict[str, Any]) -> str:
+    payload = json.dumps([content, metadata], ensure_ascii=False, sort_keys=True, default=str)
+    return f"{owner}{CHUNK_ID_SEPARATOR}{content_hash(payload)[:CHUNK_HASH_LENGTH]}"
@@ -0,0 +1,143 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Iterable, Iterator
+import queue
+import threading
+import time
+
+__all__ = ["parallel_map", "BatchWriter", "ProgressReporter", "IndexBuildCancelled"]
+
+DEFAULT_IN_FLIGHT_PER_WORKER = 4
+DEFAULT_PROGRESS_INTERVAL_S = 5.0
+_STOP = object()
+
+class IndexBuildCancelled(RuntimeError):
+    pass
+
+def parallel_map(fn: Callable[[Any], Any], items: Iterable[Any], workers: int, max_in_flight: int | None = None) -> Iterator[Any]:
+    if workers <= 1:
+        for item in items:
+            yield fn(item)
+        return
+    limit = max_in_flight or workers * DEFAULT_IN_FLIGHT_PER_WORKER
+    iterator = iter(items)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = set()
+        exhausted = False
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < limit:
+                try:
+                    in_flight.add(executor.submit(fn, next(iterator)))
+                except StopIteration:
+                    exhausted = True
+            if not in_flight:
+                break
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+class BatchWriter:
+    def __init__(self, write: Callable[[list, list], None], batch_size: int, max_queued_batches: int = 0):
+        self._write = write
+        self._batch_size = batch_size
+        self._docs: list = []
+        self._ids: list = []
+        self._error: BaseException | None = None
+        self._aborted = False
+        self._queue: queue.Queue | None = None
+        self._thread: threading.Thread | None = None
+        if max_queued_batches > 0:
+            self._queue = queue.Queue(maxsize=max_queued_batches)
+            self._thread = threading.Thread(target=self._drain, name="index-writer", daemon=True)
+            self._thread.start()
+
+    def add(self, doc, chunk_id: str) -> None:
+        self._docs.append(doc)
+        self._ids.append(chunk_id)
+        if len(self._docs) >= self._batch_size:
+            self._submit()
+
+    def close(self) -> None:
+        if self._docs:
+            self._submit()
+        self._stop()
+        self._raise_pending()
+
+    def abort(self) -> None:
+        self._docs, self._ids = [], []
+        self._aborted = True
+        self._stop()
+
+    def __enter__(self) -> "BatchWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _stop(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _submit(self) -> None:
+        docs, ids = self._docs, self._ids
+        self._docs, self._ids = [], []
+        self._raise_pending()
+        if self._queue is None:
+            self._write(docs, ids)
+        else:
+            self._queue.put((docs, ids))
+
+    def _drain(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            if self._error is None and not self._aborted:
+                try:
+                    self._write(*item)
+                except BaseException as e:
+                    self._error = e
+
+    def _raise_pending(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+class ProgressReporter:
+    def __init__(self, label: str, interval_s: float = DEFAULT_PROGRESS_INTERVAL_S, report: Callable[[str], None] = print):
+        self._label = label
+        self._interval_s = interval_s
+        self._report = report
+        self._started = time.perf_counter()
+        self._last_report = self._started
+        self.cvs = 0
+        self.chunks = 0
+
+    @property
+    def elapsed_s(self) -> float:
+        return time.perf_counter() - self._started
+
+    def update(self, cvs: int = 0, chunks: int = 0) -> None:
+        self.cvs += cvs
+        self.chunks += chunks
+        now = time.perf_counter()
+        if now - self._last_report >= self._interval_s:
+            self._last_report = now
+            self._report(self._format())
+
+    def finish(self) -> dict:
+        elapsed = self.elapsed_s
+        self._report(self._format())
+        return {
+            "elapsed_s": round(elapsed, 3),
+            "cvs_per_s": round(self.cvs / elapsed, 2) if elapsed else 0.0,
+            "chunks_per_s": round(self.chunks / elapsed, 2) if elapsed else 0.0,
+        }
+
+    def _format(self) -> str:
+        elapsed = self.elapsed_s or 1e-9
+        return (f"[{self._label}] {self.cvs} CVs ({self.cvs / elapsed:.1f} CVs/s), "
+                f"{self.chunks} chunks ({self.chunks / elapsed:.1f} chunks/s)")
@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.core.infrastructure.embeddings import (
+    load_instruction_pairs, FIELD_TYPE, FIELD_PAIR_ID, TYPE_QUERY, TYPE_POSITIVE, DEFAULT_EMBEDDINGS_INSTRUCTION_FILE,
+)
+from src.core.infrastructure.faiss_store import FaissVectorStore, INDEX_FILE, INDEX_TYPES, QUANTIZATIONS
+
+ENV_EMBEDING_INSTRUCTION_FILE = "EMBEDING_INSTRUCTION_FILE"
+DEFAULT_K = 5
+DEFAULT_DISTRACTORS = 2000
+DEFAULT_EXTRA_QUERIES = 200
+DEFAULT_REPEATS = 5
+DEFAULT_SEED = 13
+DISTRACTOR_MIN_WORDS = 8
+DISTRACTOR_MAX_WORDS = 24
+QUERY_NOISE = 0.1
+FAKE_EMBEDDING_SIZE = 384
+MS_PER_S = 1000
+PERCENTILES = (50, 95)
+
+def load_eval_set(path: Path) -> Tuple[List[str], List[str], List[str], List[str]]:
+    records = load_instruction_pairs(path)
+    queries, expected, texts, ids = [], [], [], []
+    for text, meta in records:
+        pair_id = meta[FIELD_PAIR_ID]
+        if meta[FIELD_TYPE] == TYPE_QUERY:
+            queries.append(text)
+            expected.append(f"{TYPE_POSITIVE}:{pair_id}")
+        else:
+            texts.append(text)
+            ids.append(f"{meta[FIELD_TYPE]}:{pair_id}")
+    return queries, expected, texts, ids
+
+def synthetic_distractors(texts: List[str], count: int, rng: np.random.Generator) -> List[str]:
+    words = " ".join(texts).replace("|", " ").split()
+    if not words:
+        return []
+    lengths = rng.integers(DISTRACTOR_MIN_WORDS, DISTRACTOR_MAX_WORDS, size=count)
+    return [" ".join(rng.choice(words, size=int(n))) for n in lengths]
+
+def exact_neighbours(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    distances = (queries ** 2).sum(axis=1)[:, None] - 2.0 * queries @ vectors.T + (vectors ** 2).sum(axis=1)[None, :]
+    return np.argsort(distances, axis=1, kind="stable")[:, :k]
+
+def evaluate_config(
+    index_type: str,
+    quantization: str,
+    embeddings,
+    texts: List[str],
+    ids: List[str],
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    expected: List[str],
+    truth: np.ndarray,
+    k: int,
+    repeats: int,
+) -> Dict[str, object]:
+    started = time.perf_counter()
+    store = FaissVectorStore(embeddings, index_type=index_type, quantization=quantization)
+    store.add_embeddings(texts, vectors, ids=ids)
+    build_s = time.perf_counter() - started
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        store.save(Path(tmp))
+        save_s = time.perf_counter() - started
+        index_bytes = (Path(tmp) / INDEX_FILE).stat().st_size
+        loaded = FaissVectorStore.load(embeddings, Path(tmp), mmap=True, index_type=index_type, quantization=quantization)
+        latencies, results = [], []
+        for _ in range(repeats):
+            results = []
+            for query in queries:
+                t0 = time.perf_counter()
+                results.append([docno for docno, _ in loaded.search_docnos(query, k)])
+                latencies.append((time.perf_counter() - t0) * MS_PER_S)
+        spec = loaded.spec
+    recall = np.mean([len(set(found) & set(truth[i].tolist())) / k for i, found in enumerate(results)])
+    hits = [expected[i] in {ids[d] for d in results[i]} for i in range(len(expected))]
+    p50, p95 = np.percentile(latencies, PERCENTILES)
+    return {
+        "index_type": index_type,
+        "quantization": quantization,
+        "spec": spec,
+        "build_s": round(build_s, 3),
+        "save_s": round(save_s, 3),
+        "index_bytes": index_bytes,
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        f"recall@{k}": round(float(recall), 4),
+        f"positive_hit@{k}": round(float(np.mean(hits)), 4) if hits else None,
+    }
+
+def _embeddings(fake: bool):
+    if fake:
+        from langchain_core.embeddings import DeterministicFakeEmbedding
+        return DeterministicFakeEmbedding(size=FAKE_EMBEDDING_SIZE)
+    from src.core.application.embedding_client import load_embeddings
+    return load_embeddings()
+
+def main(argv: List[str] | None = None) -> List[Dict[str, object]]:
+    parser = argparse.ArgumentParser(description="FAISS recall@k vs latency report")
+    parser.add_argument("--pairs", default=os.getenv(ENV_EMBEDING_INSTRUCTION_FILE, DEFAULT_EMBEDDINGS_INSTRUCTION_FILE))
+    parser.add_argument("--k", type=int, default=DEFAULT_K)
+    parser.add_argument("--distractors", type=int, default=DEFAULT_DISTRACTORS)
+    parser.add_argument("--extra-queries", type=int, default=DEFAULT_EXTRA_QUERIES)
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--fake", action="store_true", help="Use deterministic fake embeddings (no model download)")
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    query_texts, expected, texts, ids = load_eval_set(Path(args.pairs))
+    if not texts:
+        print(f"[WARN] No query/positive/negative pairs loaded from {args.pairs}")
+        return []
+    distractors = synthetic_distractors(texts, args.distractors, rng)
+    texts = texts + distractors
+    ids = ids + [f"distractor:{i}" for i in range(len(distractors))]
+
+    embeddings = _embeddings(args.fake)
+    vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+    queries = np.asarray(embeddings.embed_documents(query_texts), dtype=np.float32)
+    if args.extra_queries:
+        sampled = vectors[rng.integers(0, len(vectors), size=args.extra_queries)]
+        noise = rng.normal(0.0, QUERY_NOISE * float(vectors.std()), size=sampled.shape).astype(np.float32)
+        queries = np.concatenate([queries, sampled + noise])
+    truth = exact_neighbours(vectors, queries, args.k)
+
+    report = []
+    print(f"[REPORT] corpus={len(texts)} queries={len(queries)} labelled={len(expected)} dim={vectors.shape[1]} k={args.k}")
+    for index_type in INDEX_TYPES:
+        for quantization in QUANTIZATIONS:
+            row = evaluate_config(
+                index_type, quantization, embeddings, texts, ids, vectors, queries, expected, truth, args.k, args.repeats
+            )
+            report.append(row)
+            print(
+                f"{row['spec']:<16} build={row['build_s']:>7.3f}s save={row['save_s']:>7.3f}s size={row['index_bytes']:>10} "
+                f"p50={row['p50_ms']:>7.3f}ms p95={row['p95_ms']:>7.3f}ms "
+                f"recall@{args.k}={row[f'recall@{args.k}']:.3f} positive_hit@{args.k}={row[f'positive_hit@{args.k}']}"
+            )
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import shutil
+import pytest
+from pathlib import Path
+
+import src.core.application.retriever as retriever
+import src.ingest.build_index as build_index_module
+from src.core.application.chain_manager import ChainManager
+from tests.fakes import build_fake_chain
+
+INPUT_FIXTURES = Path("data/input")
+
+@pytest.fixture
+def fake_chain_manager(tmp_path, monkeypatch):
+    import src.api.main as api_main
+    manager = ChainManager(
+        chain_factory=lambda _: build_fake_chain(),
+        embeddings_factory=lambda: None,
+        sources_fingerprint=lambda: (),
+        env_file=tmp_path / ".env",
+    )
+    monkeypatch.setattr(api_main, "chain_manager", manager)
+    return manager
+
+@pytest.fixture
+def index_dirs(tmp_path, monkeypatch):
+    input_dir = tmp_path / "input"
+    vectors_dir = tmp_path / "vectors"
+    input_dir.mkdir()
+    vectors_dir.mkdir()
+    for name in ("MauroGioberti_ATS.json", "Gorosito.json"):
+        shutil.copy(INPUT_FIXTURES / name, input_dir / name)
+    monkeypatch.setattr(retriever, "BASE_VECTORS_DIR", vectors_dir)
+    monkeypatch.setattr(build_index_module, "BASE_VECTORS_DIR", vectors_dir)
+    monkeypatch.setattr(build_index_module, "INPUT_DIR", input_dir)
+    monkeypatch.setenv("EMBEDING_INSTRUCTION_FILE", str(tmp_path / "missing.jsonl"))
+    monkeypatch.setenv("LLM_INSTRUCTION_FILE", str(tmp_path / "missing.jsonl"))
+    return input_dir
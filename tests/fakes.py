@@ -0,0 +1,20 @@
+from langchain_core.documents import Document
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableLambda
+from langchain.chains import create_retrieval_chain
+from langchain.chains.combine_documents import create_stuff_documents_chain
+
+FAKE_EMBEDDING_SIZE = 16
+FAKE_ANSWER = "Gioberti has C1 English"
+FAKE_SOURCES = [
+    Document(page_content="English C1", metadata={"type": "candidate", "candidate_id": "Gioberti"}),
+    Document(page_content="English B2", metadata={"type": "candidate", "candidate_id": "Garcia"}),
+]
+
+def build_fake_chain(answer: str = FAKE_ANSWER, sources=None):
+    docs = FAKE_SOURCES if sources is None else sources
+    prompt = ChatPromptTemplate.from_messages([("system", "Context:\n{context}"), ("human", "{input}")])
+    llm = FakeListChatModel(responses=[answer])
+    retriever = RunnableLambda(lambda _: list(docs))
+    return create_retrieval_chain(retriever, create_stuff_documents_chain(llm, prompt))
@@ -0,0 +1,44 @@
+from src.core.application.answer_cache import AnswerCache, MATCH_EXACT, MATCH_SEMANTIC
+
+VECTORS = {
+    "who has c1 english": [1.0, 0.0, 0.0],
+    "which candidates have c1 english": [0.99, 0.1, 0.0],
+    "best backend .net lead": [0.0, 1.0, 0.0],
+}
+RESPONSE = {"answer": "Gioberti", "sources": []}
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def _cache(clock=None, **kwargs) -> AnswerCache:
+    return AnswerCache(embed_query=lambda q: VECTORS[q], threshold=0.95, clock=clock or Clock(), **kwargs)
+
+def test_exact_and_semantic_hits():
+    cache = _cache()
+    assert cache.get("Who has C1 English", None, "g1") is None
+    cache.put("Who has C1 English", None, "g1", RESPONSE)
+    assert cache.get("  who has C1   english", None, "g1") == (RESPONSE, {"match": MATCH_EXACT, "similarity": 1.0})
+    response, match = cache.get("Which candidates have C1 English", None, "g1")
+    assert response == RESPONSE and match["match"] == MATCH_SEMANTIC
+    assert cache.get("Best backend .NET lead", None, "g1") is None
+    assert cache.get("Which candidates have C1 English", {"prepared": True}, "g1") is None
+
+def test_new_generation_invalidates_entries():
+    cache = _cache()
+    cache.put("Who has C1 English", None, "g1", RESPONSE)
+    assert cache.get("Who has C1 English", None, "g2") is None
+    assert cache.stats()["entries"] == 0
+
+def test_ttl_and_lru_bounds():
+    clock = Clock()
+    cache = _cache(clock=clock, ttl_s=10, max_entries=1)
+    cache.put("Who has C1 English", None, "g1", RESPONSE)
+    cache.put("Best backend .NET lead", None, "g1", RESPONSE)
+    assert cache.get("Who has C1 English", None, "g1") is None
+    assert cache.get("Best backend .NET lead", None, "g1") is not None
+    clock.now = 11
+    assert cache.get("Best backend .NET lead", None, "g1") is None
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.runnables import RunnableLambda
+
+import src.api.main as api_main
+import src.core.application.retriever as retriever
+from src.core.application.attribute_index import AttributeIndex, FiltersUnavailableError, InvalidFilterError
+from src.core.application.chain_manager import ChainManager
+from src.core.application.hybrid_retriever import HybridRetriever
+from src.ingest.build_index import build_index
+from tests.fakes import FAKE_EMBEDDING_SIZE
+
+def _row(candidate_id, english=5, prepared=True, seniority="senior", years=10.0, location="Barcelona, Spain", skills=()):
+    return {
+        "candidate_id": candidate_id,
+        "english_level": "C1",
+        "english_level_num": english,
+        "prepared": prepared,
+        "seniority": seniority,
+        "years_experience": years,
+        "location": location,
+        "skills": sorted(skills),
+    }
+
+def test_resolve_ranges_sets_and_booleans(tmp_path):
+    index = AttributeIndex()
+    index.upsert("candidate:a.json", _row("A", skills=["c#", ".net", "sql"]))
+    index.upsert("candidate:b.json", _row("B", english=3, seniority="junior", years=2, location="Madrid", skills=["react"]))
+    index.upsert("candidate:c.json", _row("C", prepared=False, seniority="lead", years=None, skills=["c#", "react"]))
+
+    assert index.resolve(None) is None
+    assert index.resolve({"english_level_min": "B2"}) == ["A", "C"]
+    assert index.resolve({"prepared": True, "seniority_min": "senior"}) == ["A"]
+    assert index.resolve({"seniority": ["junior", "lead"]}) == ["B", "C"]
+    assert index.resolve({"years_experience_min": 5}) == ["A"]
+    assert index.resolve({"location": "barcelona"}) == ["A", "C"]
+    assert index.resolve({"skills": ["C#", "react"]}) == ["C"]
+    assert index.resolve({"skills_any": ["sql", "react"]}) == ["A", "B", "C"]
+    assert index.resolve({"skills": ["cobol"]}) == []
+
+    index.remove(["candidate:a.json"])
+    index.save(tmp_path)
+    assert AttributeIndex.load(tmp_path).resolve({"skills": ["c#"]}) == ["C"]
+
+def test_resolve_rejects_unknown_filters():
+    index = AttributeIndex()
+    with pytest.raises(InvalidFilterError):
+        index.resolve({"salary_max": 10})
+    with pytest.raises(InvalidFilterError):
+        index.resolve({"seniority": "wizard"})
+
+def test_filters_restrict_retrieval_to_allowlist(index_dirs):
+    emb = DeterministicFakeEmbedding(size=FAKE_EMBEDDING_SIZE)
+    build_index(embeddings=emb)
+    attribute_index = retriever.load_attribute_index()
+    assert sorted(row["candidate_id"] for row in attribute_index.rows()) == ["Gioberti", "PabloGorosito"]
+
+    for lexical_index in (retriever.load_lexical_index(), None):
+        hybrid = HybridRetriever(
+            vector_store=retriever.chroma_persistent(emb),
+            lexical_index=lexical_index,
+            attribute_index=attribute_index,
+            k=4,
+            types=["candidate"],
+        )
+        docs = hybrid.invoke("mentoring Tech Lead", filters={"seniority": "junior"})
+        assert docs and {doc.metadata["candidate_id"] for doc in docs} == {"PabloGorosito"}
+        assert hybrid.invoke("mentoring", filters={"english_level_min": "C2"}) == []
+        async_docs = asyncio.run(hybrid.ainvoke("mentoring Tech Lead", filters={"seniority": "junior"}))
+        assert [doc.id for doc in async_docs] == [doc.id for doc in docs]
+
+    (index_dirs / "Gorosito.json").unlink()
+    build_index(embeddings=emb)
+    assert retriever.load_attribute_index().resolve({"seniority": "junior"}) == []
+
+def test_filters_without_an_attribute_index_are_refused(index_dirs, monkeypatch):
+    emb = DeterministicFakeEmbedding(size=FAKE_EMBEDDING_SIZE)
+    build_index(embeddings=emb)
+    hybrid = HybridRetriever(vector_store=retriever.chroma_persistent(emb), lexical_index=None, attribute_index=None, k=4)
+    assert hybrid.invoke("mentoring")
+    with pytest.raises(FiltersUnavailableError, match="rebuild the index"):
+        hybrid.invoke("mentoring", filters={"seniority": "junior"})
+
+    def chain(payload: dict) -> dict:
+        return {**payload, "answer": "ok", "context": hybrid.invoke(payload["input"], filters=payload.get("filters"))}
+
+    manager = ChainManager(
+        chain_factory=lambda _: RunnableLambda(chain),
+        embeddings_factory=lambda: emb,
+        sources_fingerprint=lambda: (),
+        env_file=index_dirs / ".env",
+    )
+    monkeypatch.setattr(api_main, "chain_manager", manager)
+    monkeypatch.setattr(api_main, "answer_cache_enabled", False)
+    monkeypatch.setattr(api_main, "query_router_enabled", False)
+    response = TestClient(api_main.app).post("/chat", json={"question": "mentoring", "filters": {"seniority": "junior"}})
+    assert response.status_code == 409
+    assert "rebuild the index" in response.json()["detail"]
@@ -0,0 +1,28 @@
+import pytest
+
+from src.ingest.pipeline import BatchWriter, IndexBuildCancelled
+
+def test_cancel_drops_pending_docs_instead_of_writing_them():
+    written = []
+    with pytest.raises(IndexBuildCancelled):
+        with BatchWriter(lambda docs, ids: written.append(ids), batch_size=2) as writer:
+            for i in range(3):
+                writer.add(f"doc {i}", str(i))
+            raise IndexBuildCancelled("Index build cancelled")
+    assert written == [["0", "1"]]
+
+def test_flush_errors_do_not_mask_the_original_exception():
+    def write(docs, ids):
+        raise OSError("vector store is down")
+
+    with pytest.raises(IndexBuildCancelled):
+        with BatchWriter(write, batch_size=4, max_queued_batches=2) as writer:
+            writer.add("doc 0", "0")
+            raise IndexBuildCancelled("Index build cancelled")
+
+def test_close_flushes_the_last_partial_batch():
+    written = []
+    with BatchWriter(lambda docs, ids: written.append(ids), batch_size=2, max_queued_batches=2) as writer:
+        for i in range(3):
+            writer.add(f"doc {i}", str(i))
+    assert written == [["0", "1"], ["2"]]
@@ -0,0 +1,35 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+from src.benchmarks.fakes import HashingEmbeddings
+from src.benchmarks.run import main
+from src.benchmarks.synthetic import synthetic_cv, write_corpus
+from src.ingest.build_index import _load_candidate_records_from_dir, to_documents
+
+def test_synthetic_cvs_are_deterministic_and_parse_like_real_input(tmp_path):
+    assert synthetic_cv(7) == synthetic_cv(7) and synthetic_cv(7) != synthetic_cv(8)
+    write_corpus(tmp_path, 5)
+    records = _load_candidate_records_from_dir(tmp_path)
+    assert len(records) == 5
+    assert all(record.seniority != "unknown" and record.english_level and record.skill_names for record in records)
+    sections = {doc.metadata["section"] for doc in to_documents(records)}
+    assert {"Summary", "SkillMatrix", "Experience", "Education"} <= sections
+
+def test_hashing_embeddings_are_deterministic_and_lexical():
+    emb = HashingEmbeddings(size=64)
+    query = np.array(emb.embed_query("Senior Java developer with Kafka"))
+    near, far = np.array(emb.embed_documents(["Java developer, Kafka and Spring", "React frontend with Figma"]))
+    assert np.allclose(query, emb.embed_query("Senior Java developer with Kafka"))
+    assert query @ near > query @ far
+
+def test_benchmark_writes_machine_readable_report(tmp_path):
+    output = tmp_path / "bench.json"
+    main(["--sizes", "12", "--queries", "4", "--requests", "6", "--concurrency", "3", "--llm-latency-ms", "1", "--output", str(output)])
+    report = json.loads(Path(output).read_text(encoding="utf-8"))
+    row = report["results"][0]
+    assert row["size"] == 12 and row["ingest"]["cvs"] == 12 and row["ingest"]["noop_added"] == 0
+    assert row["index"]["total_bytes"] > 0 and row["memory"]["peak_rss_mb"] > 0
+    assert row["chat"]["statuses"] == {"200": 6}
+    assert row["retrieval"]["p50_ms"] <= row["retrieval"]["p99_ms"]
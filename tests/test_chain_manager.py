@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+from src.core.application.chain_manager import ChainManager, ChainNotReadyError
+
+def _manager(tmp_path, version, calls, fail=None, now=None):
+    now = now if now is not None else [0.0]
+
+    def chain_factory(embeddings):
+        if fail and fail[0]:
+            raise RuntimeError("boom")
+        calls["chain"] += 1
+        return ("chain", calls["chain"], embeddings)
+
+    def embeddings_factory():
+        calls["embeddings"] += 1
+        return "embeddings"
+
+    return ChainManager(
+        chain_factory=chain_factory,
+        embeddings_factory=embeddings_factory,
+        sources_fingerprint=lambda: (version[0],),
+        env_file=tmp_path / ".env",
+        stale_check_s=1.0,
+        clock=lambda: now[0],
+    )
+
+def test_chain_is_built_once_and_shared(tmp_path):
+    calls = {"chain": 0, "embeddings": 0}
+    manager = _manager(tmp_path, ["v1"], calls)
+    manager.warm()
+    first = manager.get()
+    assert manager.get() is first
+    assert calls == {"chain": 1, "embeddings": 1}
+    assert manager.status()["ready"]
+
+def test_chain_is_swapped_when_index_version_changes(tmp_path):
+    calls = {"chain": 0, "embeddings": 0}
+    version = ["v1"]
+    now = [0.0]
+    manager = _manager(tmp_path, version, calls, now=now)
+    first = manager.get()
+    version[0] = "v2"
+    now[0] += 0.5
+    assert manager.get() is first
+    now[0] += 0.5
+    second = manager.get()
+    assert second is not first
+    assert calls == {"chain": 2, "embeddings": 1}
+    assert manager.refresh() is second
+    version[0] = "v3"
+    assert manager.refresh() is not second
+
+def test_failed_rebuild_keeps_serving_previous_chain(tmp_path):
+    calls = {"chain": 0, "embeddings": 0}
+    version = ["v1"]
+    fail = [False]
+    now = [0.0]
+    manager = _manager(tmp_path, version, calls, fail, now)
+    first = manager.get()
+    fail[0] = True
+    version[0] = "v2"
+    now[0] += 1.0
+    assert manager.get() is first
+    assert manager.status()["error"] == "boom"
+
+    fail[0] = False
+    assert manager.get() is first
+    now[0] += 1.0
+    second = manager.get()
+    assert second is not first and second[1] == 2
+    assert manager.status()["error"] is None
+
+def test_not_ready_when_first_build_fails(tmp_path):
+    calls = {"chain": 0, "embeddings": 0}
+    manager = _manager(tmp_path, ["v1"], calls, [True])
+    manager.warm()
+    assert manager.status()["status"] == "error"
+    with pytest.raises(ChainNotReadyError):
+        manager.get()
+
+def test_previous_chain_is_served_while_a_rebuild_is_in_flight(tmp_path):
+    calls = {"chain": 0, "embeddings": 0}
+    version = ["v1"]
+    manager = _manager(tmp_path, version, calls)
+    first = manager.get()
+    building, release = threading.Event(), threading.Event()
+    factory = manager._chain_factory
+
+    def slow_factory(embeddings):
+        building.set()
+        release.wait(5)
+        return factory(embeddings)
+
+    manager._chain_factory = slow_factory
+    version[0] = "v2"
+    rebuild = manager.warm_in_background(force=False)
+    assert building.wait(5)
+    assert manager.get() is first
+    release.set()
+    rebuild.join(5)
+    assert manager.get() is not first
@@ -0,0 +1,91 @@
+from fastapi.testclient import TestClient
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.runnables import RunnableLambda
+
+import src.api.main as api_main
+from src.core.application.answer_cache import AnswerCache
+from src.core.application.attribute_index import InvalidFilterError
+from src.core.application.chain_manager import ChainManager
+from tests.fakes import FAKE_EMBEDDING_SIZE
+
+class BatchRecordingEmbeddings(DeterministicFakeEmbedding):
+    batches: list = []
+    single_calls: int = 0
+
+    def embed_queries(self, texts):
+        self.batches.append(list(texts))
+        return self.embed_documents(texts)
+
+    def embed_query(self, text):
+        self.single_calls += 1
+        return super().embed_query(text)
+
+def _answer(payload: dict) -> dict:
+    question = payload["input"]
+    if question == "boom":
+        raise RuntimeError("model unavailable")
+    if payload.get("filters"):
+        raise InvalidFilterError("Unknown filter: salary")
+    return {**payload, "answer": question.upper(), "context": []}
+
+def _install(monkeypatch, tmp_path, embeddings):
+    seen = []
+
+    def chain(payload: dict) -> dict:
+        seen.append(payload)
+        return _answer(payload)
+
+    manager = ChainManager(
+        chain_factory=lambda _: RunnableLambda(chain),
+        embeddings_factory=lambda: embeddings,
+        sources_fingerprint=lambda: (),
+        env_file=tmp_path / ".env",
+    )
+    monkeypatch.setattr(api_main, "chain_manager", manager)
+    monkeypatch.setattr(api_main, "answer_cache_enabled", False)
+    return seen
+
+def test_batch_embeds_once_and_reports_per_item_errors(tmp_path, monkeypatch):
+    embeddings = BatchRecordingEmbeddings(size=FAKE_EMBEDDING_SIZE, batches=[])
+    seen = _install(monkeypatch, tmp_path, embeddings)
+    items = [
+        {"question": "Who knows C#?"},
+        {"question": "boom"},
+        {"question": "who knows react?", "filters": {"salary": 1}},
+        {"question": "who knows react?"},
+    ]
+    response = TestClient(api_main.app).post("/chat/batch", json={"items": items})
+
+    assert response.status_code == 200
+    body = response.json()
+    results = body["results"]
+    assert results[0]["answer"] == "WHO KNOWS C#?"
+    assert results[1]["error"]["status"] == 502 and "model unavailable" in results[1]["error"]["detail"]
+    assert results[2]["error"] == {"status": 400, "detail": "Unknown filter: salary"}
+    assert results[3]["answer"] == "WHO KNOWS REACT?"
+    assert (body["succeeded"], body["failed"]) == (2, 2)
+
+    assert embeddings.batches == [["Who knows C#?", "boom", "who knows react?", "who knows c#?"]]
+    assert embeddings.single_calls == 0
+    assert all(len(payload["query_embedding"]) == FAKE_EMBEDDING_SIZE for payload in seen)
+
+def test_chat_embeds_once_for_the_answer_cache_and_retrieval(tmp_path, monkeypatch):
+    embeddings = BatchRecordingEmbeddings(size=FAKE_EMBEDDING_SIZE, batches=[])
+    seen = _install(monkeypatch, tmp_path, embeddings)
+    monkeypatch.setattr(api_main, "answer_cache", AnswerCache(embed_query=api_main._embed_question))
+    monkeypatch.setattr(api_main, "answer_cache_enabled", True)
+    client = TestClient(api_main.app)
+
+    assert client.post("/chat", json={"question": "Who knows C#?"}).json()["answer"] == "WHO KNOWS C#?"
+    assert client.post("/chat", json={"question": "who knows rust"}).json()["cache"]["hit"] is False
+
+    assert embeddings.batches == [["Who knows C#?", "who knows c#?"], ["who knows rust"]]
+    assert embeddings.single_calls == 0
+    assert all(len(payload["query_embedding"]) == FAKE_EMBEDDING_SIZE for payload in seen)
+
+def test_batch_rejects_oversized_requests(tmp_path, monkeypatch):
+    _install(monkeypatch, tmp_path, BatchRecordingEmbeddings(size=FAKE_EMBEDDING_SIZE, batches=[]))
+    monkeypatch.setattr(api_main, "chat_batch_max_items", 2)
+    client = TestClient(api_main.app)
+    assert client.post("/chat/batch", json={"items": [{"question": "a"}] * 3}).status_code == 400
+    assert client.post("/chat/batch", json={"items": []}).json()["results"] == []
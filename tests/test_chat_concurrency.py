@@ -0,0 +1,68 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.main import app
+from src.api.concurrency import ConcurrencyLimiter, SingleFlight, QueueFullError, request_key
+from tests.fakes import FAKE_ANSWER
+
+def test_request_key_normalizes_question_and_filters():
+    assert request_key("  Who has  C1 English? ", {"b": 1, "a": 2}) == request_key("who has c1 english?", {"a": 2, "b": 1})
+    assert request_key("who has c1 english?") != request_key("who has c1 english?", {"prepared": True})
+
+def test_singleflight_shares_one_computation():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def run():
+        flights = SingleFlight()
+        results = await asyncio.gather(*[flights.do("same", compute) for _ in range(5)])
+        return results, flights.stats()
+
+    results, stats = asyncio.run(run())
+    assert results == ["answer"] * 5
+    assert len(calls) == 1
+    assert stats == {"in_flight": 0, "leaders": 1, "coalesced": 4}
+
+def test_limiter_rejects_when_queue_is_full():
+    async def run():
+        limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=1)
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.slot():
+                await release.wait()
+
+        running = [asyncio.create_task(hold()), asyncio.create_task(hold())]
+        await asyncio.sleep(0)
+        assert limiter.stats()["active"] == 1 and limiter.stats()["queued"] == 1
+        with pytest.raises(QueueFullError):
+            async with limiter.slot():
+                pass
+        release.set()
+        await asyncio.gather(*running)
+        return limiter.stats()
+
+    stats = asyncio.run(run())
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 2
+
+def test_chat_is_answered_through_ainvoke(fake_chain_manager):
+    with TestClient(app) as client:
+        response = client.post("/chat", json={"question": "Who has better English?"})
+        stats = client.get("/chat/stats").json()
+    assert response.status_code == 200
+    assert response.json()["answer"] == FAKE_ANSWER
+    assert stats["limiter"]["completed"] >= 1
+
+def test_repeated_question_is_served_from_answer_cache(fake_chain_manager):
+    with TestClient(app) as client:
+        first = client.post("/chat", json={"question": "Who has C1 English?"}).json()
+        second = client.post("/chat", json={"question": "who has  c1 english?"}).json()
+    assert first["cache"] == {"hit": False}
+    assert second["cache"]["hit"] and second["cache"]["match"] == "exact"
+    assert second["answer"] == first["answer"]
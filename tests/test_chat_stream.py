@@ -0,0 +1,46 @@
+import asyncio
+import json
+from fastapi.testclient import TestClient
+
+from src.api.main import app
+from src.api.streaming import stream_chat_events
+from tests.fakes import build_fake_chain, FAKE_ANSWER
+
+def _events(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        name, data = block.split("\n", 1)
+        events.append((name.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+def test_chat_stream_sends_sources_then_tokens(fake_chain_manager):
+    with TestClient(app) as client:
+        response = client.post("/chat/stream", json={"question": "Who has better English?"})
+        metrics = client.get("/metrics").text
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _events(response.text)
+    assert events[0][0] == "sources"
+    assert [s["candidate_id"] for s in events[0][1]["sources"]] == ["Gioberti", "Garcia"]
+    assert "".join(data["token"] for name, data in events if name == "token") == FAKE_ANSWER
+    assert events[-1][0] == "done"
+    assert events[-1][1]["ttft_ms"] is not None
+    count = next(line for line in metrics.splitlines() if line.startswith("rag_chat_stream_ttft_seconds_count"))
+    assert float(count.split()[-1]) >= 1
+
+class DisconnectingRequest:
+    def __init__(self, after: int):
+        self.checks = 0
+        self.after = after
+
+    async def is_disconnected(self) -> bool:
+        self.checks += 1
+        return self.checks > self.after
+
+def test_chat_stream_stops_generation_on_disconnect():
+    async def collect():
+        request = DisconnectingRequest(after=3)
+        return [event async for event in stream_chat_events(build_fake_chain(), "q", request)]
+
+    events = asyncio.run(collect())
+    assert len(events) < len(FAKE_ANSWER)
+    assert not any(event.startswith("event: done") for event in events)
@@ -0,0 +1,41 @@
+from langchain_core.documents import Document
+
+from src.core.application.context_packer import ContextPacker, estimate_tokens
+from src.core.infrastructure.metrics import CONTEXT_DROPPED, CONTEXT_TOKENS
+
+def _doc(candidate_id: str, text: str, score: float) -> Document:
+    return Document(page_content=text, metadata={"candidate_id": candidate_id, "fused_score": score})
+
+def test_packer_dedupes_diversifies_and_respects_budget():
+    shared = "Backend engineer C# .NET ASP.NET Core SQL Server microservices Azure mentoring"
+    docs = [
+        _doc("Gioberti", shared, 0.030),
+        _doc("Gioberti", shared + " Azure", 0.029),
+        _doc("Gioberti", "Tech Lead of a team of six, code reviews and architecture decisions", 0.028),
+        _doc("Gioberti", "Led the migration from monolith to services, kept SLAs during rollout", 0.027),
+        _doc("Garcia", "Frontend developer React Next.js TypeScript, migrated AngularJS", 0.020),
+        _doc("Crisan", "Java Spring Boot developer with Kafka and PostgreSQL", 0.018),
+    ]
+    lines = []
+    packer = ContextPacker(token_budget=60, max_per_candidate=2, mmr_lambda=0.7, baseline_k=4, report=lines.append)
+    packed_before = CONTEXT_TOKENS.snapshot("packed")["count"]
+    dropped_before = CONTEXT_DROPPED.snapshot("chunks")["sum"]
+    packed = packer.pack(docs)
+
+    texts = [doc.page_content for doc in packed]
+    assert shared in texts and shared + " Azure" not in texts
+    assert sum(doc.metadata["candidate_id"] == "Gioberti" for doc in packed) <= 2
+    assert {"Garcia", "Crisan"} & {doc.metadata["candidate_id"] for doc in packed}
+    assert sum(estimate_tokens(text) for text in texts) <= 60
+    candidate_order = [doc.metadata["candidate_id"] for doc in packed]
+    assert candidate_order == sorted(candidate_order, key=candidate_order.index)
+    assert lines and lines[0].startswith("[CONTEXT] chunks 6->")
+    assert CONTEXT_TOKENS.snapshot("packed")["count"] == packed_before + 1
+    assert CONTEXT_DROPPED.snapshot("chunks")["sum"] == dropped_before + len(docs) - len(packed)
+
+def test_packer_strips_splitter_overlap_between_adjacent_chunks():
+    first = "Experience: twelve years building distributed systems with C# and the .NET platform"
+    second = "with C# and the .NET platform, leading teams and mentoring engineers"
+    packer = ContextPacker(token_budget=500)
+    packed = packer.pack([_doc("Gioberti", first, 0.03), _doc("Gioberti", second, 0.02)])
+    assert [doc.page_content for doc in packed] == [first, ", leading teams and mentoring engineers"]
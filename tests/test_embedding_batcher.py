@@ -0,0 +1,60 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.core.infrastructure.embedding_batcher import MicroBatchingEmbeddings
+from src.core.infrastructure.metrics import MetricsRegistry
+
+FAKE_EMBEDDING_SIZE = 8
+CALLERS = 16
+
+class SlowBatchEmbeddings(DeterministicFakeEmbedding):
+    batches: list = []
+    fail: bool = False
+
+    def embed_queries(self, texts):
+        self.batches.append(list(texts))
+        time.sleep(0.02)
+        if self.fail:
+            raise RuntimeError("encoder crashed")
+        return self.embed_documents(texts)
+
+def _batcher(model: SlowBatchEmbeddings, registry: MetricsRegistry, **kwargs) -> MicroBatchingEmbeddings:
+    return MicroBatchingEmbeddings(
+        model,
+        batch_sizes=registry.histogram("batch_size", "Batch size", (1, 4, 16)),
+        queue_wait=registry.histogram("queue_wait_seconds", "Queue wait", (0.01, 0.1)),
+        **kwargs,
+    )
+
+def test_concurrent_queries_share_forward_passes():
+    model = SlowBatchEmbeddings(size=FAKE_EMBEDDING_SIZE, batches=[])
+    registry = MetricsRegistry()
+    batcher = _batcher(model, registry, max_batch_size=8, max_wait_s=0.01)
+    texts = [f"who knows skill {i % 12}" for i in range(CALLERS)]
+    start = threading.Barrier(CALLERS)
+
+    def call(text: str):
+        start.wait()
+        return batcher.embed_query(text)
+
+    with ThreadPoolExecutor(CALLERS) as pool:
+        vectors = list(pool.map(call, texts))
+
+    assert vectors == [model.embed_query(text) for text in texts]
+    assert len(model.batches) < CALLERS
+    assert max(len(batch) for batch in model.batches) <= 8
+    assert batcher.stats()["queries"] == CALLERS
+    assert batcher.batch_sizes.snapshot()["count"] == batcher.stats()["batches"]
+    assert 'queue_wait_seconds_count 16' in registry.render()
+
+def test_encoder_errors_reach_every_caller_in_the_batch():
+    model = SlowBatchEmbeddings(size=FAKE_EMBEDDING_SIZE, batches=[], fail=True)
+    batcher = _batcher(model, MetricsRegistry(), max_wait_s=0.0)
+    with pytest.raises(RuntimeError, match="encoder crashed"):
+        batcher.embed_query("who knows C#")
+    model.fail = False
+    assert batcher.embed_query("who knows C#") == model.embed_query("who knows C#")
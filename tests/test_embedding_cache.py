@@ -0,0 +1,101 @@
+import os
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from src.core.infrastructure.embedding_cache import CachedEmbeddings, EmbeddingStore, open_embedding_store, text_key
+
+FAKE_EMBEDDING_SIZE = 8
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    calls: int = 0
+
+    def embed_documents(self, texts):
+        self.calls += len(texts)
+        return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        self.calls += 1
+        return super().embed_query(text)
+
+def test_cache_hits_skip_the_model_and_survive_reopen(tmp_path):
+    model = CountingEmbeddings(size=FAKE_EMBEDDING_SIZE)
+    cached = CachedEmbeddings(model, EmbeddingStore(tmp_path, max_entries=16, memory_entries=2))
+    first = cached.embed_documents(["Skills: C#, .NET", "DerivedKeywords: Azure", "Skills: C#, .NET"])
+    again = cached.embed_documents(["Skills: C#, .NET", "DerivedKeywords: Azure"])
+    assert model.calls == 2
+    assert again == [first[0], first[1]]
+
+    cached.store.flush()
+    reopened = CachedEmbeddings(model, EmbeddingStore(tmp_path, max_entries=16, memory_entries=2))
+    assert reopened.embed_documents(["DerivedKeywords: Azure"])[0] == first[1]
+    assert model.calls == 2
+    assert reopened.stats()["disk_hits"] == 1
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    model = CountingEmbeddings(size=FAKE_EMBEDDING_SIZE)
+    cached = CachedEmbeddings(model, EmbeddingStore(tmp_path, max_entries=10, memory_entries=0))
+    cached.embed_documents([f"text {i}" for i in range(10)])
+    cached.embed_query("who has C1 English")
+    stats = cached.stats()
+    assert stats["entries"] == 10
+    assert stats["evictions"] == 1
+    cached.embed_documents(["text 0"])
+    assert model.calls == 12
+
+def test_query_batches_embed_only_the_misses(tmp_path):
+    model = CountingEmbeddings(size=FAKE_EMBEDDING_SIZE)
+    cached = CachedEmbeddings(model, EmbeddingStore(tmp_path, max_entries=16, memory_entries=4))
+    single = cached.embed_query("who has C1 English")
+    batch = cached.embed_queries(["who has C1 English", "who knows React", "who knows React"])
+    assert batch[0] == single and batch[1] == batch[2]
+    assert model.calls == 2
+
+def test_stores_sharing_a_directory_never_return_each_others_vectors(tmp_path):
+    first = EmbeddingStore(tmp_path, max_entries=8, memory_entries=0)
+    second = EmbeddingStore(tmp_path, max_entries=8, memory_entries=0)
+    a_keys = [text_key(f"a{i}", "document") for i in range(4)]
+    b_keys = [text_key(f"b{i}", "document") for i in range(4)]
+    first.put_many(a_keys, [[float(i)] * 4 for i in range(4)])
+    second.put_many(b_keys, [[float(-i - 1)] * 4 for i in range(4)])
+
+    assert first.get_many(a_keys) == [[float(i)] * 4 for i in range(4)]
+    assert first.get_many(b_keys) == [[float(-i - 1)] * 4 for i in range(4)]
+
+    third = EmbeddingStore(tmp_path, max_entries=8, memory_entries=0)
+    third.put_many([text_key(f"c{i}", "document") for i in range(4)], [[9.0] * 4] * 4)
+    results = first.get_many(a_keys + b_keys)
+    assert all(vector is None or vector[0] != 9.0 for vector in results)
+    assert sum(vector is None for vector in results) == 4
+
+def test_forked_writers_sharing_a_preloaded_store_keep_their_own_vectors(tmp_path):
+    store = open_embedding_store(tmp_path, max_entries=64, memory_entries=0)
+    store.put_many([text_key("shared", "document")], [[0.5] * 4])
+    children = []
+    for writer in range(2):
+        pid = os.fork()
+        if pid == 0:
+            ok = False
+            try:
+                keys = [text_key(f"w{writer}-{i}", "document") for i in range(20)]
+                vectors = [[float(writer * 100 + i)] * 4 for i in range(20)]
+                for key, vector in zip(keys, vectors):
+                    store.put_many([key], [vector])
+                ok = store.get_many(keys) == vectors and store.get_many([text_key("shared", "document")]) == [[0.5] * 4]
+            finally:
+                os._exit(0 if ok else 1)
+        children.append(pid)
+
+    assert [os.waitpid(pid, 0)[1] for pid in children] == [0, 0]
+    for writer in range(2):
+        keys = [text_key(f"w{writer}-{i}", "document") for i in range(20)]
+        assert store.get_many(keys) == [[float(writer * 100 + i)] * 4 for i in range(20)]
+    assert store.stats()["entries"] == 41
+
+def test_store_works_without_fcntl(tmp_path, monkeypatch):
+    import src.core.infrastructure.embedding_cache as embedding_cache
+
+    monkeypatch.setattr(embedding_cache, "fcntl", None)
+    store = EmbeddingStore(tmp_path, max_entries=4, memory_entries=0)
+    key = text_key("no locks", "document")
+    store.put_many([key], [[1.0, 2.0]])
+    assert EmbeddingStore(tmp_path, max_entries=4).get_many([key]) == [[1.0, 2.0]]
+    assert not (tmp_path / ".lock").exists()
@@ -0,0 +1,96 @@
+import threading
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+import src.core.application.retriever as retriever
+from src.core.application.hybrid_retriever import HybridRetriever
+from src.core.infrastructure.faiss_store import FaissVectorStore
+from src.ingest.build_index import build_index
+from tests.fakes import FAKE_EMBEDDING_SIZE
+
+ROWS = 600
+
+def _fill(store: FaissVectorStore):
+    rng = np.random.default_rng(7)
+    vectors = rng.random((ROWS, FAKE_EMBEDDING_SIZE), dtype=np.float32)
+    metadatas = [{"type": "candidate" if i % 3 else "llm_instruction", "candidate_id": f"c{i % 20}", "level": i % 6} for i in range(ROWS)]
+    store.add_embeddings([f"doc {i}" for i in range(ROWS)], vectors, metadatas, [str(i) for i in range(ROWS)])
+    return vectors, metadatas
+
+@pytest.mark.parametrize("index_type,quantization", [
+    ("flat", "none"), ("flat", "pq"), ("ivf", "int8"), ("ivf", "pq"), ("hnsw", "none"), ("hnsw", "int8"),
+])
+def test_faiss_store_filters_deletes_and_mmap_reload(tmp_path, index_type, quantization):
+    emb = DeterministicFakeEmbedding(size=FAKE_EMBEDDING_SIZE)
+    store = FaissVectorStore(emb, tmp_path, index_type=index_type, quantization=quantization, nprobe=64, ef_search=128)
+    vectors, metadatas = _fill(store)
+    store.delete(["10"])
+    store.save()
+
+    loaded = FaissVectorStore.load(emb, tmp_path, index_type=index_type, quantization=quantization, nprobe=64, ef_search=128)
+    assert loaded.mmap and len(loaded) == ROWS - 1
+    assert loaded.search_docnos(vectors[20], 1)[0][0] == 20
+    assert all(docno != 10 for docno, _ in loaded.search_docnos(vectors[10], 10))
+
+    where = {"$and": [{"type": {"$in": ["candidate"]}}, {"level": {"$gte": 4}}, {"candidate_id": {"$in": ["c4", "c5"]}}]}
+    hits = loaded.similarity_search_by_vector(vectors[4].tolist(), k=5, filter=where)
+    assert hits and all(doc.metadata["candidate_id"] in {"c4", "c5"} and doc.metadata["level"] >= 4 for doc in hits)
+    assert [doc.id for doc in loaded.get_by_ids(["3", "10"])] == ["3"]
+
+    loaded.add_embeddings(["replacement"], vectors[:1] + 5.0, [{"type": "candidate"}], ["0"])
+    assert loaded.search_docnos(vectors[0] + 5.0, 1)[0][0] == ROWS
+
+def test_search_is_read_only_and_safe_alongside_writers(tmp_path):
+    emb = DeterministicFakeEmbedding(size=FAKE_EMBEDDING_SIZE)
+    store = FaissVectorStore(emb, tmp_path, index_type="ivf", quantization="int8", nprobe=64)
+    vectors, _ = _fill(store)
+    store.save()
+    loaded = FaissVectorStore.load(emb, tmp_path, index_type="ivf", quantization="int8", nprobe=64)
+    index = loaded._index
+    loaded.search_docnos(vectors[5], 3, filter={"level": 5})
+    assert loaded._index is index and loaded.mmap
+
+    errors = []
+
+    def search():
+        try:
+            for i in range(200):
+                hits = loaded.similarity_search_with_score_by_vector(vectors[i % ROWS].tolist(), k=3, filter={"type": "candidate"})
+                assert all(doc.metadata["type"] == "candidate" for doc, _ in hits)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=search) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for start in range(0, ROWS, 50):
+        loaded.add_embeddings([f"new {start}"] * 50, vectors[start:start + 50] + 3.0, [{"type": "candidate"}] * 50, [f"n{start + i}" for i in range(50)])
+        loaded.delete([str(start)])
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(loaded) == 2 * ROWS - ROWS // 50
+
+def test_build_index_with_faiss_backend(index_dirs, monkeypatch):
+    monkeypatch.setenv("VECTOR_STORE", "faiss")
+    emb = DeterministicFakeEmbedding(size=FAKE_EMBEDDING_SIZE)
+    first = build_index(embeddings=emb)
+    assert first["added"] > 0
+    assert build_index(embeddings=emb)["added"] == 0
+
+    hybrid = HybridRetriever(
+        vector_store=retriever.vector_store_persistent(emb),
+        lexical_index=None,
+        attribute_index=retriever.load_attribute_index(),
+        k=4,
+        types=["candidate"],
+    )
+    docs = hybrid.invoke("mentoring Tech Lead", filters={"seniority": "senior"})
+    assert docs and {doc.metadata["candidate_id"] for doc in docs} == {"Gioberti"}
+
+    (index_dirs / "MauroGioberti_ATS.json").unlink()
+    assert build_index(embeddings=emb)["deleted"] > 0
+    store = retriever.vector_store_persistent(emb)
+    assert {doc.metadata["candidate_id"] for doc in store.similarity_search("mentoring", k=10)} == {"PabloGorosito"}
@@ -0,0 +1,58 @@
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+import src.core.application.retriever as retriever
+from src.core.application.hybrid_retriever import HybridRetriever, reciprocal_rank_fusion
+from src.core.infrastructure.lexical_index import LexicalIndex, tokenize
+from src.ingest.build_index import build_index
+from tests.fakes import FAKE_EMBEDDING_SIZE
+
+def test_tokenizer_keeps_tech_tokens():
+    tokens = tokenize("Senior C# dev: ASP.NET Core, SQL Server, dotnet.")
+    assert {"c#", "asp.net", ".net", "sql", "server"} <= set(tokens)
+    assert "dev" in tokens and "dotnet" not in tokens
+
+def test_bm25_ranks_exact_tech_tokens_and_persists(tmp_path):
+    index = LexicalIndex()
+    index.add("a", "Frontend React developer with Next.js", "candidate", "Garcia")
+    index.add("b", "Backend C# developer, ASP.NET and SQL Server", "candidate", "Gioberti")
+    index.add("c", "Instruction about C# ranking", "llm_instruction")
+    assert index.search("C# .NET", 2, types={"candidate"})[0][0] == "b"
+    assert [doc_id for doc_id, _ in index.search("developer", 5, candidate_ids={"Garcia"})] == ["a"]
+
+    index.remove(["b"])
+    index.save(tmp_path)
+    loaded = LexicalIndex.load(tmp_path)
+    assert len(loaded) == 2
+    assert loaded.search("C#", 5, types={"candidate"}) == []
+    assert loaded.search("react", 1) == index.search("react", 1)
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["x", "y", "z"], ["y", "w"]])
+    assert fused[0][0] == "y"
+    assert {doc_id for doc_id, _ in fused} == {"x", "y", "z", "w"}
+
+def test_hybrid_retriever_fuses_lexical_and_vector_hits(index_dirs):
+    emb = DeterministicFakeEmbedding(size=FAKE_EMBEDDING_SIZE)
+    build_index(embeddings=emb)
+    hybrid = HybridRetriever(
+        vector_store=retriever.chroma_persistent(emb),
+        lexical_index=retriever.load_lexical_index(),
+        k=4,
+        types=["candidate"],
+    )
+    docs = hybrid.invoke("mentoring Tech Lead")
+    assert 0 < len(docs) <= 4
+    assert all(doc.metadata["type"] == "candidate" for doc in docs)
+    assert docs[0].metadata["lexical_rank"] is not None
+    assert docs[0].metadata["candidate_id"] == "Gioberti"
+
+def test_hybrid_retriever_uses_a_precomputed_query_embedding(index_dirs):
+    emb = DeterministicFakeEmbedding(size=FAKE_EMBEDDING_SIZE)
+    build_index(embeddings=emb)
+    store = retriever.chroma_persistent(emb)
+    hybrid = HybridRetriever(vector_store=store, k=3, types=["candidate"])
+    expected = hybrid.invoke("mentoring Tech Lead")
+
+    store._embedding_function = None
+    docs = hybrid.invoke("mentoring Tech Lead", embedding=emb.embed_query("mentoring Tech Lead"))
+    assert [doc.id for doc in docs] == [doc.id for doc in expected]
@@ -0,0 +1,72 @@
+import json
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+import src.core.application.retriever as retriever
+from src.ingest.build_index import build_index
+from tests.fakes import FAKE_EMBEDDING_SIZE
+
+def _stored_ids(embeddings) -> set:
+    return set(retriever.chroma_persistent(embeddings).get()["ids"])
+
+def test_reindex_is_incremental_and_idempotent(index_dirs):
+    emb = DeterministicFakeEmbedding(size=FAKE_EMBEDDING_SIZE)
+
+    first = build_index(embeddings=emb)
+    assert first["added"] == first["chunks"] > 0
+    assert first["skipped"] == first["deleted"] == 0
+
+    second = build_index(embeddings=emb)
+    assert second["added"] == second["updated"] == second["deleted"] == 0
+    assert second["skipped"] == first["chunks"]
+    assert len(_stored_ids(emb)) == first["chunks"]
+
+def test_changed_and_removed_files_update_the_store(index_dirs):
+    emb = DeterministicFakeEmbedding(size=FAKE_EMBEDDING_SIZE)
+    first = build_index(embeddings=emb)
+
+    changed = index_dirs / "MauroGioberti_ATS.json"
+    data = json.loads(changed.read_text(encoding="utf-8"))
+    data["Summary"] = "Rewritten summary for the incremental indexing test."
+    changed.write_text(json.dumps(data), encoding="utf-8")
+    second = build_index(embeddings=emb)
+    assert second["updated"] > 0
+    assert second["deleted"] > 0
+    assert second["chunks"] == len(_stored_ids(emb))
+
+    (index_dirs / "Gorosito.json").unlink()
+    third = build_index(embeddings=emb)
+    assert third["candidates"] == 1
+    assert third["deleted"] > 0
+    assert third["chunks"] == len(_stored_ids(emb)) < first["chunks"]
+    assert len(retriever.load_lexical_index()) == third["chunks"]
+
+def test_streaming_mode_matches_batch_mode(index_dirs):
+    emb = DeterministicFakeEmbedding(size=FAKE_EMBEDDING_SIZE)
+    streamed = build_index(embeddings=emb, streaming=True, workers=2)
+    assert streamed["added"] == streamed["chunks"] > 0
+    assert streamed["candidates"] == 2
+    assert streamed["cvs_per_s"] > 0
+    assert len(_stored_ids(emb)) == streamed["chunks"]
+
+    again = build_index(embeddings=emb, streaming=False)
+    assert again["skipped"] == streamed["chunks"]
+    assert again["added"] == again["updated"] == 0
+
+def test_incremental_generation_links_immutable_files_and_copies_chroma(index_dirs):
+    emb = DeterministicFakeEmbedding(size=FAKE_EMBEDDING_SIZE)
+    first = build_index(embeddings=emb)
+    first_dir = retriever.index_dir(first["generation"])
+    first_lexical = len(retriever.load_lexical_index(first["generation"]))
+
+    (index_dirs / "Gorosito.json").unlink()
+    progress = []
+    second = build_index(embeddings=emb, on_progress=progress.append)
+    assert second["linked_files"] > 0 and second["copied_files"] > 0
+    assert second["copy_s"] >= 0
+    assert any(update["stage"] == "copy" and "copy_s" in update for update in progress)
+
+    second_dir = retriever.index_dir(second["generation"])
+    assert not (second_dir / retriever.CHROMA_SUBDIR).samefile(first_dir / retriever.CHROMA_SUBDIR)
+    chroma_files = [path for path in (second_dir / retriever.CHROMA_SUBDIR).rglob("*") if path.is_file()]
+    assert chroma_files and all(path.stat().st_nlink == 1 for path in chroma_files)
+    assert len(retriever.load_lexical_index(first["generation"])) == first_lexical > second["chunks"]
@@ -0,0 +1,91 @@
+import json
+import threading
+import time
+
+from fastapi.testclient import TestClient
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+import src.api.main as api_main
+import src.core.application.retriever as retriever
+from src.ingest.build_index import build_index
+from src.ingest.jobs import IndexJobManager
+from tests.fakes import FAKE_EMBEDDING_SIZE
+
+DEADLINE_S = 30.0
+
+def _fake_build(**kwargs) -> dict:
+    return build_index(embeddings=DeterministicFakeEmbedding(size=FAKE_EMBEDDING_SIZE), **kwargs)
+
+def _touch_candidate(index_dirs, summary: str) -> None:
+    path = index_dirs / "Gorosito.json"
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["Summary"] = summary
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+def _wait_finished(client: TestClient, job_id: str) -> dict:
+    deadline = time.monotonic() + DEADLINE_S
+    while time.monotonic() < deadline:
+        job = client.get(f"/index/jobs/{job_id}").json()
+        if job["state"] in ("succeeded", "failed", "cancelled"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"index job {job_id} did not finish")
+
+def _generations() -> list:
+    return sorted(path.name for path in retriever.generations_dir().iterdir())
+
+def test_index_job_swaps_generations_and_collects_old_ones(index_dirs, tmp_path, monkeypatch):
+    monkeypatch.setattr(api_main, "index_jobs", IndexJobManager(tmp_path / "jobs", build=_fake_build))
+    client = TestClient(api_main.app)
+
+    response = client.post("/index")
+    assert response.status_code == 202
+    first = _wait_finished(client, response.json()["job"]["id"])
+    assert first["state"] == "succeeded"
+    assert first["progress"]["total_cvs"] == 2
+    assert retriever.read_index_version() == first["result"]["generation"]
+
+    unchanged = client.post("/index", params={"wait": True}).json()
+    assert unchanged["indexed"]["generation"] == first["result"]["generation"]
+    assert unchanged["indexed"]["skipped"] == unchanged["indexed"]["chunks"]
+
+    _touch_candidate(index_dirs, "Second summary.")
+    second = client.post("/index", params={"wait": True}).json()["indexed"]
+    assert second["generation"] != first["result"]["generation"]
+    assert _generations() == sorted([first["result"]["generation"], second["generation"]])
+
+    _touch_candidate(index_dirs, "Third summary.")
+    third = client.post("/index", params={"wait": True}).json()["indexed"]
+    assert _generations() == sorted([second["generation"], third["generation"]])
+    assert [job["id"] for job in client.get("/index/jobs").json()["jobs"]][-1] == first["id"]
+
+def test_cancelled_job_keeps_serving_the_previous_generation(index_dirs, tmp_path, monkeypatch):
+    emb = DeterministicFakeEmbedding(size=FAKE_EMBEDDING_SIZE)
+    previous = build_index(embeddings=emb)
+    previous_ids = set(retriever.chroma_persistent(emb).get()["ids"])
+    reached, release = threading.Event(), threading.Event()
+
+    def blocking_build(on_progress, cancelled):
+        def progress(update: dict) -> None:
+            on_progress(update)
+            if update["cvs"]:
+                reached.set()
+                release.wait(DEADLINE_S)
+        return _fake_build(on_progress=progress, cancelled=cancelled)
+
+    monkeypatch.setattr(api_main, "index_jobs", IndexJobManager(tmp_path / "jobs", build=blocking_build))
+    client = TestClient(api_main.app)
+    _touch_candidate(index_dirs, "A rebuild that never lands.")
+    job = client.post("/index").json()["job"]
+    assert reached.wait(DEADLINE_S)
+
+    assert client.post("/index").json()["job"]["id"] == job["id"]
+    assert retriever.read_index_version() == previous["generation"]
+    assert set(retriever.chroma_persistent(emb).get()["ids"]) == previous_ids
+    assert client.post(f"/index/jobs/{job['id']}/cancel").status_code == 202
+    release.set()
+
+    assert _wait_finished(client, job["id"])["state"] == "cancelled"
+    assert retriever.read_index_version() == previous["generation"]
+    assert _generations() == [previous["generation"]]
+    assert client.get("/index/jobs/missing").status_code == 404
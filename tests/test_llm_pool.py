@@ -0,0 +1,126 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from src.core.infrastructure.llm_pool import LoadBalancedTransport, parse_backend_urls
+
+class StubBackend:
+    def __init__(self, name: str, delay_s: float = 0.0, status: int = 200):
+        self.name = name
+        self.delay_s = delay_s
+        self.status = status
+        self.paths = []
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                backend.paths.append(self.path)
+                time.sleep(backend.delay_s)
+                payload = json.dumps({"backend": backend.name, "echo": body.decode()}).encode()
+                try:
+                    self.send_response(backend.status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def backends():
+    started = []
+
+    def start(*args, **kwargs):
+        backend = StubBackend(*args, **kwargs)
+        started.append(backend)
+        return backend
+
+    yield start
+    for backend in started:
+        backend.stop()
+
+def _closed_port_url() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}/api"
+
+def _post(client: httpx.Client, path: str = "/chat") -> str:
+    response = client.post(path, json={"q": "hi"})
+    response.raise_for_status()
+    return response.json()["backend"]
+
+def test_parse_backend_urls_accepts_comma_separated_lists():
+    assert parse_backend_urls(" http://a:11434/ , http://b:11434,,") == ["http://a:11434", "http://b:11434"]
+    assert parse_backend_urls(None) == []
+
+def test_requests_are_spread_across_backends_over_kept_alive_connections(backends):
+    a, b = backends("a"), backends("b")
+    transport = LoadBalancedTransport([a.url, b.url])
+    with httpx.Client(base_url=a.url, transport=transport) as client:
+        served = [_post(client) for _ in range(6)]
+
+    assert served.count("a") == 3 and served.count("b") == 3
+    assert a.paths == b.paths == ["/api/chat"] * 3
+    stats = {backend["url"]: backend for backend in transport.stats()["backends"]}
+    assert stats[a.url]["requests"] == 3 and stats[a.url]["outstanding"] == 0
+    assert stats[b.url]["p50_ms"] > 0
+
+def test_down_backend_fails_over_and_is_ejected(backends):
+    up = backends("up")
+    down = _closed_port_url()
+    transport = LoadBalancedTransport([down, up.url], eject_after_failures=2, eject_s=60)
+    with httpx.Client(base_url=down, transport=transport) as client:
+        assert {_post(client) for _ in range(6)} == {"up"}
+
+    stats = {backend["url"]: backend for backend in transport.stats()["backends"]}
+    assert stats[down]["ejected"] and stats[down]["ejections"] == 1
+    assert stats[down]["failures"] == 2
+    assert len(up.paths) == 6
+
+def test_server_errors_eject_until_the_cooldown_expires(backends):
+    now = [0.0]
+    bad, good = backends("bad", status=500), backends("good")
+    transport = LoadBalancedTransport([bad.url, good.url], eject_after_failures=1, eject_s=10, clock=lambda: now[0])
+    with httpx.Client(base_url=bad.url, transport=transport) as client:
+        assert client.post("/chat").status_code == 500
+        assert {_post(client) for _ in range(3)} == {"good"}
+        now[0] = 11.0
+        assert [client.post("/chat").json()["backend"] for _ in range(2)] == ["bad", "good"]
+
+def test_slow_backend_is_hedged_and_the_fast_response_wins(backends):
+    slow, fast = backends("slow", delay_s=0.5), backends("fast")
+    transport = LoadBalancedTransport([slow.url, fast.url], hedge_after_s=0.05)
+
+    async def run():
+        async with httpx.AsyncClient(base_url=slow.url, transport=transport) as client:
+            started = time.perf_counter()
+            response = await client.post("/chat", json={"q": "hedged"})
+            return response.json(), time.perf_counter() - started
+
+    body, elapsed = asyncio.run(run())
+    assert body == {"backend": "fast", "echo": '{"q":"hedged"}'}
+    assert elapsed < 0.4
+    stats = transport.stats()
+    assert (stats["hedges"], stats["hedge_wins"]) == (1, 1)
+    assert all(backend["outstanding"] == 0 for backend in stats["backends"])
@@ -0,0 +1,57 @@
+from fastapi.testclient import TestClient
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+import src.api.main as api_main
+from src.benchmarks.fakes import FakeChatModel
+from src.core.application.agent import build_chain
+from src.core.application.chain_manager import ChainManager
+from src.core.infrastructure.metrics import MetricsRegistry, INGEST_STAGE_SECONDS
+from src.ingest.build_index import build_index
+from tests.fakes import FAKE_EMBEDDING_SIZE
+
+def test_histogram_renders_cumulative_prometheus_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("demo_seconds", "Demo", (0.1, 1.0), ("stage",))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, "llm")
+    text = registry.render()
+    assert '# TYPE demo_seconds histogram' in text
+    assert 'demo_seconds_bucket{stage="llm",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="llm",le="1"} 3' in text
+    assert 'demo_seconds_bucket{stage="llm",le="+Inf"} 4' in text
+    assert 'demo_seconds_count{stage="llm"} 4' in text
+
+    registry.enabled = False
+    histogram.observe(0.2, "llm")
+    assert histogram.snapshot("llm")["count"] == 4
+
+def test_chat_records_stage_metrics_and_server_timing(index_dirs, tmp_path, monkeypatch):
+    emb = DeterministicFakeEmbedding(size=FAKE_EMBEDDING_SIZE)
+    ingest_before = INGEST_STAGE_SECONDS.snapshot("total")["count"]
+    build_index(embeddings=emb)
+    assert INGEST_STAGE_SECONDS.snapshot("total")["count"] == ingest_before + 1
+    assert INGEST_STAGE_SECONDS.snapshot("embed")["count"] > 0
+
+    manager = ChainManager(
+        chain_factory=lambda embeddings: build_chain(embeddings, llm=FakeChatModel()),
+        embeddings_factory=lambda: emb,
+        sources_fingerprint=lambda: (),
+        env_file=tmp_path / ".env",
+    )
+    monkeypatch.setattr(api_main, "chain_manager", manager)
+    monkeypatch.setattr(api_main, "answer_cache_enabled", False)
+    monkeypatch.setattr(api_main, "server_timing_enabled", True)
+    with TestClient(api_main.app) as client:
+        response = client.post("/chat", json={"question": "Who mentors as Tech Lead?"})
+        assert response.status_code == 200
+        stages = {item.split(";")[0] for item in response.headers["Server-Timing"].split(", ")}
+        assert {"embed_query", "vector_search", "lexical_search", "retrieve", "pack_context", "prompt", "llm", "request"} <= stages
+
+        metrics = client.get("/metrics")
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = metrics.text
+    assert 'rag_stage_seconds_count{stage="llm"}' in body
+    assert 'rag_llm_tokens_count{kind="prompt"}' in body
+    assert 'rag_retrieved_chunks_count{stage="pack_context"}' in body
+    assert 'rag_chat_requests_total{route="/chat",outcome="ok"}' in body
+    assert 'rag_cache_misses_total{cache="answer"}' in body
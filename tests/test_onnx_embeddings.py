@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from tokenizers import Tokenizer
+from tokenizers.models import WordLevel
+from tokenizers.pre_tokenizers import Whitespace
+
+from src.core.application.embedding_client import embedding_backend, onnx_threads
+from src.core.infrastructure.onnx_embeddings import OnnxEmbeddings, cosine_parity
+
+VOCAB = {"[PAD]": 0, "[UNK]": 1, "senior": 2, "dotnet": 3, "react": 4, "english": 5, "c1": 6}
+
+class HiddenStateSession:
+    def __init__(self):
+        self.feeds = []
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="input_ids"), SimpleNamespace(name="attention_mask")]
+
+    def run(self, outputs, feeds):
+        self.feeds.append(feeds)
+        ids = feeds["input_ids"].astype(np.float32)
+        return [np.stack([ids, np.ones_like(ids), ids ** 2], axis=-1)]
+
+def _embeddings(**kwargs) -> OnnxEmbeddings:
+    tokenizer = Tokenizer(WordLevel(VOCAB, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = Whitespace()
+    return OnnxEmbeddings(HiddenStateSession(), tokenizer, **kwargs)
+
+def test_mean_pooling_ignores_padding_and_keeps_input_order():
+    embeddings = _embeddings(normalize=False, batch_size=2)
+    texts = ["senior dotnet react english c1", "senior dotnet", "react"]
+    batched = embeddings.embed_documents(texts)
+    assert batched == [embeddings.embed_query(text) for text in texts]
+    assert batched[1] == pytest.approx([2.5, 1.0, 6.5])
+    assert all(set(feeds) == {"input_ids", "attention_mask"} for feeds in embeddings.session.feeds)
+
+def test_normalized_vectors_and_parity_report():
+    embeddings = _embeddings(max_length=3)
+    vectors = np.asarray(embeddings.embed_documents(["senior dotnet react english", "senior dotnet react"]))
+    assert np.linalg.norm(vectors, axis=1) == pytest.approx([1.0, 1.0])
+    assert vectors[0] == pytest.approx(vectors[1])
+    parity = cosine_parity(vectors, vectors * 2)
+    assert parity["min_cosine"] == pytest.approx(1.0)
+    assert cosine_parity([[1.0, 0.0]], [[0.0, 1.0]])["min_cosine"] == pytest.approx(0.0)
+
+def test_backend_selection_and_thread_budget(monkeypatch):
+    monkeypatch.delenv("EMB_BACKEND", raising=False)
+    assert embedding_backend() == "torch"
+    monkeypatch.setenv("EMB_BACKEND", "onnx")
+    assert embedding_backend() == "onnx-int8"
+    monkeypatch.setenv("EMB_ONNX_QUANTIZE", "false")
+    assert embedding_backend() == "onnx"
+    monkeypatch.setenv("EMB_BACKEND", "tensorrt")
+    with pytest.raises(ValueError):
+        embedding_backend()
+
+    monkeypatch.setattr("os.cpu_count", lambda: 8)
+    monkeypatch.setenv("SERVE_WORKERS", "4")
+    monkeypatch.delenv("EMB_ONNX_THREADS", raising=False)
+    assert onnx_threads() == 2
+    monkeypatch.setenv("EMB_ONNX_THREADS", "3")
+    assert onnx_threads() == 3
@@ -0,0 +1,95 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+import src.core.application.retriever as retriever
+from src.api.prefork import prefork_supported
+from src.ingest.build_index import build_index
+from tests.fakes import FAKE_EMBEDDING_SIZE
+
+SERVER_SCRIPT = """
+import os, sys
+from pathlib import Path
+from fastapi import FastAPI
+from src.api.prefork import PreforkServer
+
+version_file = Path(sys.argv[2])
+state = {}
+app = FastAPI()
+
+def preload():
+    state["preloaded_by"] = os.getpid()
+    state["version"] = version_file.read_text()
+    return dict(state)
+
+@app.get("/")
+def info():
+    return {"pid": os.getpid(), **state}
+
+PreforkServer(app, "127.0.0.1", int(sys.argv[1]), 2, preload=preload, version=version_file.read_text, poll_s=0.1).run()
+"""
+DEADLINE_S = 20.0
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _wait_for(url: str, predicate) -> dict:
+    deadline = time.monotonic() + DEADLINE_S
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                payload = json.loads(response.read())
+            if predicate(payload):
+                return payload
+        except OSError:
+            pass
+        time.sleep(0.05)
+    raise AssertionError(f"{url} did not reach the expected state")
+
+@pytest.mark.skipif(not prefork_supported(), reason="os.fork is not available")
+def test_workers_share_preload_and_are_replaced_on_version_change(tmp_path):
+    script = tmp_path / "server.py"
+    script.write_text(SERVER_SCRIPT, encoding="utf-8")
+    version_file = tmp_path / "version"
+    version_file.write_text("v1")
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/"
+    env = {**os.environ, "PYTHONPATH": os.getcwd()}
+    process = subprocess.Popen([sys.executable, str(script), str(port), str(version_file)], env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    try:
+        first = _wait_for(url, lambda payload: True)
+        assert first["version"] == "v1"
+        assert first["preloaded_by"] == process.pid != first["pid"]
+
+        version_file.write_text("v2")
+        second = _wait_for(url, lambda payload: payload["version"] == "v2")
+        assert second["preloaded_by"] == process.pid
+        assert second["pid"] != first["pid"]
+    finally:
+        process.terminate()
+        output, _ = process.communicate(timeout=DEADLINE_S)
+    assert process.returncode == 0
+    assert output.count("[PREFORK] Worker") == 4
+    assert "[PREFORK] Replaced 2 workers" in output
+
+def test_preloaded_indexes_are_reused_until_the_version_changes(index_dirs, monkeypatch):
+    monkeypatch.setattr(retriever, "_preloaded", {})
+    build_index(embeddings=DeterministicFakeEmbedding(size=FAKE_EMBEDDING_SIZE))
+    info = retriever.preload_indexes()
+    assert info["lexical_chunks"] > 0 and info["attribute_index"]
+
+    lexical = retriever.load_lexical_index()
+    assert retriever.load_lexical_index() is lexical
+    assert retriever.load_attribute_index() is retriever.load_attribute_index()
+
+    retriever.activate_generation(retriever.new_generation())
+    assert retriever.load_lexical_index() is not lexical
@@ -0,0 +1,81 @@
+import json
+
+from fastapi.testclient import TestClient
+
+import src.api.main as api_main
+from src.core.application.attribute_index import AttributeIndex, candidate_attributes
+from src.core.application.query_router import QueryRouter, parse_intent
+from src.ingest.build_index import _load_candidate_records_from_dir
+from tests.conftest import INPUT_FIXTURES
+from tests.fakes import FAKE_ANSWER
+
+def _index() -> AttributeIndex:
+    index = AttributeIndex()
+    for record in _load_candidate_records_from_dir(INPUT_FIXTURES):
+        index.upsert(record.candidate_id, candidate_attributes(record))
+    return index
+
+def _router(loads: list | None = None) -> QueryRouter:
+    index = _index()
+
+    def load(version):
+        if loads is not None:
+            loads.append(version)
+        return index
+
+    return QueryRouter(version_reader=lambda: "v1", index_loader=load)
+
+def test_parse_intent_only_accepts_pure_attribute_lookups():
+    assert parse_intent("Who has English B2 or above?") == {"english_level_min": "B2"}
+    assert parse_intent("Which candidates have at least C1 English") == {"english_level_min": "C1"}
+    assert parse_intent("candidates with upper intermediate english") == {"english_level_min": "B2"}
+    assert parse_intent("Which candidates are prepared?") == {"prepared": True}
+    assert parse_intent("who is not prepared") == {"prepared": False}
+    assert parse_intent("prepared candidates with B2+ english") == {"prepared": True, "english_level_min": "B2"}
+    assert parse_intent("Senior .NET developer with Azure experience") is None
+    assert parse_intent("Who has C1 English and knows React?") is None
+    assert parse_intent("Who has a B2 certificate?") is None
+    assert parse_intent("Who has English below B2?") is None
+
+def test_router_answers_in_filter_by_language_format_with_evidence():
+    loads = []
+    router = _router(loads)
+    result = router.route("Who has English C1 or above?")
+    items = json.loads(result["answer"])
+
+    assert [item["CandidateId"] for item in items] == ["Gioberti", "JanCrisan", "JeronimoGarcia"]
+    assert {item["English"] for item in items} == {"C1"}
+    assert items[0]["Evidence"] == "Languages: English Advanced; English (CEF C1)"
+    assert result["route"] == {"path": "structured", "filters": {"english_level_min": "C1"}}
+    assert [source["candidate_id"] for source in result["sources"]] == ["Gioberti", "JanCrisan", "JeronimoGarcia"]
+
+    prepared = json.loads(router.route("which candidates are prepared", {"candidate_ids": ["Gioberti"]})["answer"])
+    assert prepared == [{
+        "CandidateId": "Gioberti",
+        "English": "C1",
+        "Evidence": "Languages: English Advanced; English (CEF C1); Prepared: GeneralScore 92; SeniorityLevel Senior",
+    }]
+    assert router.route("Who knows React?") is None
+    assert router.stats() == {"structured": 2, "fallbacks": 1}
+    assert loads == ["v1"]
+
+def test_chat_reports_which_path_served_the_request(fake_chain_manager, monkeypatch):
+    monkeypatch.setattr(api_main, "query_router", _router())
+    monkeypatch.setattr(api_main, "query_router_enabled", True)
+    monkeypatch.setattr(api_main, "answer_cache_enabled", False)
+    client = TestClient(api_main.app)
+
+    structured = client.post("/chat", json={"question": "Who has English B2 or above?"}).json()
+    assert structured["route"]["path"] == "structured"
+    assert len(json.loads(structured["answer"])) == 3
+    assert fake_chain_manager.status()["builds"] == 0
+
+    rag = client.post("/chat", json={"question": "Who knows C#?"}).json()
+    assert rag["answer"] == FAKE_ANSWER
+    assert rag["route"] == {"path": "rag"}
+
+    bad = client.post("/chat", json={"question": "Who is prepared?", "filters": {"salary": 1}})
+    assert bad.status_code == 400
+
+    batch = client.post("/chat/batch", json={"items": [{"question": "Who knows C#?"}, {"question": "who is prepared"}]}).json()
+    assert [result["route"]["path"] for result in batch["results"]] == ["rag", "structured"]
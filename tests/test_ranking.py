@@ -0,0 +1,91 @@
+import asyncio
+import json
+import re
+
+from fastapi.testclient import TestClient
+from langchain_core.runnables import RunnableLambda
+
+import src.api.main as api_main
+from src.api.concurrency import ConcurrencyLimiter
+from src.core.application.ranking import CandidatePool, CandidateRanker, ScoreCache, parse_score
+from src.core.domain.candidate import CandidateRecord
+from src.ingest.build_index import _load_candidate_records_from_dir
+from tests.conftest import INPUT_FIXTURES
+
+class ScoringLLM:
+    def __init__(self):
+        self.calls = []
+
+    def runnable(self):
+        return RunnableLambda(self._score)
+
+    def _score(self, prompt_value) -> str:
+        profile = prompt_value.to_messages()[-1].content
+        candidate_id = re.search(r"CandidateId: (\S+)", profile).group(1)
+        self.calls.append(candidate_id)
+        if candidate_id == "broken":
+            return "I cannot score this candidate"
+        years = re.search(r"YearsExperience: ([\d.]+)", profile)
+        return json.dumps({"Score": float(years.group(1)) * 10 if years else 5, "Why": f"{candidate_id} profile"})
+
+def _record(candidate_id: str, years: int) -> CandidateRecord:
+    return CandidateRecord(candidate_id=candidate_id, raw={"GeneralInfo": {"YearsExperience": years}}, summary="Backend developer")
+
+def _ranker(tmp_path, llm: ScoringLLM, concurrency: int = 2) -> CandidateRanker:
+    return CandidateRanker(llm_factory=llm.runnable, cache=ScoreCache(tmp_path / "scores"), concurrency=concurrency)
+
+def test_parse_score_clamps_and_tolerates_surrounding_text():
+    assert parse_score('Sure! {"Score": 140, "Why": "ok"} done') == {"Score": 100.0, "Why": "ok"}
+    assert parse_score('{"Score": "72"}') == {"Score": 72.0, "Why": ""}
+
+def test_rank_merges_top_n_and_rescoring_only_scores_new_candidates(tmp_path):
+    llm = ScoringLLM()
+    records = [_record(f"c{i}", i) for i in range(1, 9)]
+    first = asyncio.run(_ranker(tmp_path, llm).rank(records, top_n=3))
+
+    assert [item["CandidateId"] for item in first["ranked"]] == ["c8", "c7", "c6"]
+    assert first["ranked"][0] == {"CandidateId": "c8", "Score": 80.0, "Why": "c8 profile"}
+    assert (first["candidates"], first["scored"], first["cached"]) == (8, 8, 0)
+
+    llm.calls.clear()
+    grown = records + [_record("c9", 9), _record("broken", 1)]
+    second = asyncio.run(_ranker(tmp_path, llm).rank(grown, top_n=3))
+    assert sorted(llm.calls) == ["broken", "c9"]
+    assert [item["CandidateId"] for item in second["ranked"]] == ["c9", "c8", "c7"]
+    assert (second["scored"], second["cached"]) == (1, 8)
+    assert [item["CandidateId"] for item in second["failed"]] == ["broken"]
+    score_lines = [line for path in (tmp_path / "scores").iterdir() for line in path.read_text(encoding="utf-8").splitlines()]
+    assert len(score_lines) == 9
+
+def test_scores_are_keyed_by_prompt_and_candidate_content(tmp_path):
+    llm = ScoringLLM()
+    ranker = _ranker(tmp_path, llm)
+    asyncio.run(ranker.rank([_record("c1", 1)]))
+    asyncio.run(ranker.rank([_record("c1", 1)], criteria="Azure"))
+    asyncio.run(ranker.rank([_record("c1", 1)], task="language"))
+    asyncio.run(ranker.rank([_record("c1", 2)]))
+    assert llm.calls == ["c1"] * 4
+
+def test_rank_endpoint_scores_the_cv_pool(tmp_path, monkeypatch):
+    llm = ScoringLLM()
+    versions = ["v1"]
+    pool = CandidatePool(version_reader=lambda: versions[-1], loader=lambda version: _load_candidate_records_from_dir(INPUT_FIXTURES))
+    monkeypatch.setattr(api_main, "candidate_ranker", _ranker(tmp_path, llm))
+    monkeypatch.setattr(api_main, "candidate_pool", pool)
+    client = TestClient(api_main.app)
+
+    body = client.post("/rank", json={"top_n": 2, "min_score": 30}).json()
+    assert [item["CandidateId"] for item in body["ranked"]] == ["Gioberti", "PabloGorosito"]
+    assert body["candidates"] == 4
+
+    subset = client.post("/rank", json={"candidate_ids": ["JanCrisan"]}).json()
+    assert [item["CandidateId"] for item in subset["ranked"]] == ["JanCrisan"] and subset["cached"] == 1
+    assert client.post("/rank", json={"task": "salary"}).status_code == 400
+    assert pool.loads == 1
+    versions.append("v2")
+    client.post("/rank", json={"candidate_ids": ["JanCrisan"]})
+    assert pool.loads == 2
+
+    monkeypatch.setattr(api_main, "rank_limiter", ConcurrencyLimiter(max_concurrency=0, max_queue=0, name="Rank"))
+    busy = client.post("/rank", json={})
+    assert busy.status_code == 503 and busy.headers["Retry-After"] and "Rank queue" in busy.json()["detail"]
@@ -0,0 +1,37 @@
+from pathlib import Path
+
+from src.ingest.build_index import _load_candidate_records_from_dir, to_documents, SECTION_CHUNK_SIZE
+
+INPUT_FIXTURES = Path("data/input")
+
+def test_candidate_chunks_follow_sections_without_raw_json():
+    records = _load_candidate_records_from_dir(INPUT_FIXTURES)
+    docs = to_documents(records)
+    assert docs
+
+    for doc in docs:
+        section = doc.metadata["section"]
+        assert doc.page_content.startswith(f"[Candidate] {doc.metadata['candidate_id']} ")
+        assert f"{section}:" in doc.page_content
+        assert '{"' not in doc.page_content and '":' not in doc.page_content
+        assert len(doc.page_content) <= SECTION_CHUNK_SIZE
+
+    gioberti = [doc for doc in docs if doc.metadata["candidate_id"] == "Gioberti"]
+    sections = [doc.metadata["section"] for doc in gioberti]
+    assert sections[:3] == ["Summary", "SkillMatrix", "GeneralInfo"]
+    assert len(sections) == len(set(sections))
+    skills = next(doc.page_content for doc in gioberti if doc.metadata["section"] == "SkillMatrix")
+    assert "Technical Leadership (Very High)" in skills
+
+    resume = [doc for doc in docs if doc.metadata["section"] in ("Experience", "Education", "Certifications")]
+    assert resume and not any("\nSKILLS" in doc.page_content or "\nLANGUAGES" in doc.page_content for doc in resume)
+    assert not any(doc.metadata["section"] == "CleanedResumeText" for doc in docs)
+
+    jan = [(doc.metadata["section"], doc.page_content) for doc in docs if doc.metadata["candidate_id"] == "JanCrisan"]
+    assert [section for section, _ in jan if section in ("Experience", "Education", "Certifications")] == [
+        "Experience", "Experience", "Education", "Certifications",
+    ]
+    for section, text in jan:
+        if section == "Experience":
+            assert text.startswith("[Candidate] JanCrisan Experience:\nWork Experience:\n")
+            assert "Education:" not in text and "Certifications:" not in text
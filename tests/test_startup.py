@@ -0,0 +1,31 @@
+import os
+import shutil
+import subprocess
+import sys
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.ingest.build_index import build_index, index_is_current
+from tests.fakes import FAKE_EMBEDDING_SIZE
+
+HEAVY_MODULES = ("langchain_chroma", "chromadb", "langchain_huggingface", "sentence_transformers", "langchain_ollama", "langchain_openai")
+
+def test_index_is_current_tracks_inputs(index_dirs):
+    assert not index_is_current()
+
+    build_index(embeddings=DeterministicFakeEmbedding(size=FAKE_EMBEDDING_SIZE))
+    assert index_is_current()
+
+    changed = index_dirs / "Gorosito.json"
+    changed.write_text(changed.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+    assert not index_is_current()
+
+def test_index_is_current_notices_added_files(index_dirs):
+    build_index(embeddings=DeterministicFakeEmbedding(size=FAKE_EMBEDDING_SIZE))
+    shutil.copy(index_dirs / "Gorosito.json", index_dirs / "Copy.json")
+    assert not index_is_current()
+
+def test_api_import_defers_heavy_dependencies():
+    code = "import sys, src.api.main; print(','.join(m for m in %r if m in sys.modules))" % (HEAVY_MODULES,)
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=os.environ.copy())
+    assert completed.stdout.strip() == ""